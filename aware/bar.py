@@ -1,38 +1,63 @@
-from arcade import Sprite, SpriteList, Text, Vec2, Texture, get_window
+from PIL import Image
+
+from arcade import ArcadeContext, Text, Vec2, Texture, get_window
+import arcade.gl as gl
+
+from aware.data.loading import load_shader
 from aware.utils import clamp
 from engine.resources import get_texture
 
 
 class Bar:
+    """A back, a middle cropped to the percentage, and a front, drawn as one quad with its own shader.
+
+    The crop is a uniform so setting the percentage costs nothing, and it doesn't touch the texture
+    atlas at all. The debug text is only laid out while it is shown. All three images share the
+    middle's quad, so the back and front have to be the same size as the middle.
+    """
+
     def __init__(self, position: Vec2, middle: str, *, back: str | None = None, front: str | None = None):
-        self._position = position
         self.back_tex = get_texture(back) if back is not None else None
         self.middle_tex = get_texture(middle)
-        self.middle_tex_crop = Texture.create_empty(f'{self.middle_tex.atlas_name}_cropped', self.middle_tex.size)
         self.front_tex = get_texture(front) if front is not None else None
+        for tex in (self.back_tex, self.front_tex):
+            if tex is not None and tex.size != self.middle_tex.size:
+                raise ValueError(f"A bar's back and front must be the same size as its middle {self.middle_tex.size}, not {tex.size}")
 
         self.forwards = True
+        self.show_debug = False
+        self._debug_text: Text | None = None
+
+        self.ctx: ArcadeContext = get_window().ctx
+        self.shader: gl.Program = self.ctx.program(
+            vertex_shader=load_shader('bar_vs'),
+            fragment_shader=load_shader('bar_fs')
+        )
+        self.shader['back'] = 0
+        self.shader['middle'] = 1
+        self.shader['front'] = 2
+        self.shader['has_back'] = self.back_tex is not None
+        self.shader['has_front'] = self.front_tex is not None
+        # The quad's corners come from the rect uniform, so it has no buffers.
+        self.geometry: gl.Geometry = self.ctx.geometry(mode=self.ctx.TRIANGLE_STRIP)
+
+        self.middle_texture: gl.Texture2D = self._upload(self.middle_tex)
+        # Anything missing is never sampled, it only needs something bound.
+        self.back_texture: gl.Texture2D = self._upload(self.back_tex) if self.back_tex is not None else self.middle_texture
+        self.front_texture: gl.Texture2D = self._upload(self.front_tex) if self.front_tex is not None else self.middle_texture
 
-        self.atlas = get_window().ctx.default_atlas
-
-        self.atlas.add(self.middle_tex)
-        self.atlas.add(self.middle_tex_crop)
-
-        self.spritelist = SpriteList[Sprite](capacity = 3)
-        if self.back_tex:
-            self.back_sprite = Sprite(self.back_tex)
-            self.spritelist.append(self.back_sprite)
-        self.middle_sprite = Sprite(self.middle_tex_crop)
-        self.spritelist.append(self.middle_sprite)
-        if self.front_tex:
-            self.front_sprite = Sprite(self.front_tex)
-            self.spritelist.append(self.front_sprite)
-
+        self._position = position
         self.position = position
 
         self._percentage = 1.0
 
-        self.debug_text = Text(f"{self.percentage*100:.2f}%", self.middle_sprite.right - 5, self.middle_sprite.center_y, font_size = 11, font_name = "GohuFont 11 Nerd Font Mono", anchor_y = "center", anchor_x = "right")
+    def _upload(self, texture: Texture) -> gl.Texture2D:
+        image = texture.image.convert("RGBA").transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        return self.ctx.texture(image.size, components=4, data=image.tobytes())
+
+    @property
+    def size(self) -> Vec2:
+        return Vec2(*self.middle_tex.size)
 
     @property
     def position(self) -> Vec2:
@@ -41,9 +66,9 @@ class Bar:
     @position.setter
     def position(self, v: Vec2) -> None:
         self._position = v
-        self._position -= Vec2(*self.middle_tex.size) / 2
-        for s in self.spritelist:
-            s.position = self._position
+        self._position -= self.size / 2
+        w, h = self.middle_tex.size
+        self.shader['rect'] = self._position.x - w / 2, self._position.y - h / 2, self._position.x + w / 2, self._position.y + h / 2
 
     @property
     def percentage(self) -> float:
@@ -51,36 +76,33 @@ class Bar:
 
     @percentage.setter
     def percentage(self, v: float) -> None:
-        v = clamp(0, v, 1)
-        self._percentage = v
-        self.debug_text.text = f"{self.percentage*100:.2f}%"
+        self._percentage = clamp(0, v, 1)
+
+    @property
+    def debug_text(self) -> Text:
+        if self._debug_text is None:
+            w, h = self.middle_tex.size
+            self._debug_text = Text("", self._position.x + w / 2 - 5, self._position.y, font_size = 11, font_name = "GohuFont 11 Nerd Font Mono", anchor_y = "center", anchor_x = "right")
+        self._debug_text.text = f"{self.percentage*100:.2f}%"
+        return self._debug_text
 
     def draw(self) -> None:
-        self.middle_region = self.atlas.get_texture_region_info(self.middle_tex.atlas_name)
-        self.crop_region = self.atlas.get_texture_region_info(self.middle_tex_crop.atlas_name)
-
-        self.crop_region.y = self.middle_region.y
-        self.crop_region.height = self.middle_region.height
-        self.crop_region.width = int(self.percentage * self.middle_region.width)
-        if self.forwards:
-            self.crop_region.x = self.middle_region.x
-        else:
-            self.crop_region.x = self.middle_region.x + self.middle_region.width - self.crop_region.width
-
-        ux, uy, uw, uh = self.crop_region.x / self.atlas.width, self.crop_region.y / self.atlas.height, self.crop_region.width / self.atlas.width, self.crop_region.height / self.atlas.height
-        self.crop_region.texture_coordinates = (ux, uy, ux + uw, uy, ux, uy + uh, ux + uw, uy + uh)
-
-        # ?: Is there a way to do this without accessing a private member? If not, we should PR that.
-        slot = self.atlas._texture_uvs.get_existing_or_free_slot(self.middle_tex_crop.atlas_name)  # noqa: SLF001 # type: ignore -- wow this line sucks
-        self.atlas._texture_uvs.set_slot_data(slot, self.crop_region.texture_coordinates)  # noqa: SLF001 # type: ignore -- wow this line sucks
-
-        self.middle_sprite.width = self.crop_region.width
-        if self.forwards:
-            self.middle_sprite.left = self.position.x - self.middle_tex.width / 2.0
-        else:
-            self.middle_sprite.right = self.position.x + self.middle_tex.width / 2.0
-
-        self.spritelist.draw()
+        # The middle is cropped to whole pixels.
+        width = self.middle_tex.width
+        self.shader['fill'] = int(self.percentage * width) / width
+        self.shader['forwards'] = self.forwards
+
+        self.back_texture.use(0)
+        self.middle_texture.use(1)
+        self.front_texture.use(2)
+        func = self.ctx.blend_func
+        with self.ctx.enabled(self.ctx.BLEND):
+            self.ctx.blend_func = self.ctx.BLEND_DEFAULT
+            self.geometry.render(self.shader, vertices=4)
+        self.ctx.blend_func = func
+
+        if self.show_debug:
+            self.debug_text.draw()
 
 
 class TimeBar(Bar):
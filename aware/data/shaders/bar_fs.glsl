@@ -0,0 +1,31 @@
+#version 330
+
+in vec2 vs_uv;
+
+uniform sampler2D back;
+uniform sampler2D middle;
+uniform sampler2D front;
+uniform bool has_back;
+uniform bool has_front;
+// How much of the middle shows, from the left when going forwards and from the right otherwise.
+uniform float fill;
+uniform bool forwards;
+
+out vec4 fs_colour;
+
+// Straight alpha over, so drawing the result blended is the same as drawing each layer blended in turn.
+vec4 over(vec4 top, vec4 under){
+    float a = top.a + under.a * (1.0 - top.a);
+    if (a <= 0.0) return vec4(0.0);
+    return vec4((top.rgb * top.a + under.rgb * under.a * (1.0 - top.a)) / a, a);
+}
+
+void main(){
+    vec4 colour = has_back ? texture(back, vs_uv) : vec4(0.0);
+
+    bool shown = forwards ? vs_uv.x < fill : vs_uv.x > 1.0 - fill;
+    if (shown) colour = over(texture(middle, vs_uv), colour);
+
+    if (has_front) colour = over(texture(front, vs_uv), colour);
+    fs_colour = colour;
+}
@@ -0,0 +1,18 @@
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+// left, bottom, right, top
+uniform vec4 rect;
+
+out vec2 vs_uv;
+
+void main(){
+    // A strip of the four corners, bottom left, bottom right, top left, top right.
+    vec2 corner = vec2(gl_VertexID & 1, gl_VertexID >> 1);
+    gl_Position = window.projection * window.view * vec4(mix(rect.xy, rect.zw, corner), 0.0, 1.0);
+    vs_uv = corner;
+}
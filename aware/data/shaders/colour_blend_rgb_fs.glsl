@@ -2,8 +2,10 @@
 
 in vec4 vs_colour;
 
+uniform vec4 tint;
+
 out vec4 fs_colour;
 
 void main(){
-    fs_colour = vs_colour;
+    fs_colour = vs_colour * tint;
 }
\ No newline at end of file
@@ -0,0 +1,17 @@
+#version 330
+
+// The same layers drawn over black and over white. Over black gives the premultiplied colour, and
+// how much of the white still shows through gives how transparent they are.
+uniform sampler2D over_black;
+uniform sampler2D over_white;
+
+in vec2 vs_uv;
+
+out vec4 fs_colour;
+
+void main(){
+    vec3 black = texture(over_black, vs_uv).rgb;
+    vec3 white = texture(over_white, vs_uv).rgb;
+    vec3 through = white - black;
+    fs_colour = vec4(black, clamp(1.0 - (through.r + through.g + through.b) / 3.0, 0.0, 1.0));
+}
@@ -0,0 +1,18 @@
+#version 330
+
+in float vs_fraction;
+
+uniform sampler2D lookup;
+uniform float offset;
+uniform bool wrap;
+uniform vec4 tint;
+
+out vec4 fs_colour;
+
+void main(){
+    float fraction = vs_fraction + offset;
+    fraction = wrap ? fract(fraction) : clamp(fraction, 0.0, 1.0);
+    // Each texel is a colour at a fraction i / (size - 1), so aim at the texel centres.
+    float size = textureSize(lookup, 0).x;
+    fs_colour = texture(lookup, vec2((0.5 + fraction * (size - 1.0)) / size, 0.5)) * tint;
+}
@@ -0,0 +1,27 @@
+#version 330
+
+#define TAU 6.28318530718
+
+in vec2 vs_uv;
+in vec4 vs_colour;
+flat in vec4 vs_wave;
+flat in float vs_blend;
+
+uniform float time;
+uniform vec4 tint;
+
+out vec4 fs_colour;
+
+void main(){
+    float x = vs_uv.x;
+    float t = time + vs_wave.w;
+
+    float offset = vs_wave.x * 0.5 * (sin(TAU * (x / vs_wave.y - t / vs_wave.z)) + 1);
+    if (vs_uv.y < (offset - vs_blend)) discard;
+    fs_colour = vs_colour;
+
+    // anti-aliasing
+    if (vs_blend > 0) fs_colour.a = vs_colour.a * clamp((vs_uv.y - offset + vs_blend) / vs_blend, 0.0, 1.0);
+
+    fs_colour *= tint;
+}
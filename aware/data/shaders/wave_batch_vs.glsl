@@ -0,0 +1,59 @@
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+// left, bottom, right, top
+in vec4 in_rect;
+// depth, width, speed, phase
+in vec4 in_wave;
+in vec4 in_colour;
+// face, blend
+in vec2 in_style;
+
+out vec2 vs_uv;
+out vec4 vs_colour;
+flat out vec4 vs_wave;
+flat out float vs_blend;
+
+// Drawn as a strip in this order so the quad is split the same way as a single Wave's.
+const int corners[4] = int[4](1, 0, 3, 2);
+
+void main(){
+    float l = in_rect.x;
+    float b = in_rect.y;
+    float r = in_rect.z;
+    float t = in_rect.w;
+    float w = r - l;
+    float h = t - b;
+    float bl = max(in_style.y, 0.0);
+
+    vec2 positions[4];
+    vec2 uvs[4];
+    int face = int(in_style.x);
+    if (face == 0){
+        positions = vec2[4](vec2(l, b), vec2(r, b), vec2(l, t + bl), vec2(r, t + bl));
+        uvs = vec2[4](vec2(0, h), vec2(w, h), vec2(0, -bl), vec2(w, -bl));
+    }
+    else if (face == 1){
+        positions = vec2[4](vec2(l, b), vec2(r + bl, b), vec2(l, t), vec2(r + bl, t));
+        uvs = vec2[4](vec2(h, w), vec2(h, -bl), vec2(0, w), vec2(0, -bl));
+    }
+    else if (face == 2){
+        positions = vec2[4](vec2(l, b - bl), vec2(r, b - bl), vec2(l, t), vec2(r, t));
+        uvs = vec2[4](vec2(w, -bl), vec2(0, -bl), vec2(w, h), vec2(0, h));
+    }
+    else {
+        positions = vec2[4](vec2(l - bl, b), vec2(r, b), vec2(l - bl, t), vec2(r, t));
+        uvs = vec2[4](vec2(0, -bl), vec2(0, w), vec2(h, -bl), vec2(h, w));
+    }
+
+    int corner = corners[gl_VertexID];
+    gl_Position = window.projection * window.view * vec4(positions[corner], 0.0, 1.0);
+    vs_uv = uvs[corner];
+    vs_colour = in_colour;
+    vs_wave = in_wave;
+    vs_blend = bl;
+}
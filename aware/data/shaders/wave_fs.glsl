@@ -7,6 +7,7 @@ in vec4 vs_colour;
 
 uniform vec4 wave;
 uniform int blend;
+uniform vec4 tint;
 
 out vec4 fs_colour;
 
@@ -20,4 +21,6 @@ void main(){
  
     // anti-aliasing
     if (blend > 0) fs_colour.a = vs_colour.a * clamp((vs_uv.y - offset + blend) / blend, 0.0, 1.0);
+
+    fs_colour *= tint;
 }
\ No newline at end of file
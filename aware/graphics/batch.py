@@ -0,0 +1,54 @@
+from typing import Any
+
+from arcade import Sprite, SpriteList, Text
+from pyglet.graphics import Batch, Group
+
+
+class DisplayBatch:
+    """All of a display's text and loose sprites, drawn in two calls rather than one each.
+
+    The sprites share one SpriteList and the text shares one pyglet batch. Text in a higher layer draws
+    over text in a lower layer (i.e. a shadow in layer 0 and the text in layer 1), and the sprites draw
+    under all of the text unless `sprites_over_text` is set. Hide things with their visible property
+    rather than not drawing them.
+    """
+
+    def __init__(self, sprites_over_text: bool = False, pixelated: bool = False, spritelist: SpriteList | None = None) -> None:
+        self.sprites_over_text: bool = sprites_over_text
+        self.pixelated: bool = pixelated
+        self.batch: Batch = Batch()
+        self.spritelist: SpriteList = spritelist if spritelist is not None else SpriteList()
+        self._groups: dict[int, Group] = {}
+
+    def _group(self, layer: int) -> Group:
+        group = self._groups.get(layer)
+        if group is None:
+            group = self._groups[layer] = Group(order=layer)
+        return group
+
+    def text(self, text: str, x: float, y: float, layer: int = 0, **kwargs: Any) -> Text:
+        """Create an arcade.Text which draws with this batch, takes the same arguments."""
+        return Text(text, x, y, batch=self.batch, group=self._group(layer), **kwargs)
+
+    def add_text(self, text: Text, layer: int = 0) -> Text:
+        text.label.batch = self.batch
+        text.label.group = self._group(layer)
+        return text
+
+    def remove_text(self, text: Text):
+        if text.label.batch is self.batch:
+            text.label.batch = None
+
+    def add_sprite(self, sprite: Sprite) -> Sprite:
+        self.spritelist.append(sprite)
+        return sprite
+
+    def remove_sprite(self, sprite: Sprite):
+        self.spritelist.remove(sprite)
+
+    def draw(self):
+        if not self.sprites_over_text:
+            self.spritelist.draw(pixelated=self.pixelated)
+        self.batch.draw()
+        if self.sprites_over_text:
+            self.spritelist.draw(pixelated=self.pixelated)
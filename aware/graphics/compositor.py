@@ -0,0 +1,219 @@
+from collections.abc import Callable
+from itertools import count
+from typing import Any, Literal
+
+from arcade import ArcadeContext, get_window
+from arcade.gl.geometry import quad_2d_fs
+import arcade.gl as gl
+
+from aware.data.loading import load_shader
+
+
+class Layer:
+    # Drawn once and kept until the compositor is invalidated.
+    STATIC: Literal[0] = 0
+    # Drawn again whenever the compositor's time moves on, at most once every interval.
+    # With no interval it changes every frame so it is never cached, see Compositor.
+    TIMED: Literal[1] = 1
+    # Drawn again when marked dirty, or when the key it watches gives something new.
+    DIRTY: Literal[2] = 2
+
+    def __init__(self, draw: Callable[[], Any], mode: Literal[0, 1, 2] = 0, interval: float = 0.0, key: Callable[[], Any] | None = None) -> None:
+        self.draw: Callable[[], Any] = draw
+        self.mode: Literal[0, 1, 2] = mode
+        self.interval: float = interval
+        # i.e. lambda: (self.text.text, self.state.lives_remaining), checked every frame so keep it cheap.
+        self.key: Callable[[], Any] | None = key
+
+        self._visible: bool = True
+        self._dirty: bool = True
+        self._drawn_time: float = float('-inf')
+        self._drawn_key: Any = None
+
+    @property
+    def live(self) -> bool:
+        # Changes every frame, so caching it would only cost more.
+        return self.mode == Layer.TIMED and self.interval <= 0.0
+
+    @property
+    def visible(self) -> bool:
+        return self._visible
+
+    @visible.setter
+    def visible(self, visible: bool):
+        if visible != self._visible:
+            self._visible = visible
+            self._dirty = True
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def needs_draw(self, time: float) -> bool:
+        if self._dirty:
+            return True
+        match self.mode:
+            case Layer.TIMED:
+                return time - self._drawn_time >= self.interval
+            case Layer.DIRTY:
+                return self.key is not None and self.key() != self._drawn_key
+        return False
+
+    def _drawn(self, time: float):
+        self._dirty = False
+        self._drawn_time = time
+        if self.key is not None:
+            self._drawn_key = self.key()
+
+
+class SharedFramebuffer:
+    # A full window framebuffer that every compositor shares, so having lots of displays with compositors
+    # doesn't mean lots of full window textures. Whoever drew into it last owns what's in it.
+
+    def __init__(self, ctx: ArcadeContext, size: tuple[int, int]) -> None:
+        self.framebuffer: gl.Framebuffer = ctx.framebuffer(color_attachments=[ctx.texture(size, components=4)])
+        self.owner: int | None = None
+
+    @property
+    def texture(self) -> gl.Texture2D:
+        return self.framebuffer.color_attachments[0]
+
+
+# (framebuffer size, slot) -> framebuffer. Only the current size is kept.
+_shared: dict[tuple[tuple[int, int], int], SharedFramebuffer] = {}
+_composite_shaders: dict[ArcadeContext, gl.Program] = {}
+_ids = count()
+
+BELOW: Literal[0] = 0
+OVER_BLACK: Literal[1] = 1
+OVER_WHITE: Literal[2] = 2
+
+
+def shared_framebuffer(ctx: ArcadeContext, size: tuple[int, int], slot: int) -> SharedFramebuffer:
+    shared = _shared.get((size, slot))
+    if shared is None:
+        for key in [key for key in _shared if key[0] != size]:
+            del _shared[key]
+        shared = _shared[size, slot] = SharedFramebuffer(ctx, size)
+    return shared
+
+
+def composite_shader(ctx: ArcadeContext) -> gl.Program:
+    shader = _composite_shaders.get(ctx)
+    if shader is None:
+        shader = _composite_shaders[ctx] = ctx.program(
+            vertex_shader=load_shader('composite_vs'),
+            fragment_shader=load_shader('composite_fs')
+        )
+        shader['over_black'] = 0
+        shader['over_white'] = 1
+    return shader
+
+
+class Compositor:
+    """Caches the layers of a screen that don't change every frame in framebuffers.
+
+    Every layer under the first live layer (TIMED with no interval) gets drawn into one cache, and every
+    layer over the last live layer into another. The caches are only drawn again when one of their layers
+    changes, and each frame they are drawn as a single textured quad under and over the live layers. Layers
+    between two live layers get drawn straight to the screen, so keep the live layers next to each other.
+    Unless `opaque` is False the bottom layer should cover the whole screen, as the cache replaces whatever
+    was under it.
+
+    Blending into a transparent framebuffer doesn't keep the right alpha, so the layers over the live ones get
+    drawn over black and over white and the difference gives their alpha when they're put on the screen.
+
+    The framebuffers are shared between every compositor of the same size. Each one draws its cache again
+    when another compositor used the framebuffer since, so two compositors drawn in the same frame would
+    redraw every frame.
+    """
+
+    def __init__(self, opaque: bool = True) -> None:
+        self.ctx: ArcadeContext = get_window().ctx
+        self.opaque: bool = opaque
+        self.layers: list[Layer] = []
+        # The time TIMED layers are drawn at, set it before drawing.
+        self.time: float = 0.0
+        # How many times a cache got drawn again, to see how well the caching is working.
+        self.redraws: int = 0
+
+        self._id: int = next(_ids)
+        self.geometry: gl.Geometry = quad_2d_fs()
+        self.shader: gl.Program = self.ctx.utility_textured_quad_program
+        self.composite_shader: gl.Program = composite_shader(self.ctx)
+        # Where the live layers were last frame, the caches hold different layers when it moves.
+        self._drawn_split: tuple[int, int] | None = None
+
+    def add_layer(self, draw: Callable[[], Any], mode: Literal[0, 1, 2] = 0, interval: float = 0.0, key: Callable[[], Any] | None = None) -> Layer:
+        layer = Layer(draw, mode, interval, key)
+        self.layers.append(layer)
+        return layer
+
+    def invalidate(self):
+        for layer in self.layers:
+            layer.mark_dirty()
+
+    def _split(self) -> tuple[int, int]:
+        # Where the live layers start and end, or both the end when there aren't any.
+        live = [idx for idx, layer in enumerate(self.layers) if layer.live and layer.visible]
+        if not live:
+            return len(self.layers), len(self.layers)
+        return live[0], live[-1] + 1
+
+    def _claim(self, slot: int) -> tuple[SharedFramebuffer, bool]:
+        # The framebuffer for the slot, and whether something else drew into it since.
+        shared = shared_framebuffer(self.ctx, get_window().get_framebuffer_size(), slot)
+        taken = shared.owner != self._id
+        shared.owner = self._id
+        return shared, taken
+
+    def _draw_into(self, shared: SharedFramebuffer, layers: list[Layer], color: tuple[int, int, int, int]):
+        shared.framebuffer.clear(color=color)
+        with shared.framebuffer.activate():
+            for layer in layers:
+                if layer.visible:
+                    layer.draw()
+
+    def draw(self):
+        time = self.time
+        start, end = self._split()
+        moved = (start, end) != self._drawn_split
+        self._drawn_split = start, end
+
+        below = self.layers[:start]
+        if below:
+            shared, taken = self._claim(BELOW)
+            if taken or moved or any(layer.needs_draw(time) for layer in below):
+                self._draw_into(shared, below, (0, 0, 0, 0))
+                for layer in below:
+                    layer._drawn(time)
+                self.redraws += 1
+
+            shared.texture.use(0)
+            flags = () if self.opaque else (self.ctx.BLEND,)
+            with self.ctx.enabled_only(*flags):
+                self.geometry.render(self.shader)
+
+        for layer in self.layers[start:end]:
+            if layer.visible:
+                layer.draw()
+            layer._drawn(time)
+
+        above = self.layers[end:]
+        if above:
+            black, black_taken = self._claim(OVER_BLACK)
+            white, white_taken = self._claim(OVER_WHITE)
+            if black_taken or white_taken or moved or any(layer.needs_draw(time) for layer in above):
+                self._draw_into(black, above, (0, 0, 0, 0))
+                self._draw_into(white, above, (255, 255, 255, 255))
+                for layer in above:
+                    layer._drawn(time)
+                self.redraws += 1
+
+            black.texture.use(0)
+            white.texture.use(1)
+            # The colour is already multiplied by its alpha.
+            blend = self.ctx.blend_func
+            with self.ctx.enabled_only(self.ctx.BLEND):
+                self.ctx.blend_func = self.ctx.ONE, self.ctx.ONE_MINUS_SRC_ALPHA
+                self.geometry.render(self.composite_shader)
+            self.ctx.blend_func = blend
@@ -1,3 +1,4 @@
+from __future__ import annotations
 from collections.abc import Iterable, Generator
 from array import array
 
@@ -6,28 +7,22 @@ from arcade.types import RGBOrA255
 import arcade.gl as gl
 
 from aware.data.loading import load_shader
+from aware.utils import tint_uniform
 
-class Gradient:
+class GradientStops:
+    # The rect, direction, and colour stops of a gradient, and the vertices they become.
+    # Gradient draws them itself, BatchedGradient draws them as part of a GradientBatch.
 
-    def __init__(self, rect: Rect, colors: Iterable[tuple[float, RGBOrA255]], vertical: bool = False, lazy: bool = False) -> None:
-        self.context: ArcadeContext
+    def __init__(self, rect: Rect, colors: Iterable[tuple[float, RGBOrA255]], vertical: bool = False) -> None:
         # TODO: properties to update these
         self._rect: Rect = rect
         self._colors: tuple[tuple[float, RGBOrA255], ...] = tuple(sorted(colors))
         self._vertical: bool = vertical
+        self._stale: bool = False
 
-        self.index_buffer: gl.Buffer
-        self.coordinate_buffer: gl.Buffer
-        self.colour_buffer: gl.Buffer
-
-        self.shader: gl.Program
-        self.geometry: gl.Geometry
+    def mark_stale(self):
+        self._stale = True
 
-        self._initialised: bool = False
-        self._stale: bool = False
-        if not lazy:
-            self.init_deferred()
-    
     @property
     def colors(self) -> tuple[tuple[float, RGBOrA255], ...]:
         return self._colors
@@ -35,7 +30,7 @@ class Gradient:
     def add_color(self, fraction: float, color: RGBOrA255):
         combined = self._colors + ((fraction, color),)
         self._colors = tuple(sorted(combined))
-        self._stale = True
+        self.mark_stale()
 
     def remove_color(self, idx: int = -1):
         if idx < 0:
@@ -45,7 +40,7 @@ class Gradient:
             raise IndexError
         
         self._colors = self._colors[:idx] + self._colors[idx+1:]
-        self._stale = True
+        self.mark_stale()
 
     def set_color(self, color: RGBOrA255, idx: int = -1):
         fraction = self._colors[idx][0]
@@ -56,7 +51,7 @@ class Gradient:
             raise IndexError
 
         self._colors = self._colors[:idx] + ((fraction, color),) + self._colors[idx+1:]
-        self._stale = True
+        self.mark_stale()
 
     def set_fraction(self, fraction: float, idx: int = -1):
         color = self._colors[idx][1]
@@ -67,7 +62,7 @@ class Gradient:
             raise IndexError
 
         self._colors = tuple(sorted(self._colors[:idx] + ((fraction, color),) + self._colors[idx+1:]))
-        self._stale = True
+        self.mark_stale()
 
     def update_color(self, fraction: float, color: RGBOrA255, idx: int = -1):
         if idx < 0:
@@ -85,7 +80,7 @@ class Gradient:
     @rect.setter
     def rect(self, rect: Rect) -> None:
         self._rect = rect
-        self._stale = True
+        self.mark_stale()
 
     @property
     def vertical(self) -> bool:
@@ -94,91 +89,7 @@ class Gradient:
     @vertical.setter
     def vertical(self, vertical: bool) -> None:
         self._vertical = vertical
-        self._stale = True
-
-    def draw(self):
-        if not self._initialised:
-            self.init_deferred()
-        elif self._stale:
-            self.update_geometry()
-
-        self.geometry.render(self.shader)
-
-    def init_deferred(self):
-        if self._initialised:
-            return
-        self.context = ctx = get_window().ctx
-
-        color_estimate = len(self._colors)
-        vertex_count = 2 * color_estimate
-        triangle_count = vertex_count - 2
-        index_count = triangle_count * 3
-
-        self.coordinate_buffer = ctx.buffer(reserve=vertex_count*16)
-        self.colour_buffer = ctx.buffer(reserve=vertex_count*4)
-        self.index_buffer = ctx.buffer(reserve=index_count*4)
-
-        self.update_geometry()
-
-        self.shader = ctx.program(
-            vertex_shader=load_shader('projection_uv_coloured_2d_vs'),
-            fragment_shader=load_shader('colour_blend_rgb_fs')
-        )
-
-        self.geometry = ctx.geometry(
-            (
-                gl.BufferDescription(self.coordinate_buffer, '4f', ('in_coordinate',)),
-                gl.BufferDescription(self.colour_buffer, '4f1', ('in_colour',))
-            ),
-            self.index_buffer,
-            ctx.TRIANGLES
-        )
-
-        self._initialised = True
-    
-    def update_geometry(self):
-        self._stale = False
-
-        colors = self._get_colors_clamped()
-        color_count = len(colors)
-        vertex_count = 2 * color_count
-        triangle_count = vertex_count - 2
-        index_count = triangle_count * 3
-
-        if self.coordinate_buffer.size != vertex_count * 16: # 4 32-bit floats
-            self.coordinate_buffer.orphan(vertex_count * 16)
-        l, r, b, t = self.rect.lrbt
-        if self._vertical:
-            postions = self._get_color_positions(colors, b, t)
-            def create_coord_data() -> Generator[float, None, None]:
-                for pos, frac in postions:
-                    yield from (l, pos, 0.0, frac)
-                    yield from (r, pos, 1.0, frac)
-        else:
-            postions = self._get_color_positions(colors, l, r)
-            def create_coord_data() -> Generator[float, None, None]:
-                for pos, frac in postions:
-                    yield from (pos, t, frac, 1.0)
-                    yield from (pos, b, frac, 0.0)
-        self.coordinate_buffer.write(array('f', create_coord_data()))
-
-        if self.colour_buffer.size != vertex_count * 4: # 1 4 8-bit float
-            self.colour_buffer.orphan(vertex_count * 4)
-        def create_color_data():
-            for c in colors:
-                r, g, b, *a = c[1]
-                a = 255 if not a else a[0]
-                yield from (r, g, b, a)
-                yield from (r, g, b, a)
-        self.colour_buffer.write(array('B', create_color_data()))
-
-        if self.index_buffer.size != index_count * 4: # 1 32-bit int
-            self.index_buffer.orphan(index_count * 4)
-        def create_index_data():
-            for i in range(color_count - 1):
-                idx = i * 2
-                yield from (idx, idx + 3, idx + 1, idx, idx + 2, idx + 3)
-        self.index_buffer.write(array('i', create_index_data()))
+        self.mark_stale()
 
     def _get_colors_clamped(self) -> tuple[tuple[float, RGBOrA255], ...]:
         # Special cases where we have a degenerate gradient
@@ -244,3 +155,359 @@ class Gradient:
         for fraction, _ in colors:
             pos = fraction * end + (1 - fraction) * start
             yield pos, fraction
+
+    def vertex_data(self, colors: tuple[tuple[float, RGBOrA255], ...]) -> tuple[array, array]:
+        # Two vertices per colour, as 4 32-bit floats of coordinates and 4 8-bit colours each.
+        l, r, b, t = self.rect.lrbt
+        coordinates: list[float] = []
+        colours: list[int] = []
+        if self._vertical:
+            for pos, frac in self._get_color_positions(colors, b, t):
+                coordinates.extend((l, pos, 0.0, frac, r, pos, 1.0, frac))
+        else:
+            for pos, frac in self._get_color_positions(colors, l, r):
+                coordinates.extend((pos, t, frac, 1.0, pos, b, frac, 0.0))
+        for _, (cr, cg, cb, *ca) in colors:
+            ca = 255 if not ca else ca[0]
+            colours.extend((cr, cg, cb, ca, cr, cg, cb, ca))
+        return array('f', coordinates), array('B', colours)
+
+
+def gradient_indices(color_count: int, base: int = 0) -> array:
+    # Two triangles between each pair of colours, the vertices of the gradient starting at base.
+    indices: list[int] = []
+    for i in range(color_count - 1):
+        idx = base + i * 2
+        indices.extend((idx, idx + 3, idx + 1, idx, idx + 2, idx + 3))
+    return array('i', indices)
+
+
+class Gradient(GradientStops):
+
+    def __init__(self, rect: Rect, colors: Iterable[tuple[float, RGBOrA255]], vertical: bool = False, lazy: bool = False) -> None:
+        super().__init__(rect, colors, vertical)
+        self.context: ArcadeContext
+        # Multiplies the colours when drawing, so fades and flashes only set a uniform rather than rewrite buffers.
+        self.tint: RGBOrA255 = (255, 255, 255, 255)
+        self.opacity: float = 1.0
+
+        self.index_buffer: gl.Buffer
+        self.coordinate_buffer: gl.Buffer
+        self.colour_buffer: gl.Buffer
+
+        self.shader: gl.Program
+        self.geometry: gl.Geometry
+
+        self._initialised: bool = False
+        if not lazy:
+            self.init_deferred()
+
+    def draw(self):
+        if not self._initialised:
+            self.init_deferred()
+        elif self._stale:
+            self.update_geometry()
+
+        self.shader['tint'] = tint_uniform(self.tint, self.opacity)
+        self.geometry.render(self.shader)
+
+    def init_deferred(self):
+        if self._initialised:
+            return
+        self.context = ctx = get_window().ctx
+
+        color_estimate = len(self._colors)
+        vertex_count = 2 * color_estimate
+        triangle_count = vertex_count - 2
+        index_count = triangle_count * 3
+
+        self.coordinate_buffer = ctx.buffer(reserve=vertex_count*16)
+        self.colour_buffer = ctx.buffer(reserve=vertex_count*4)
+        self.index_buffer = ctx.buffer(reserve=index_count*4)
+
+        self.update_geometry()
+
+        self.shader = ctx.program(
+            vertex_shader=load_shader('projection_uv_coloured_2d_vs'),
+            fragment_shader=load_shader('colour_blend_rgb_fs')
+        )
+
+        self.geometry = ctx.geometry(
+            (
+                gl.BufferDescription(self.coordinate_buffer, '4f', ('in_coordinate',)),
+                gl.BufferDescription(self.colour_buffer, '4f1', ('in_colour',))
+            ),
+            self.index_buffer,
+            ctx.TRIANGLES
+        )
+
+        self._initialised = True
+    
+    def update_geometry(self):
+        self._stale = False
+
+        colors = self._get_colors_clamped()
+        color_count = len(colors)
+        vertex_count = 2 * color_count
+        triangle_count = vertex_count - 2
+        index_count = triangle_count * 3
+
+        coordinates, colours = self.vertex_data(colors)
+        if self.coordinate_buffer.size != vertex_count * 16: # 4 32-bit floats
+            self.coordinate_buffer.orphan(vertex_count * 16)
+        self.coordinate_buffer.write(coordinates)
+
+        if self.colour_buffer.size != vertex_count * 4: # 1 4 8-bit float
+            self.colour_buffer.orphan(vertex_count * 4)
+        self.colour_buffer.write(colours)
+
+        if self.index_buffer.size != index_count * 4: # 1 32-bit int
+            self.index_buffer.orphan(index_count * 4)
+        self.index_buffer.write(gradient_indices(color_count))
+
+
+class BatchedGradient(GradientStops):
+    # A gradient drawn by a GradientBatch, it has all of Gradient's ways to change its stops.
+
+    def __init__(self, batch: GradientBatch, rect: Rect, colors: Iterable[tuple[float, RGBOrA255]], vertical: bool = False) -> None:
+        super().__init__(rect, colors, vertical)
+        # None once it's removed from the batch, after which changing it does nothing.
+        self.batch: GradientBatch | None = batch
+        # Where its vertices and indices are in the batch's buffers, and how many it has room for.
+        self._vertex_start: int = 0
+        self._vertex_capacity: int = 0
+        self._index_start: int = 0
+
+    def mark_stale(self):
+        if self.batch is not None and not self._stale:
+            self._stale = True
+            self.batch._changed.append(self)
+
+
+class GradientBatch:
+    """Many gradients in shared buffers, drawn with a single indexed draw call.
+
+    Each gradient has its own range of the buffers, and when one changes only its range gets written.
+    If it gains more stops than its range has room for everything gets packed again. Gradients draw in
+    the order they were added.
+    """
+
+    def __init__(self, lazy: bool = False) -> None:
+        self.context: ArcadeContext
+        self.gradients: list[BatchedGradient] = []
+        # Multiplies the colours when drawing, so fades and flashes only set a uniform rather than rewrite buffers.
+        self.tint: RGBOrA255 = (255, 255, 255, 255)
+        self.opacity: float = 1.0
+
+        self.index_buffer: gl.Buffer
+        self.coordinate_buffer: gl.Buffer
+        self.colour_buffer: gl.Buffer
+
+        self.shader: gl.Program
+        self.geometry: gl.Geometry
+
+        self._changed: list[BatchedGradient] = []
+        self._repack: bool = True
+        self._vertex_count: int = 0
+        self._index_count: int = 0
+
+        self._initialised: bool = False
+        if not lazy:
+            self.init_deferred()
+
+    def __len__(self) -> int:
+        return len(self.gradients)
+
+    def add(self, rect: Rect, colors: Iterable[tuple[float, RGBOrA255]], vertical: bool = False) -> BatchedGradient:
+        gradient = BatchedGradient(self, rect, colors, vertical)
+        self.gradients.append(gradient)
+        self._repack = True
+        return gradient
+
+    def remove(self, gradient: BatchedGradient):
+        # Detached so it can't write over whichever gradient gets its range next.
+        self.gradients.remove(gradient)
+        if gradient in self._changed:
+            self._changed.remove(gradient)
+        gradient.batch = None
+        gradient._stale = False
+        self._repack = True
+
+    def init_deferred(self):
+        if self._initialised:
+            return
+        self.context = ctx = get_window().ctx
+
+        # Starts with room for a few three colour gradients, and doubles when it runs out.
+        self.coordinate_buffer = ctx.buffer(reserve=24 * 16)
+        self.colour_buffer = ctx.buffer(reserve=24 * 4)
+        self.index_buffer = ctx.buffer(reserve=48 * 4)
+
+        self.shader = ctx.program(
+            vertex_shader=load_shader('projection_uv_coloured_2d_vs'),
+            fragment_shader=load_shader('colour_blend_rgb_fs')
+        )
+
+        self.geometry = ctx.geometry(
+            (
+                gl.BufferDescription(self.coordinate_buffer, '4f', ('in_coordinate',)),
+                gl.BufferDescription(self.colour_buffer, '4f1', ('in_colour',))
+            ),
+            self.index_buffer,
+            ctx.TRIANGLES
+        )
+
+        self._initialised = True
+
+    def draw(self):
+        if not self._initialised:
+            self.init_deferred()
+        self.update_geometry()
+        if self._index_count:
+            self.shader['tint'] = tint_uniform(self.tint, self.opacity)
+            self.geometry.render(self.shader, vertices=self._index_count)
+
+    def update_geometry(self):
+        if not self._repack:
+            for gradient in self._changed:
+                colors = gradient._get_colors_clamped()
+                if 2 * len(colors) > gradient._vertex_capacity:
+                    self._repack = True
+                    break
+                self._write(gradient, colors)
+        if self._repack:
+            self.pack()
+        self._changed = []
+
+    def pack(self):
+        # Lay every gradient out again in order, each keeps at least the room it had.
+        self._repack = False
+        all_colors = [gradient._get_colors_clamped() for gradient in self.gradients]
+        vertex_count = index_count = 0
+        for gradient, colors in zip(self.gradients, all_colors):
+            gradient._vertex_start, gradient._index_start = vertex_count, index_count
+            gradient._vertex_capacity = max(gradient._vertex_capacity, 2 * len(colors))
+            vertex_count += gradient._vertex_capacity
+            index_count += 3 * (gradient._vertex_capacity - 2)
+        self._vertex_count, self._index_count = vertex_count, index_count
+
+        self._reserve(self.coordinate_buffer, vertex_count * 16) # 4 32-bit floats
+        self._reserve(self.colour_buffer, vertex_count * 4) # 4 8-bit floats
+        self._reserve(self.index_buffer, index_count * 4) # 1 32-bit int
+        for gradient, colors in zip(self.gradients, all_colors):
+            self._write(gradient, colors)
+
+    def _reserve(self, buffer: gl.Buffer, size: int):
+        if buffer.size < size:
+            new_size = buffer.size
+            while new_size < size:
+                new_size *= 2
+            buffer.orphan(new_size)
+
+    def _write(self, gradient: BatchedGradient, colors: tuple[tuple[float, RGBOrA255], ...]):
+        gradient._stale = False
+        coordinates, colours = gradient.vertex_data(colors)
+        start = gradient._vertex_start
+        self.coordinate_buffer.write(coordinates, offset=start * 16)
+        self.colour_buffer.write(colours, offset=start * 4)
+
+        # Any room it isn't using is filled with triangles that have no area, so nothing gets drawn.
+        indices = gradient_indices(len(colors), start)
+        unused = 3 * (gradient._vertex_capacity - 2) - len(indices)
+        indices.extend(array('i', (start,)) * unused)
+        self.index_buffer.write(indices, offset=gradient._index_start * 4)
+
+
+# How many colours the stops get baked into, more than enough for a screen of gradient.
+LOOKUP_RESOLUTION = 256
+
+
+class LookupGradient(GradientStops):
+    """A gradient with its stops baked into a small texture, which gets sampled over a single quad.
+
+    Changing the stops only bakes the texture again, and the rect and direction are uniforms, so
+    nothing ever rebuilds any geometry. The colours can be moved along the gradient with the offset,
+    or scrolled along it over time with the scroll speed (fractions a second). Unless wrap is False
+    they loop around, so a gradient which starts and ends on the same colour cycles smoothly.
+    """
+
+    def __init__(self, rect: Rect, colors: Iterable[tuple[float, RGBOrA255]], vertical: bool = False, resolution: int = LOOKUP_RESOLUTION, lazy: bool = False) -> None:
+        super().__init__(rect, colors, vertical)
+        self.context: ArcadeContext
+        self.resolution: int = resolution
+
+        self.offset: float = 0.0
+        self.scroll_speed: float = 0.0
+        self.time: float = 0.0
+        self.wrap: bool = True
+        # Multiplies the colours when drawing, so fades and flashes only set a uniform rather than rewrite buffers.
+        self.tint: RGBOrA255 = (255, 255, 255, 255)
+        self.opacity: float = 1.0
+
+        self.texture: gl.Texture2D
+        self.shader: gl.Program
+        self.geometry: gl.Geometry
+
+        self._initialised: bool = False
+        if not lazy:
+            self.init_deferred()
+
+    def draw(self):
+        if not self._initialised:
+            self.init_deferred()
+        elif self._stale:
+            self.update_texture()
+
+        l, r, b, t = self._rect.lrbt
+        self.shader['rect'] = l, b, r, t
+        self.shader['vertical'] = self._vertical
+        self.shader['offset'] = self.offset + self.scroll_speed * self.time
+        self.shader['wrap'] = self.wrap
+        self.shader['tint'] = tint_uniform(self.tint, self.opacity)
+        self.texture.use(0)
+        self.geometry.render(self.shader, vertices=4)
+
+    def init_deferred(self):
+        if self._initialised:
+            return
+        self.context = ctx = get_window().ctx
+
+        self.texture = ctx.texture((self.resolution, 1), components=4, wrap_x=ctx.CLAMP_TO_EDGE, wrap_y=ctx.CLAMP_TO_EDGE)
+        self.update_texture()
+
+        self.shader = ctx.program(
+            vertex_shader=load_shader('lookup_gradient_vs'),
+            fragment_shader=load_shader('lookup_gradient_fs')
+        )
+        self.shader['lookup'] = 0
+
+        # The quad's corners come from the rect uniform, so it has no buffers.
+        self.geometry = ctx.geometry(mode=ctx.TRIANGLE_STRIP)
+
+        self._initialised = True
+
+    def update_texture(self):
+        self._stale = False
+        self.texture.write(self.bake())
+
+    def bake(self) -> array:
+        # Linearly blend between the stops either side of each texel, the same as the vertex colours would.
+        colors = self._get_colors_clamped()
+        last = self.resolution - 1
+        texels: list[int] = []
+        stop = 0
+        for idx in range(self.resolution):
+            fraction = idx / last
+            while stop < len(colors) - 2 and colors[stop + 1][0] < fraction:
+                stop += 1
+            (start, (r1, g1, b1, *a1)), (end, (r2, g2, b2, *a2)) = colors[stop], colors[stop + 1]
+            t = 0.0 if end <= start else min(1.0, max(0.0, (fraction - start) / (end - start)))
+            a1 = 255 if not a1 else a1[0]
+            a2 = 255 if not a2 else a2[0]
+            texels.extend((
+                round(r1 + (r2 - r1) * t),
+                round(g1 + (g2 - g1) * t),
+                round(b1 + (b2 - b1) * t),
+                round(a1 + (a2 - a1) * t)
+            ))
+        return array('B', texels)
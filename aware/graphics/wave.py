@@ -1,3 +1,4 @@
+from __future__ import annotations
 from typing import Literal
 from array import array
 
@@ -6,6 +7,7 @@ from arcade.types import RGBOrA255
 import arcade.gl as gl
 
 from aware.data.loading import load_shader
+from aware.utils import tint_uniform
 
 
 class Wave:
@@ -27,6 +29,9 @@ class Wave:
         self.phase: float = phase
         self.time: float = 0.0
         self._color: RGBOrA255 = color
+        # Multiplies the colours when drawing, so fades and flashes only set a uniform rather than rewrite buffers.
+        self.tint: RGBOrA255 = (255, 255, 255, 255)
+        self.opacity: float = 1.0
 
         self.coordinate_buffer: gl.Buffer
         self.colour_buffer: gl.Buffer
@@ -89,6 +94,7 @@ class Wave:
         if self._stale:
             self.update_geometry()
         self.shader['wave'] = self.depth, self.width, self.speed, self.time + self.phase
+        self.shader['tint'] = tint_uniform(self.tint, self.opacity)
         func = self.ctx.blend_func
         with self.ctx.enabled(self.ctx.BLEND):
             self.ctx.blend_func = self.ctx.BLEND_DEFAULT
@@ -163,4 +169,226 @@ class Wave:
 
         self.index_buffer.write(array('i', (0, 3, 1, 0, 2, 3)))
 
-        self._stale = False
\ No newline at end of file
+        self._stale = False
+
+# left, bottom, right, top, depth, width, speed, phase, red, green, blue, alpha, face, blend
+WAVE_FLOATS = 14
+
+
+class BatchedWave:
+    # One wave in a WaveBatch, setting anything only changes its own part of the batch's buffer.
+    # Once removed from its batch it is detached, and setting anything only changes the wave itself.
+    __slots__ = ("_batch", "_idx", "_rect", "_face", "_color", "_blend", "_depth", "_width", "_speed", "_phase")
+
+    def __init__(self, batch: WaveBatch, idx: int, rect: Rect, depth: float, width: float, speed: float, phase: float, color: RGBOrA255, face: Literal[0, 1, 2, 3], blend: int) -> None:
+        self._batch: WaveBatch | None = batch
+        self._idx: int = idx
+        self._rect: Rect = rect
+        self._depth: float = depth
+        self._width: float = width
+        self._speed: float = speed
+        self._phase: float = phase
+        self._color: RGBOrA255 = color
+        self._face: Literal[0, 1, 2, 3] = face
+        self._blend: int = blend
+        self._write()
+
+    def _write(self):
+        if self._face not in (0, 1, 2, 3):
+            raise ValueError(f'Wave face is not 0, 1, 2, or 3 but {self._face}')
+        left, right, bottom, top = self._rect.lrbt
+        r, g, b, *a = self._color
+        a = 255 if not a else a[0]
+        if self._batch is None:
+            return
+        self._batch._set(self._idx, (
+            left, bottom, right, top,
+            self._depth, self._width, self._speed, self._phase,
+            r / 255, g / 255, b / 255, a / 255,
+            self._face, self._blend
+        ))
+
+    @property
+    def batch(self) -> WaveBatch | None:
+        return self._batch
+
+    @property
+    def rect(self) -> Rect:
+        return self._rect
+
+    @rect.setter
+    def rect(self, rect: Rect):
+        self._rect = rect
+        self._write()
+
+    @property
+    def face(self) -> Literal[0, 1, 2, 3]:
+        return self._face
+
+    @face.setter
+    def face(self, face: Literal[0, 1, 2, 3]):
+        self._face = face
+        self._write()
+
+    @property
+    def color(self) -> RGBOrA255:
+        return self._color
+
+    @color.setter
+    def color(self, color: RGBOrA255):
+        self._color = color
+        self._write()
+
+    @property
+    def blend(self) -> int:
+        return self._blend
+
+    @blend.setter
+    def blend(self, blend: int):
+        self._blend = blend
+        self._write()
+
+    @property
+    def depth(self) -> float:
+        return self._depth
+
+    @depth.setter
+    def depth(self, depth: float):
+        self._depth = depth
+        self._write()
+
+    @property
+    def width(self) -> float:
+        return self._width
+
+    @width.setter
+    def width(self, width: float):
+        self._width = width
+        self._write()
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    @speed.setter
+    def speed(self, speed: float):
+        self._speed = speed
+        self._write()
+
+    @property
+    def phase(self) -> float:
+        return self._phase
+
+    @phase.setter
+    def phase(self, phase: float):
+        self._phase = phase
+        self._write()
+
+
+class WaveBatch:
+    """Many waves drawn with one instanced draw call.
+
+    Every wave's parameters live in one per-instance buffer, which only gets written when a wave is
+    added, removed, or changed, and then only the part that changed. The only thing set every frame is
+    the time. Waves draw in the order they were added, so later waves go over earlier ones.
+    """
+
+    def __init__(self, capacity: int = 4, lazy: bool = False) -> None:
+        self.ctx: ArcadeContext
+        self.time: float = 0.0
+        self.waves: list[BatchedWave] = []
+        # Multiplies the colours when drawing, so fades and flashes only set a uniform rather than rewrite buffers.
+        self.tint: RGBOrA255 = (255, 255, 255, 255)
+        self.opacity: float = 1.0
+
+        self._capacity: int = max(1, capacity)
+        self._data: array = array('f', bytes(4 * WAVE_FLOATS * self._capacity))
+        # The range of waves which changed since the buffer was last written.
+        self._dirty_start: int = self._capacity
+        self._dirty_end: int = 0
+
+        self.instance_buffer: gl.Buffer
+        self.shader: gl.Program
+        self.geometry: gl.Geometry
+
+        self._initialised: bool = False
+        if not lazy:
+            self.init_deferred()
+
+    def __len__(self) -> int:
+        return len(self.waves)
+
+    def add(self, rect: Rect, depth: float, width: float, speed: float, phase: float, color: RGBOrA255, face: Literal[0, 1, 2, 3] = 0, blend: int = 0) -> BatchedWave:
+        """Takes the same arguments as a Wave, other than the time which the batch shares."""
+        idx = len(self.waves)
+        if idx >= self._capacity:
+            self._grow(2 * self._capacity)
+        wave = BatchedWave(self, idx, rect, depth, width, speed, phase, color, face, blend)
+        self.waves.append(wave)
+        return wave
+
+    def remove(self, wave: BatchedWave):
+        # Everything above it moves down one so the order they draw in stays the same.
+        idx = self.waves.index(wave)
+        del self.waves[idx]
+        # Detached so it can't write over whichever wave moves into its slot.
+        wave._batch = None
+        wave._idx = -1
+        for moved in self.waves[idx:]:
+            moved._idx -= 1
+        start, end = WAVE_FLOATS * idx, WAVE_FLOATS * len(self.waves)
+        self._data[start:end] = self._data[start + WAVE_FLOATS:end + WAVE_FLOATS]
+        self._mark(idx, len(self.waves))
+
+    def _grow(self, capacity: int):
+        self._data.extend(array('f', bytes(4 * WAVE_FLOATS * (capacity - self._capacity))))
+        self._capacity = capacity
+        if self._initialised:
+            self._create_buffers()
+        self._mark(0, len(self.waves))
+
+    def _set(self, idx: int, values: tuple[float, ...]):
+        start = WAVE_FLOATS * idx
+        self._data[start:start + WAVE_FLOATS] = array('f', values)
+        self._mark(idx, idx + 1)
+
+    def _mark(self, start: int, end: int):
+        self._dirty_start = min(self._dirty_start, start)
+        self._dirty_end = max(self._dirty_end, end)
+
+    def init_deferred(self):
+        if self._initialised:
+            return
+        self.ctx = ctx = get_window().ctx
+        self.shader = ctx.program(
+            vertex_shader=load_shader('wave_batch_vs'),
+            fragment_shader=load_shader('wave_batch_fs')
+        )
+        self._create_buffers()
+        self._mark(0, len(self.waves))
+        self._initialised = True
+
+    def _create_buffers(self):
+        self.instance_buffer = self.ctx.buffer(reserve=4 * WAVE_FLOATS * self._capacity)
+        self.geometry = self.ctx.geometry(
+            (gl.BufferDescription(self.instance_buffer, '4f 4f 4f 2f', ('in_rect', 'in_wave', 'in_colour', 'in_style'), instanced=True),),
+            mode=self.ctx.TRIANGLE_STRIP
+        )
+
+    def update_buffer(self):
+        start, end = self._dirty_start, self._dirty_end
+        if start < end:
+            size = 4 * WAVE_FLOATS
+            self.instance_buffer.write(memoryview(self._data)[WAVE_FLOATS * start:WAVE_FLOATS * end].cast('B'), offset=size * start)
+        self._dirty_start, self._dirty_end = self._capacity, 0
+
+    def draw(self):
+        if not self.waves:
+            return
+        if not self._initialised:
+            self.init_deferred()
+        self.update_buffer()
+        self.shader['time'] = self.time
+        self.shader['tint'] = tint_uniform(self.tint, self.opacity)
+        # Blending is left to whatever the caller has set, like the other batches.
+        self.geometry.render(self.shader, vertices=4, instances=len(self.waves))
@@ -24,3 +24,9 @@ def map_range(x: L, n1: L, m1: L, n2: L = -1, m2: L = 1) -> L:
     new_pos = new_max * percentage
     ans = new_pos + n2
     return ans
+
+def tint_uniform(tint: tuple[int, ...], opacity: float = 1.0) -> tuple[float, float, float, float]:
+    """Turn an RGB or RGBA `tint` and an `opacity` into the normalised vec4 the shaders multiply their colours by."""
+    r, g, b, *a = tint
+    a = 255 if not a else a[0]
+    return r / 255, g / 255, b / 255, a / 255 * opacity
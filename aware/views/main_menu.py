@@ -1,13 +1,19 @@
+from pathlib import Path
+
 from arcade import SpriteList, View as ArcadeView, LRBT
 from arcade.clock import GLOBAL_CLOCK, Clock
 
 from aware.anim import ease_quadout, perc
 from aware.data.loading import load_sprite
 from aware.graphics.gradient import Gradient
-from aware.graphics.wave import Wave
+from aware.graphics.compositor import Compositor, Layer
+from aware.graphics.wave import Wave, WaveBatch
 import aware.graphics.style as style
 from engine.finder import packs
-from engine.play import PlayView
+from engine.play import PlayView, ContentFlag
+from engine.playlist import OrderedPlaylist
+from engine.watchdog import Watchdog
+from engine.stats import SessionStats
 
 SPEEDUP = 8.0
 SPEED_TIME = 2.0
@@ -15,17 +21,26 @@ MOVE_AMOUNT = -100
 FOREVER = float("inf")
 
 # ! EDIT HERE TO FILTER GAMES
-# TODO: pack filter
 GAME_FILTER: tuple[str,  ...] = ("fun.ShooterGame",) # Game filter
+PACK_FILTER: str | None = None # Only play the games from this pack, only used without a game filter
+PLAY_IN_ORDER: bool = False # Play the games once each in order rather than shuffled forever
 TRANSITION_FILTER: tuple[str,  ...] = () # Transition filter
 FAIL_FILTER: tuple[str,  ...] = () # Fail filter
+CONTENT_FILTER: ContentFlag = ContentFlag.NONE # Content flags to exclude, only used without a game filter
+
+# ! EDIT HERE TO DEBUG STALLS
+WATCHDOG_REPORT: Path | None = None # Watch for stalled frames and write what they were doing here
+WATCHDOG_AUTO_SKIP: bool = False # Skip games which keep stalling, only used with a watchdog report
+
+RECORD_STATS: bool = False # Keep the result of every game and run in the user's app data
 
 class MainMenuView(ArcadeView):
     def __init__(self) -> None:
         super().__init__()
         self.gradient = Gradient(self.window.rect, ((0.0, style.MENU_LIGHT), (0.5, style.MENU_MIDDLE), (1.0, style.MENU_DARK)), vertical=True)
-        self.wave_1 = Wave(LRBT(0, self.width, 0, 215), 110, 1300, style.SMALL_WAVE_SPEED, 0.0, style.MENU_YELLOW, Wave.TOP_FACE, 3)
-        self.wave_2 = Wave(LRBT(0, self.width, 0, 290), 135, 2000, style.BIG_WAVE_SPEED, 0.0, style.MENU_YELLOW, Wave.TOP_FACE, 3)
+        self.waves = WaveBatch()
+        self.wave_1 = self.waves.add(LRBT(0, self.width, 0, 215), 110, 1300, style.SMALL_WAVE_SPEED, 0.0, style.MENU_YELLOW, Wave.TOP_FACE, 3)
+        self.wave_2 = self.waves.add(LRBT(0, self.width, 0, 290), 135, 2000, style.BIG_WAVE_SPEED, 0.0, style.MENU_YELLOW, Wave.TOP_FACE, 3)
 
         self.spritelist = SpriteList()
 
@@ -42,6 +57,12 @@ class MainMenuView(ArcadeView):
         self.click_time = FOREVER
         self.clicked = False
 
+        self.compositor = Compositor()
+        self.compositor.add_layer(self.gradient.draw)
+        self.compositor.add_layer(self.draw_waves, Layer.TIMED)
+        # Cached over the waves, the sprites only change when the button blinks until it's clicked.
+        self.compositor.add_layer(self.spritelist.draw, Layer.DIRTY, key=lambda: (self.logo.alpha, self.logo.center_x, self.play_button.alpha))
+
     def progress(self) -> None:
         if not self.clicked:
             self.click_time = GLOBAL_CLOCK.time
@@ -63,8 +84,7 @@ class MainMenuView(ArcadeView):
             pos = int(ease_quadout(self.center_x, self.center_x + MOVE_AMOUNT, perc(self.click_time, self.click_time + SPEED_TIME, GLOBAL_CLOCK.time)))
             self.logo.alpha = alpha
             self.play_button.alpha = alpha
-            self.wave_1.color = (*self.wave_1.color[0:3], int(alpha / 2))
-            self.wave_2.color = (*self.wave_2.color[0:3], int(alpha / 2))
+            self.waves.opacity = alpha / 255
             self.logo.center_x = pos
             self.play_button.center_x = pos
 
@@ -74,8 +94,10 @@ class MainMenuView(ArcadeView):
     def launch_play_view(self):
             if GAME_FILTER:
                 games = (packs.get_game(game) for game in GAME_FILTER)
+            elif PACK_FILTER:
+                games = packs.get_pack_games(PACK_FILTER)
             else:
-                games = packs.get_all_games()
+                games = packs.query(exclude=CONTENT_FILTER)
 
             if TRANSITION_FILTER:
                 transitions = (packs.get_transition(transition) for transition in TRANSITION_FILTER)
@@ -88,12 +110,19 @@ class MainMenuView(ArcadeView):
                 fails = packs.get_all_fails()
 
             play_view = PlayView(games, transitions, fails)
+            if PLAY_IN_ORDER:
+                play_view.playlist = OrderedPlaylist(play_view.games)
+            if WATCHDOG_REPORT is not None:
+                play_view.watchdog = Watchdog(play_view, auto_skip=WATCHDOG_AUTO_SKIP, report_path=WATCHDOG_REPORT)
+            if RECORD_STATS:
+                SessionStats(play_view)
             self.window.show_view(play_view)
 
     def on_draw(self) -> None:
         self.clear()
-        self.gradient.draw()
-        self.wave_1.time = self.wave_2.time = self.wave_clock.time
-        self.wave_1.draw()
-        self.wave_2.draw()
-        self.spritelist.draw()
+        self.compositor.time = self.wave_clock.time
+        self.compositor.draw()
+
+    def draw_waves(self):
+        self.waves.time = self.wave_clock.time
+        self.waves.draw()
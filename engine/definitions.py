@@ -0,0 +1,236 @@
+from __future__ import annotations
+from typing import Any, ClassVar
+from dataclasses import dataclass
+from pathlib import Path
+import tomllib
+import json
+
+import arcade
+
+from engine.play import PlayState, Game, ContentFlag
+from engine.resources import get_sprite
+
+__all__ = (
+    "DeclaredGame",
+    "SpriteDefinition",
+    "load_definitions",
+    "compile_games",
+)
+
+# Definition files are parsed and compiled once, and then only again if the file changes.
+# path -> (modification time, pack table, compiled games)
+_COMPILED: dict[Path, tuple[int, dict[str, Any], tuple[type[Game], ...]]] = {}
+
+GOALS = ("press", "click", "hold", "avoid")
+OUTCOMES = ("fail", "succeed")
+
+
+@dataclass(frozen=True)
+class SpriteDefinition:
+    texture: str
+    # Position as a fraction of the screen so definitions don't care about the resolution.
+    x: float = 0.5
+    y: float = 0.5
+    scale: float = 1.0
+    # Whether clicking this sprite counts towards a click goal.
+    target: bool = False
+
+
+class DeclaredGame(Game):
+    # Every game compiled from a definition file is a subclass of this with these filled in.
+    GOAL: ClassVar[str] = "press"
+    KEYS: ClassVar[frozenset[int]] = frozenset()
+    COUNT: ClassVar[int] = 1
+    HOLD: ClassVar[float] = 1.0
+    ON_TIMEOUT: ClassVar[str] = "fail"
+    WRONG_INPUT: ClassVar[str] = "ignore"
+    TEXT: ClassVar[str] = ""
+    SPRITES: ClassVar[tuple[SpriteDefinition, ...]] = ()
+    SOURCE: ClassVar[Path | None] = None
+
+    def __init__(self, state: PlayState) -> None:
+        super().__init__(state)
+        self.sprites: list[arcade.Sprite] = []
+        self.targets: list[arcade.Sprite] = []
+        self.spritelist = arcade.SpriteList()
+        for definition in self.SPRITES:
+            sprite = get_sprite(definition.texture, self.window.width * definition.x, self.window.height * definition.y)
+            sprite.scale = definition.scale
+            self.sprites.append(sprite)
+            if definition.target:
+                self.targets.append(sprite)
+        self.spritelist.extend(self.sprites)
+
+        self.text = arcade.Text(self.TEXT, self.window.center_x, self.window.center_y, anchor_x = "center", anchor_y = "center", font_size = 72, font_name = "A-OTF Shin Go Pro", bold = True)
+
+        self.progress: int = 0
+        self.held: int = 0
+        self.hold_time: float = 0.0
+
+    @property
+    def goal_count(self) -> int:
+        if self.GOAL == "click" and self.COUNT <= 0:
+            return len(self.targets)
+        return self.COUNT
+
+    def start(self):
+        self.progress = 0
+        self.held = 0
+        self.hold_time = 0.0
+        for sprite in self.targets:
+            sprite.visible = True
+
+    def draw(self):
+        self.spritelist.draw()
+        if self.TEXT:
+            self.text.draw()
+
+    def update(self, delta_time: float):
+        if self.GOAL != "hold" or not self.held:
+            return
+        self.hold_time += delta_time
+        if self.hold_time >= self.HOLD:
+            self.succeed()
+
+    def on_time_runout(self):
+        if self.ON_TIMEOUT == "succeed":
+            self.succeed()
+        else:
+            self.fail()
+
+    def wrong_input(self):
+        if self.WRONG_INPUT == "fail":
+            self.fail()
+
+    def on_input(self, symbol: int, modifier: int, pressed: bool):
+        if self.GOAL == "avoid":
+            if pressed and (not self.KEYS or symbol in self.KEYS):
+                self.fail()
+            return
+
+        # Without any bindings every input counts.
+        if self.KEYS and symbol not in self.KEYS:
+            if pressed:
+                self.wrong_input()
+            return
+
+        match self.GOAL:
+            case "press":
+                if not pressed:
+                    return
+                self.progress += 1
+                if self.progress >= self.goal_count:
+                    self.succeed()
+            case "click":
+                if not pressed:
+                    return
+                pos = self.state.cursor_position
+                for sprite in self.targets:
+                    if sprite.visible and sprite.collides_with_point(pos):
+                        sprite.visible = False
+                        self.progress += 1
+                        break
+                else:
+                    self.wrong_input()
+                    return
+                if self.progress >= self.goal_count:
+                    self.succeed()
+            case "hold":
+                self.held += 1 if pressed else -1
+                self.held = max(0, self.held)
+                if not self.held:
+                    # Letting go starts the hold again.
+                    self.hold_time = 0.0
+
+
+def _resolve_key(name: str) -> int:
+    name = name.upper()
+    if name.startswith("MOUSE_BUTTON_"):
+        value = getattr(arcade, name, None)
+    else:
+        value = getattr(arcade.key, name, None)
+    if not isinstance(value, int):
+        raise ValueError(f"{name} is not a key or mouse button")
+    return value
+
+
+def _resolve_flags(names: str | list[str]) -> ContentFlag:
+    if isinstance(names, str):
+        names = [names]
+    flags = ContentFlag.NONE
+    for name in names:
+        if name not in ContentFlag.__members__:
+            raise ValueError(f"{name} is not a content flag")
+        flags |= ContentFlag[name]
+    return flags
+
+
+def _compile_game(definition: dict[str, Any], module: str, source: Path) -> type[Game]:
+    name = definition.get("name")
+    if not isinstance(name, str) or not name.isidentifier():
+        raise ValueError(f"Every game in {source} needs a name which is a valid identifier, not {name!r}")
+
+    goal = definition.get("goal", "press")
+    if goal not in GOALS:
+        raise ValueError(f"{name} in {source} has the goal {goal!r} which isn't one of {GOALS}")
+
+    on_timeout = definition.get("on_timeout", "succeed" if goal == "avoid" else "fail")
+    wrong_input = definition.get("wrong_input", "ignore")
+    if on_timeout not in OUTCOMES or wrong_input not in ("ignore", "fail"):
+        raise ValueError(f"{name} in {source} has an invalid on_timeout or wrong_input")
+
+    default_keys = ["MOUSE_BUTTON_LEFT"] if goal == "click" else []
+    sprites = tuple(SpriteDefinition(**sprite) for sprite in definition.get("sprites", ()))
+
+    attributes = {
+        "__module__": module,
+        "__qualname__": name,
+        "PROMPT": str(definition.get("prompt", "")),
+        "CONTROLS": str(definition.get("controls", Game.CONTROLS)),
+        "DURATION": float(definition.get("duration", Game.DURATION)),
+        "FLAGS": _resolve_flags(definition.get("flags", [])),
+        "BOSS": bool(definition.get("boss", False)),
+        "GOAL": goal,
+        "KEYS": frozenset(_resolve_key(key) for key in definition.get("keys", default_keys)),
+        "COUNT": int(definition.get("count", 0 if goal == "click" else 1)),
+        "HOLD": float(definition.get("hold", 1.0)),
+        "ON_TIMEOUT": on_timeout,
+        "WRONG_INPUT": wrong_input,
+        "TEXT": str(definition.get("text", "")),
+        "SPRITES": sprites,
+        "SOURCE": source,
+    }
+    return type(name, (DeclaredGame,), attributes)
+
+
+def _parse(pth: Path) -> dict[str, Any]:
+    if pth.suffix == ".toml":
+        with open(pth, "rb") as fp:
+            return tomllib.load(fp)
+    elif pth.suffix == ".json":
+        with open(pth, "r") as fp:
+            return json.load(fp)
+    raise ValueError(f"{pth} is not a toml or json definition file")
+
+
+def load_definitions(pth: Path, module: str) -> tuple[dict[str, Any], tuple[type[Game], ...]]:
+    """Parse and compile a definition file, returning its [pack] table and the games it defines.
+
+    The compiled games are cached until the file is modified."""
+    pth = pth.resolve()
+    stamp = pth.stat().st_mtime_ns
+    cached = _COMPILED.get(pth)
+    if cached is not None and cached[0] == stamp:
+        return cached[1], cached[2]
+
+    data = _parse(pth)
+    pack_table = data.get("pack", {})
+    games = tuple(_compile_game(definition, module, pth) for definition in data.get("games", ()))
+
+    _COMPILED[pth] = (stamp, pack_table, games)
+    return pack_table, games
+
+
+def compile_games(pth: Path, module: str) -> tuple[type[Game], ...]:
+    # Only the games, for definitions files which aren't a pack's own and so have no pack table.
+    return load_definitions(pth, module)[1]
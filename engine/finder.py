@@ -8,12 +8,16 @@ import sys
 
 from platformdirs import user_data_dir
 
-from engine.play import Game, Transition, Fail
+from engine.play import Display, Game, Transition, Fail, ContentFlag
 from engine.pack import Pack
+from engine.definitions import load_definitions, compile_games
 
 # Todo: move somewhere else?
 USER_APPDATA_PATH = Path(user_data_dir("arcadeware", "DigitalDragons", ensure_exists=True))
 
+# A pack folder without an __init__.py is loaded from the first of these it contains.
+DEFINITION_PACK_FILES = ("pack.toml", "pack.json")
+
 __all__ = (
     "PackManager",
     "packs",
@@ -39,6 +43,16 @@ class PackManager:
         self._game_mapping: dict[str, type[Game]] = {}
         self._transition_mapping: dict[str, type[Transition]] = {}
         self._fail_mapping: dict[str, type[Fail]] = {}
+        # The other way around, for naming a display in replays and reports.
+        self._display_names: dict[type[Display], str] = {}
+
+        # Bitset index of the game metadata, built when games are registered.
+        # Bit n of every mask refers to self._game_order[n].
+        self._game_order: tuple[type[Game], ...] = ()
+        self._all_game_bits: int = 0
+        self._boss_bits: int = 0
+        self._flag_bits: dict[ContentFlag, int] = {}
+        self._controls_bits: dict[str, int] = {}
 
     def load_packs(self, override: bool = False):#
         packs = self._collect_packs()
@@ -92,14 +106,65 @@ class PackManager:
             self._transition_mapping.update(transition_mapping)
             self._fail_mapping.update(fail_mapping)
 
+        self._display_names = {
+            display: name
+            for mapping in (self._game_mapping, self._transition_mapping, self._fail_mapping)
+            for name, display in mapping.items()
+        }
+        self._index_games()
+
+    def _index_games(self):
+        # Only the class level metadata is read so no game gets created here.
+        order = tuple(self._game_mapping.values())
+        boss_bits = 0
+        flag_bits: dict[ContentFlag, int] = {}
+        controls_bits: dict[str, int] = {}
+
+        for idx, game in enumerate(order):
+            bit = 1 << idx
+            if game.BOSS:
+                boss_bits |= bit
+            for flag in game.FLAGS:
+                flag_bits[flag] = flag_bits.get(flag, 0) | bit
+            controls_bits[game.CONTROLS] = controls_bits.get(game.CONTROLS, 0) | bit
+
+        self._game_order = order
+        self._all_game_bits = (1 << len(order)) - 1
+        self._boss_bits = boss_bits
+        self._flag_bits = flag_bits
+        self._controls_bits = controls_bits
+
+    def query(self, exclude: ContentFlag = ContentFlag.NONE, controls: str | None = None, boss: bool | None = None) -> tuple[type[Game], ...]:
+        # Find every loaded game without the excluded content flags, which uses the given controls,
+        # and is (or isn't) a boss game. Arguments left as None aren't filtered on.
+        mask = self._all_game_bits
+        for flag in exclude:
+            mask &= ~self._flag_bits.get(flag, 0)
+
+        if controls is not None:
+            mask &= self._controls_bits.get(controls, 0)
+
+        if boss is not None:
+            mask &= self._boss_bits if boss else ~self._boss_bits
+
+        order = self._game_order
+        found = []
+        while mask:
+            low = mask & -mask
+            found.append(order[low.bit_length() - 1])
+            mask ^= low
+        return tuple(found)
+
     def _collect_packs(self, load_local: bool = True, load_global: bool = True) -> Generator[Pack, None, None]:
         if load_local:
             for module in _import_packs(self._local_path):
                 yield from _setup_pack(module)
+            yield from _setup_definition_packs(self._local_path)
             
         if load_global:
             for module in _import_packs(self._global_path):
                 yield from _setup_pack(module)
+            yield from _setup_definition_packs(self._global_path)
 
     def can_play_pack(self, pack_spc_name: str) -> bool:
         if pack_spc_name not in self._pack_mapping:
@@ -122,7 +187,7 @@ class PackManager:
         
         has_external_transitions = True
         for external_transition in pack.external_transitions:
-            if external_transition not in self._game_mapping:
+            if external_transition not in self._transition_mapping:
                 has_external_transitions = False
                 break
 
@@ -145,6 +210,9 @@ class PackManager:
 
         return (*((pack.games,) if isinstance(pack.games, type) else pack.games), *external)
 
+    def get_display_name(self, display: type[Display]) -> str | None:
+        return self._display_names.get(display)
+
     def game_loaded(self, game: str) -> bool:
         return game in self._game_mapping
 
@@ -211,6 +279,9 @@ def _import_packs(pth: Path) -> Generator[_PackModule, None, None]:
             continue
         else:
             module_path = module / '__init__.py'
+            if not module_path.exists():
+                # Either a definition only pack, or not a pack at all.
+                continue
         yield _import_pack_module(f"packs.{module.stem}", module_path) # type: ignore -- this is an implicit cast, as valid packs **do** have a setup function
 
 
@@ -253,11 +324,43 @@ def _setup_pack(pack_module: _PackModule) -> Generator[Pack, None, None]:
         print("UH OH NO PACK FILE") # TODO: better error text
         return
 
+    source = Path(pack_module.__file__)
+    origin = source if source.stem != '__init__' else source.parent
+    yield from _set_pack_metadata(pack_def, origin, pack_module.__name__)
+
+
+def _setup_definition_packs(pth: Path) -> Generator[Pack, None, None]:
+    if not pth.exists():
+        return
+
+    for folder in pth.iterdir():
+        if not folder.is_dir() or (folder / '__init__.py').exists():
+            continue
+
+        for file_name in DEFINITION_PACK_FILES:
+            definition = folder / file_name
+            if definition.exists():
+                break
+        else:
+            continue
+
+        try:
+            pack_table, games = load_definitions(definition, f"packs.{folder.stem}")
+            # toml and json only have lists so turn them back into tuples for the frozen pack.
+            fields = {key: tuple(value) if isinstance(value, list) else value for key, value in pack_table.items()}
+            pack = Pack(**fields, games=games)
+        except Exception as e:
+            # TODO: add propper logging and reporting of failed imports. (including reporting to the player) 
+            print(repr(e))
+            continue
+
+        yield from _set_pack_metadata((pack,), folder, f"packs.{folder.stem}")
+
+
+def _set_pack_metadata(pack_def: Iterable[Pack], origin: Path, module_name: str) -> Generator[Pack, None, None]:
     # Trawl through packs and set metadata fields.
     anonymous_pack = False
     for pack in pack_def:
-        source = Path(pack_module.__file__)
-        origin = source if source.stem != '__init__' else source.parent
         object.__setattr__(pack, "origin", origin)
 
         if pack.name is None:
@@ -270,6 +373,17 @@ def _setup_pack(pack_module: _PackModule) -> Generator[Pack, None, None]:
         else:
             object.__setattr__(pack, "space_name", f"{origin.stem}.{pack.name}")
 
+        if pack.definitions:
+            folder = origin if origin.is_dir() else origin.parent
+            definitions = (pack.definitions,) if isinstance(pack.definitions, str) else pack.definitions
+            games = (pack.games,) if isinstance(pack.games, type) else pack.games
+            try:
+                for definition in definitions:
+                    games = games + compile_games(folder / definition, module_name)
+            except Exception as e:
+                print(repr(e))
+            object.__setattr__(pack, "games", games)
+
         object.__setattr__(pack, "creation_time", datetime.now())
         yield pack
 
@@ -0,0 +1,101 @@
+"""Count the GL work everything does, to find the display that makes 200 draw calls rather than guess.
+
+When enabled the arcade and pyglet GL classes have their draw, program, buffer, and texture methods
+wrapped to add to a counter. When disabled the original methods are put back, so it costs nothing.
+The PlayView takes the counts around each display's update and draw and files them with its timings.
+"""
+from __future__ import annotations
+from collections.abc import Callable
+from typing import Any
+
+__all__ = (
+    "COUNTERS",
+    "enable",
+    "disable",
+    "is_enabled",
+    "snapshot",
+)
+
+# draws: draw calls. programs: shader programs bound. buffer_writes: writes to vertex, index, and uniform
+# buffers. texture_uploads: writes into textures, i.e. sprites being added to the atlas or glyphs being rendered.
+COUNTERS = ("draws", "programs", "buffer_writes", "texture_uploads")
+DRAWS, PROGRAMS, BUFFER_WRITES, TEXTURE_UPLOADS = range(len(COUNTERS))
+
+_counts: list[int] = [0] * len(COUNTERS)
+# The class, method name, and original method of everything wrapped.
+_wrapped: list[tuple[type, str, Callable]] = []
+
+
+def _targets() -> list[tuple[type, str, int]]:
+    # Imported here so the backends are only touched once counting is turned on.
+    from arcade.gl.backends.opengl.vertex_array import OpenGLVertexArray
+    from arcade.gl.backends.opengl.program import OpenGLProgram
+    from arcade.gl.backends.opengl.buffer import OpenGLBuffer
+    from arcade.gl.backends.opengl.texture import OpenGLTexture2D
+    from pyglet.graphics.vertexdomain import VertexDomain, InstancedVertexDomain, IndexedVertexDomain, InstancedIndexedVertexDomain
+    from pyglet.graphics.shader import ShaderProgram
+    from pyglet.image import Texture
+
+    targets = [
+        (OpenGLVertexArray, "render", DRAWS),
+        (OpenGLVertexArray, "render_indirect", DRAWS),
+        (OpenGLProgram, "use", PROGRAMS),
+        (ShaderProgram, "use", PROGRAMS),
+        (OpenGLBuffer, "write", BUFFER_WRITES),
+        (OpenGLBuffer, "orphan", BUFFER_WRITES),
+        (OpenGLTexture2D, "write", TEXTURE_UPLOADS),
+        (Texture, "blit_into", TEXTURE_UPLOADS),
+    ]
+    # Each pyglet domain has its own draw methods rather than calling the parent's.
+    for domain in (VertexDomain, InstancedVertexDomain, IndexedVertexDomain, InstancedIndexedVertexDomain):
+        for name in ("draw", "draw_subset"):
+            if name in domain.__dict__:
+                targets.append((domain, name, DRAWS))
+    return targets
+
+
+def _counted(original: Callable, idx: int) -> Callable:
+    counts = _counts
+    def counted(*args: Any, **kwargs: Any) -> Any:
+        counts[idx] += 1
+        return original(*args, **kwargs)
+    counted.__wrapped__ = original # type: ignore -- for anything inspecting it
+    return counted
+
+
+def _count_commits():
+    # pyglet keeps a copy of vertex data and only uploads it when drawing if it changed.
+    from pyglet.graphics.vertexbuffer import BackedBufferObject
+    original = BackedBufferObject.commit
+    counts = _counts
+    def commit(self: BackedBufferObject) -> None:
+        if self._dirty:
+            counts[BUFFER_WRITES] += 1
+        original(self)
+    BackedBufferObject.commit = commit
+    _wrapped.append((BackedBufferObject, "commit", original))
+
+
+def is_enabled() -> bool:
+    return bool(_wrapped)
+
+
+def enable():
+    if _wrapped:
+        return
+    for cls, name, idx in _targets():
+        original = cls.__dict__[name]
+        setattr(cls, name, _counted(original, idx))
+        _wrapped.append((cls, name, original))
+    _count_commits()
+
+
+def disable():
+    while _wrapped:
+        cls, name, original = _wrapped.pop()
+        setattr(cls, name, original)
+
+
+def snapshot() -> tuple[int, ...]:
+    """Everything counted since counting was first enabled, take the difference of two to count a span."""
+    return tuple(_counts)
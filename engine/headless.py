@@ -0,0 +1,265 @@
+"""Run play sessions without showing anything, as fast as the CPU allows.
+
+python -m engine.headless --sessions 10
+
+The games still build their sprites, text, and GL buffers, so a GL context is needed. Set
+ARCADE_HEADLESS=1 to get an offscreen one on a machine without a display.
+"""
+from __future__ import annotations
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import perf_counter
+from pathlib import Path
+from random import Random
+import argparse
+
+import arcade
+
+from engine.play import PlayView, Game, Transition, Fail
+import engine.play
+from engine.replay import start_recording
+from engine.watchdog import Watchdog, DEFAULT_BUDGET
+
+__all__ = (
+    "InputPolicy",
+    "HeadlessResult",
+    "HeadlessDriver",
+    "create_headless_window",
+    "random_policy",
+    "derive_seed",
+)
+
+# Called before every step with the view and the length of the step. Send input through the
+# view's handlers (on_key_press, on_mouse_motion, etc) just like the window would.
+type InputPolicy = Callable[[PlayView, float], None]
+
+DEFAULT_STEP = 1.0 / 60.0
+# Derived seeds stay under 2^63 so they still fit in the stats database.
+SEED_BITS = 63
+
+
+@dataclass
+class HeadlessResult:
+    steps: int = 0
+    # Seconds of play time simulated, and how long that actually took.
+    play_time: float = 0.0
+    real_time: float = 0.0
+    # Games finished, failed, and sessions lost over every session.
+    games: int = 0
+    strikes: int = 0
+    sessions: int = 0
+    # The highest speed level reached.
+    speed: int = 0
+    stalls: int = 0
+
+    @property
+    def games_per_minute(self) -> float:
+        if self.real_time <= 0.0:
+            return 0.0
+        return self.games / self.real_time * 60.0
+
+
+def create_headless_window(width: int = 1280, height: int = 720) -> arcade.Window:
+    # With ARCADE_HEADLESS set this is an offscreen context, otherwise just a hidden window.
+    return arcade.Window(width, height, "Arcade Ware (Headless)", visible=False)
+
+
+class HeadlessDriver:
+    # Steps a PlayView with fixed simulated frames and never waits for real time to catch up.
+
+    def __init__(self, view: PlayView, step: float = DEFAULT_STEP, policy: InputPolicy | None = None, draw_every: int = 0, skip_stalls: bool = True) -> None:
+        self.view: PlayView = view
+        self.step_time: float = step
+        self.policy: InputPolicy | None = policy
+        # Draw every nth step to exercise the draw code, 0 never draws.
+        self.draw_every: int = draw_every
+        # Skip displays which go past STALL_TIME, like pressing END would. Read from engine.play each
+        # step rather than imported, so changing it (i.e. tools.farm --set) works.
+        self.skip_stalls: bool = skip_stalls
+
+        self.result: HeadlessResult = HeadlessResult()
+        self._started: bool = False
+        # Counts from sessions which have already been restarted.
+        self._finished_games: int = 0
+        self._finished_strikes: int = 0
+
+    @property
+    def games(self) -> int:
+        return self._finished_games + self.view.count
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        self.view.window.show_view(self.view)
+
+    def step(self):
+        view = self.view
+        if self.policy is not None:
+            self.policy(view, self.step_time)
+        view.on_update(self.step_time)
+
+        result = self.result
+        result.steps += 1
+        result.play_time += self.step_time
+        result.speed = max(result.speed, view.speed)
+
+        if self.draw_every and result.steps % self.draw_every == 0:
+            view.on_draw()
+
+        if self.skip_stalls and view.active_display is not None and view.frame.display_time > engine.play.STALL_TIME and not view.play_over:
+            result.stalls += 1
+            view.skip_display()
+
+    def run(self, games: int | None = None, sessions: int | None = None, play_time: float | None = None, max_steps: int | None = None) -> HeadlessResult:
+        """Step until any of the limits is reached. Each lost session is restarted straight away."""
+        if games is None and sessions is None and play_time is None and max_steps is None:
+            raise ValueError("A headless run needs at least one limit or it would never end.")
+        self.start()
+
+        view = self.view
+        result = self.result
+        start = perf_counter()
+        while True:
+            if games is not None and self.games >= games:
+                break
+            if sessions is not None and result.sessions >= sessions:
+                break
+            if play_time is not None and result.play_time >= play_time:
+                break
+            if max_steps is not None and result.steps >= max_steps:
+                break
+
+            self.step()
+
+            if view.play_over:
+                result.sessions += 1
+                self._finished_games += view.count
+                self._finished_strikes += view.strikes
+                view.restart()
+
+        result.real_time += perf_counter() - start
+        result.games = self.games
+        result.strikes = self._finished_strikes + view.strikes
+        return result
+
+
+def derive_seed(seed: int, stream: str) -> int:
+    """A seed for a separate stream of random numbers, i.e. an input policy's, which has nothing in common
+    with the session's own stream or any other stream derived from the same seed."""
+    # String seeds are hashed with sha512, so nearby seeds and streams give unrelated results.
+    return Random(f"{stream}:{seed}").getrandbits(SEED_BITS)
+
+
+def random_policy(seed: int | None = None, press_chance: float = 0.05, keys: tuple[int, ...] | None = None) -> InputPolicy:
+    """Mash random keys and click random spots, releasing everything on the next step."""
+    rng = Random(seed)
+    keys = keys or tuple(getattr(arcade.key, letter) for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ") + (
+        arcade.key.SPACE, arcade.key.UP, arcade.key.DOWN, arcade.key.LEFT, arcade.key.RIGHT
+    )
+    held_keys: list[int] = []
+    held_buttons: list[int] = []
+
+    def policy(view: PlayView, delta_time: float):
+        x, y = view.cursor_position
+        for key in held_keys:
+            view.on_key_release(key, 0)
+        for button in held_buttons:
+            view.on_mouse_release(int(x), int(y), button, 0)
+        held_keys.clear()
+        held_buttons.clear()
+
+        nx, ny = rng.randrange(0, int(view.width)), rng.randrange(0, int(view.height))
+        view.on_mouse_motion(nx, ny, int(nx - x), int(ny - y))
+
+        if rng.random() < press_chance:
+            key = rng.choice(keys)
+            view.on_key_press(key, 0)
+            held_keys.append(key)
+        if rng.random() < press_chance:
+            view.on_mouse_press(nx, ny, arcade.MOUSE_BUTTON_LEFT, 0)
+            held_buttons.append(arcade.MOUSE_BUTTON_LEFT)
+
+    return policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run play sessions headless and as fast as possible.")
+    parser.add_argument("--sessions", type=int, default=None)
+    parser.add_argument("--games", type=int, default=None)
+    parser.add_argument("--play-time", type=float, default=None, help="Seconds of play time to simulate.")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP, help="Length of each simulated frame.")
+    parser.add_argument("--draw-every", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None, help="Seeds the session, the random input gets a seed derived from it.")
+    parser.add_argument("--timings", type=Path, default=None, help="Export the frame timings of every display.")
+    parser.add_argument("--watchdog", type=Path, default=None, help="Watch for stalled frames and write a report.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="Seconds a frame can take before the watchdog calls it a stall.")
+    parser.add_argument("--auto-skip", action="store_true", help="Let the watchdog skip games which keep stalling.")
+    parser.add_argument("--record", type=Path, default=None, help="Save a replay of the run, see engine.replay.")
+    parser.add_argument("--stats", type=Path, default=None, help="Keep the result of every game in this stats database, see engine.stats.")
+    parser.add_argument("--filter", nargs="*", default=(), help="Namespaced games to play, i.e. digi.ChopGame.")
+    parser.add_argument("--gl-counters", action="store_true", help="Count the draw calls and GL state changes of every display, see engine.glcounters.")
+    args = parser.parse_args()
+    if args.sessions is None and args.games is None and args.play_time is None:
+        args.sessions = 1
+
+    # Only set now so importing this module doesn't change the game's audio.
+    import pyglet
+    pyglet.options.audio = ("silent",)
+
+    from aware.launch import load_fonts
+    from engine.finder import packs
+    from engine.resources import load_resources
+    from engine.stats import SessionStats, StatsStore
+    from engine import glcounters
+
+    load_fonts()
+    load_resources()
+    packs.load_packs()
+    window = create_headless_window()
+
+    games: tuple[type[Game], ...] = tuple(packs.get_game(name) for name in args.filter) if args.filter else packs.get_all_games()
+    transitions: tuple[type[Transition], ...] = packs.get_all_transitions()
+    fails: tuple[type[Fail], ...] = packs.get_all_fails()
+
+    if args.gl_counters:
+        glcounters.enable()
+    view = PlayView(games, transitions, fails, args.seed)
+    view.timings_path = args.timings
+    if args.watchdog is not None:
+        view.watchdog = Watchdog(view, args.budget, auto_skip=args.auto_skip, report_path=args.watchdog)
+    if args.stats is not None:
+        SessionStats(view, StatsStore(args.stats))
+    recording = start_recording(view) if args.record is not None else None
+    # Its own seed, so the input doesn't follow the same random numbers that picked the games.
+    driver = HeadlessDriver(view, args.step, random_policy(derive_seed(view.seed, "policy")), args.draw_every)
+    result = driver.run(args.games, args.sessions, args.play_time)
+    window.close()
+
+    view.export_timings()
+    if view.watchdog is not None:
+        view.watchdog.stop()
+        print(f"{len(view.watchdog.stalls)} stalls, flagged: {', '.join(display.__qualname__ for display in view.watchdog.flagged) or 'nothing'}")
+    if recording is not None:
+        recording.save(args.record)
+        print(f"Saved {len(recording)} records (seed {view.seed}) to {args.record}")
+    if view.stats is not None:
+        view.stats.close()
+        best = view.stats.store.best_run()
+        if best is not None:
+            print(f"Best run in {args.stats}: {best['games']} games with {best['strikes']} strikes at speed {best['speed']}")
+
+    print(f"{result.games} games ({result.strikes} failed) over {result.sessions} sessions, reaching speed {result.speed}")
+    print(f"Finished on {view.count} games with {view.strikes} strikes at speed {view.speed}")
+    print(f"{result.play_time:.1f}s of play time in {result.real_time:.2f}s ({result.games_per_minute:.0f} games/minute, {result.stalls} stalls skipped)")
+    for phase in ("update", "draw", "switch"):
+        slowest = view.timings.slowest(phase, 3)
+        if slowest:
+            print(f"Slowest {phase}: " + ", ".join(f"{row['display']} {row['p99']:.3f}ms" for row in slowest))
+    if args.gl_counters:
+        for row in view.timings.busiest("draw", glcounters.COUNTERS):
+            print(f"{row['display']}: {row['draws']:.1f} draws (max {row['draws_max']}), {row['programs']:.1f} programs, {row['buffer_writes']:.1f} buffer writes, {row['texture_uploads']:.1f} texture uploads a frame")
+
+
+if __name__ == "__main__":
+    main()
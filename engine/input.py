@@ -0,0 +1,55 @@
+from __future__ import annotations
+from collections.abc import Iterator
+
+from engine.replay import RecordKind, Record
+
+__all__ = (
+    "InputBuffer",
+)
+
+
+class InputBuffer:
+    # Input that arrived since the last frame, each with the play time it arrived at.
+    # The PlayView hands it to the displays all at once at the start of the next update.
+
+    def __init__(self) -> None:
+        self._events: list[Record] = []
+        self._spare: list[Record] = []
+        # Counts clears, so a drain can tell it got cleared part way through.
+        self._clears: int = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def push(self, event: Record):
+        self._events.append(event)
+
+    def clear(self):
+        # Also stops a drain that's going, so nothing from before the clear gets handled after it.
+        self._events.clear()
+        self._clears += 1
+
+    def drain(self) -> Iterator[Record | list[Record]]:
+        """Yield every buffered event in order, with each run of mouse motion in between
+        other events grouped into a list so it can be handled as one move."""
+        # Swap the lists so anything pushed while draining waits for the next frame.
+        events, self._events = self._events, self._spare
+        clears = self._clears
+        run: list[Record] = []
+        for event in events:
+            if self._clears != clears:
+                break
+            if event.kind == RecordKind.MOUSE_MOTION:
+                run.append(event)
+                continue
+            if run:
+                yield run
+                run = []
+                if self._clears != clears:
+                    break
+            yield event
+        else:
+            if run:
+                yield run
+        events.clear()
+        self._spare = events
@@ -16,6 +16,8 @@ class Pack:
     external_games: str | tuple[str, ...] = ()
     external_transitions: str | tuple[str, ...] = ()
     external_fails: str | tuple[str, ...] = ()
+    # toml or json files, relative to the pack's folder, of games to compile into the pack.
+    definitions: str | tuple[str, ...] = ()
     requires_external: bool = False
 
     # -- Metadata attributes not set by the user --
@@ -1,15 +1,34 @@
 from __future__ import annotations
-from enum import Flag, auto
-from typing import Self, Iterable
-from random import shuffle, choice
+from collections import OrderedDict
+from collections.abc import Callable
+from enum import Flag, IntEnum, auto
+from weakref import ref
+import tracemalloc
+from typing import TYPE_CHECKING, Self, Iterable, ClassVar
+from random import Random, randrange
+from time import perf_counter, perf_counter_ns
+from pathlib import Path
 
 from arcade import Vec2, Text, Sprite, View as ArcadeView, draw_sprite
 import arcade
 from arcade.clock import Clock
+import arcade.gl as gl
 
 from engine.resources import get_texture
+from engine.replay import RecordKind, Record, InputRecording
+from engine.input import InputBuffer
+from engine.profiling import FrameTimings
+from engine import glcounters
+from engine.watchdog import Watchdog
+from engine.schedule import GameScheduler
+from engine.playlist import Playlist, EndlessPlaylist
 
 from aware.bar import TimeBar
+from aware.graphics.batch import DisplayBatch
+
+if TYPE_CHECKING:
+    # engine.stats needs the packs, which need this module.
+    from engine.stats import SessionStats
 
 MAX_STRIKE_COUNT = 4
 SPEED_INCREASE_GAME_COUNT = 5
@@ -20,6 +39,15 @@ PROMPT_END = 0.5
 CONTROL_START = 1.0
 CONTROL_END = 0.5
 STALL_TIME = 60
+# How many displays that aren't being shown (or about to be) stay alive, and roughly how much memory they can use.
+IDLE_DISPLAY_COUNT = 16
+IDLE_DISPLAY_MEMORY = 256 * 1024 * 1024
+# What a display is counted as using when it doesn't give a memory_footprint.
+DEFAULT_DISPLAY_FOOTPRINT = 8 * 1024 * 1024
+# Displays with FIXED_STEP get updated at this rate of play time, and catch up by at most this many updates a frame.
+FIXED_STEP_RATE = 120
+FIXED_STEP_TIME = 1.0 / FIXED_STEP_RATE
+MAX_FIXED_STEPS = 12
 
 class ContentFlag(Flag):
     NONE = 0
@@ -30,7 +58,39 @@ class ContentFlag(Flag):
     REQUIRES_TYPING = auto()
     JUMPSCARE = auto()
 
+
+def upload(value: object):
+    """Do the GL work drawing value for the first time would, without changing anything about it.
+
+    Sprite lists, display batches, and text get drawn, which makes their buffers, writes their data, and gets
+    the driver to compile what it needs. Anything with an init_deferred (gradients, waves, and their batches)
+    gets initialised and drawn. Lists and tuples of them get gone through. Draw into a scratch framebuffer,
+    see PlayView.warm_up.
+    """
+    if isinstance(value, (arcade.SpriteList, DisplayBatch)):
+        value.draw()
+    elif isinstance(value, Text):
+        # Through its batch, drawing one text on its own doesn't work once it's been put in a shared batch.
+        if value.label.batch is not None:
+            value.label.batch.draw()
+        else:
+            value.label.draw()
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            if isinstance(item, (arcade.SpriteList, DisplayBatch, Text)) or hasattr(item, "init_deferred"):
+                upload(item)
+    elif callable(init_deferred := getattr(value, "init_deferred", None)):
+        init_deferred()
+        value.draw() # type: ignore -- everything with init_deferred draws itself
+
+
 class Display:
+    # Whether update should always be given FIXED_STEP_TIME. Use state.step_alpha to interpolate when drawing.
+    FIXED_STEP: ClassVar[bool] = False
+    # Whether on_cursor_motion gets called for every motion event, rather than once a frame with the motion added up.
+    # Use state.input_time to see when each one happened.
+    MOTION_SAMPLES: ClassVar[bool] = False
+
     # TODO: seperate the game state from the game view
     def __init__(self, state: PlayState, duration: float) -> None:
         self.state: PlayState = state
@@ -42,7 +102,7 @@ class Display:
     @property
     def time(self) -> float:
         """The time this display has been shown for."""
-        return self.state.display_time
+        return self.state.frame.display_time
     
     @property
     def duration(self) -> float:
@@ -56,7 +116,8 @@ class Display:
     @property
     def remaining_time(self) -> float:
         """The time until this display ends (may be infinite)."""
-        return self.state.remaining_time
+        # Worked out from the display's own duration so it stays right if the duration changes mid frame.
+        return self._duration - self.state.frame.display_time
     
     @remaining_time.setter
     def remaining_time(self, v: float):
@@ -65,7 +126,7 @@ class Display:
     @property
     def tick_speed(self) -> float:
         """The current tick speed as a multiplier."""
-        return self.state.tick_speed
+        return self.state.frame.tick_speed
 
     def on_cursor_motion(self, x: float, y: float, dx: float, dy: float):
         pass
@@ -86,22 +147,49 @@ class Display:
     def draw(self):
         pass
 
+    def prepare(self):
+        # Called during the transition before this display is shown, to do the GL work its first draw would,
+        # like creating buffers and writing sprite data. It must not change anything update or draw reads,
+        # so it never calls draw. By default it uploads whatever sprite lists, text, and graphics the display holds.
+        for value in vars(self).values():
+            upload(value)
+
     def update(self, delta_time: float):
         pass
 
+    def teardown(self):
+        # Called when the PlayView drops this display for good, release anything create made here.
+        pass
+
+    @property
+    def memory_footprint(self) -> int:
+        """A rough estimate in bytes of what this display keeps alive, 0 if unknown."""
+        return 0
+
 class Transition(Display):
     @classmethod
     def create(cls, state: PlayState) -> Self:
         return cls(state)  # type: ignore -- signature thing
 
 class Game(Display):
-    def __init__(self, state: PlayState, prompt: str, controls: str, duration: float, flags: ContentFlag = ContentFlag.NONE, boss: bool = False) -> None:
-        super().__init__(state, duration)
+    # Class level metadata. The PackManager reads these when a game is registered
+    # so games can be filtered without creating them. A subclass should override
+    # these rather than pass them to __init__.
+    PROMPT: ClassVar[str] = ""
+    CONTROLS: ClassVar[str] = "default.inputs.nothing"
+    DURATION: ClassVar[float] = 5.0
+    FLAGS: ClassVar[ContentFlag] = ContentFlag.NONE
+    BOSS: ClassVar[bool] = False
+    # How likely this game is to get picked compared to the others.
+    WEIGHT: ClassVar[float] = 1.0
+
+    def __init__(self, state: PlayState, prompt: str | None = None, controls: str | None = None, duration: float | None = None, flags: ContentFlag | None = None, boss: bool | None = None) -> None:
+        super().__init__(state, self.DURATION if duration is None else duration)
         # The text prompt for the transition to show, and the id of the control image to show.
-        self.prompt: str = prompt
-        self.controls: str = controls
-        self.flags = flags
-        self.boss = boss
+        self.prompt: str = self.PROMPT if prompt is None else prompt
+        self.controls: str = self.CONTROLS if controls is None else controls
+        self.flags: ContentFlag = self.FLAGS if flags is None else flags
+        self.boss: bool = self.BOSS if boss is None else boss
 
     @classmethod
     def create(cls, state: PlayState) -> Self:
@@ -117,7 +205,7 @@ class Game(Display):
         self.fail()
 
     def has_content_flag(self, flag: ContentFlag) -> bool:
-        return bool(self.flags | flag)
+        return bool(self.flags & flag)
 
 # TODO
 class Fail(Display):
@@ -134,16 +222,254 @@ class Fail(Display):
     def quit(self):
         self.state.quit_play()
 
+class DisplayCache:
+    # Creates displays when they are first needed, and keeps the ones not in use around
+    # until there are too many or they use too much memory.
+    
+    def __init__(self, state: PlayState, max_idle: int | None = None, max_memory: int | None = None) -> None:
+        self._state: PlayState = state
+        # Looked up now rather than as default arguments, so changing the constants (i.e. tools.farm --set) works.
+        self.max_idle: int = IDLE_DISPLAY_COUNT if max_idle is None else max_idle
+        self.max_memory: int = IDLE_DISPLAY_MEMORY if max_memory is None else max_memory
+
+        # The same display can be in use more than once, i.e. the active game getting picked as the next game.
+        self._in_use: dict[type[Display], tuple[Display, int]] = {}
+        # Least recently used first.
+        self._idle: OrderedDict[type[Display], Display] = OrderedDict()
+        self._footprints: dict[type[Display], int] = {}
+        self.idle_memory: int = 0
+        # What tracemalloc saw each display allocate when it was made, only filled in while it's tracing.
+        # Just for looking at, eviction goes by the footprints so it's the same whether anything traces or not.
+        self.measured: dict[type[Display], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_use) + len(self._idle)
+
+    def __contains__(self, display_type: type[Display]) -> bool:
+        return display_type in self._in_use or display_type in self._idle
+
+    def acquire[D: Display](self, display_type: type[D]) -> D:
+        if display_type in self._in_use:
+            display, users = self._in_use[display_type]
+            self._in_use[display_type] = (display, users + 1)
+            return display # type: ignore -- keyed by type so this is always a D
+
+        display = self._idle.pop(display_type, None)
+        if display is not None:
+            self.idle_memory -= self._footprints[display_type]
+        else:
+            display = self._create(display_type)
+        self._in_use[display_type] = (display, 1)
+        return display # type: ignore -- keyed by type so this is always a D
+
+    def release(self, display: Display):
+        display_type = type(display)
+        if display_type not in self._in_use:
+            return
+        display, users = self._in_use[display_type]
+        if users > 1:
+            self._in_use[display_type] = (display, users - 1)
+            return
+        del self._in_use[display_type]
+
+        self._idle[display_type] = display
+        self.idle_memory += self._footprints[display_type]
+        self._evict()
+
+    def preload(self, display_type: type[Display]) -> bool:
+        # Create a display before it's needed, returns False if it already exists.
+        if display_type in self._in_use:
+            return False
+        if display_type in self._idle:
+            self._idle.move_to_end(display_type)
+            return False
+        self._idle[display_type] = self._create(display_type)
+        self.idle_memory += self._footprints[display_type]
+        self._evict()
+        return True
+
+    def clear(self):
+        # Drop every display, even ones in use.
+        for display, _ in self._in_use.values():
+            display.teardown()
+        for display in self._idle.values():
+            display.teardown()
+        self._in_use = {}
+        self._idle = OrderedDict()
+        self._footprints = {}
+        self.idle_memory = 0
+        self.measured = {}
+
+    def _create(self, display_type: type[Display]) -> Display:
+        # Displays can say what they use, otherwise they get a fixed cost. Never what was measured, or replays
+        # would evict differently depending on whether tracemalloc was on.
+        tracing = tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        display = display_type.create(self._state)
+        if tracing:
+            self.measured[display_type] = max(0, tracemalloc.get_traced_memory()[0] - before)
+        self._footprints[display_type] = display.memory_footprint or DEFAULT_DISPLAY_FOOTPRINT
+        return display
+
+    def _evict(self):
+        while self._idle and (len(self._idle) > self.max_idle or self.idle_memory > self.max_memory):
+            display_type, display = self._idle.popitem(last=False)
+            self.idle_memory -= self._footprints.pop(display_type)
+            display.teardown()
+
+
+class PlayEvent(IntEnum):
+    DISPLAY_STARTED = 0
+    DISPLAY_FINISHED = 1
+    GAME_SUCCEEDED = 2
+    GAME_FAILED = 3
+    SPEEDUP = 4
+    # The session is over, either the player ran out of lives or the playlist ran out of games.
+    PLAY_OVER = 5
+    RESTART = 6
+
+
+# Called with the event, the PlayView, and the display it is about (None for SPEEDUP, PLAY_OVER, and RESTART).
+type PlayEventHandler = Callable[[PlayEvent, PlayView, Display | None], None]
+
+
+class PlayEvents:
+    # Tells anything that subscribed when the PlayView moves between displays and games end.
+    # Subscribers are held weakly so subscribing never keeps anything alive, a bound method is held
+    # as a weak reference to its object and the plain function so calling it doesn't create a new method.
+    # Each event's subscribers are a tuple which gets replaced when they change, so firing never allocates.
+
+    def __init__(self, view: PlayView) -> None:
+        self._view: PlayView = view
+        count = len(PlayEvent)
+        # (weak reference to the object or function, the function when it is a method or None)
+        self._now: list[tuple[tuple[ref, Callable | None], ...]] = [()] * count
+        self._deferred: list[tuple[tuple[ref, Callable | None], ...]] = [()] * count
+        # Deferred events fired this frame and the display each is about.
+        self._queued_events: list[PlayEvent] = []
+        self._queued_displays: list[Display | None] = []
+        self._dead: bool = False
+
+    def subscribe(self, event: PlayEvent, handler: PlayEventHandler, deferred: bool = False):
+        """Call handler whenever event fires. Deferred handlers get called at the end of the frame instead,
+        for work that doesn't need to happen right as the PlayView is switching displays."""
+        owner = getattr(handler, "__self__", None)
+        if owner is not None:
+            entry = (ref(owner, self._on_collected), handler.__func__)
+        else:
+            entry = (ref(handler, self._on_collected), None)
+        table = self._deferred if deferred else self._now
+        table[event] = table[event] + (entry,)
+
+    def unsubscribe(self, event: PlayEvent, handler: PlayEventHandler):
+        owner = getattr(handler, "__self__", None)
+        target, func = (owner, handler.__func__) if owner is not None else (handler, None)
+        for table in (self._now, self._deferred):
+            table[event] = tuple(entry for entry in table[event] if entry[0]() is not target or entry[1] is not func)
+
+    def _on_collected(self, _: ref):
+        # Dead references get skipped when firing and removed afterwards.
+        self._dead = True
+
+    def _prune(self):
+        self._dead = False
+        for table in (self._now, self._deferred):
+            for idx, entries in enumerate(table):
+                table[idx] = tuple(entry for entry in entries if entry[0]() is not None)
+
+    def _call(self, entries: tuple[tuple[ref, Callable | None], ...], event: PlayEvent, display: Display | None):
+        view = self._view
+        for owner, func in entries:
+            target = owner()
+            if target is None:
+                continue
+            if func is None:
+                target(event, view, display)
+            else:
+                func(target, event, view, display)
+
+    def fire(self, event: PlayEvent, display: Display | None = None):
+        if self._now[event]:
+            self._call(self._now[event], event, display)
+        if self._deferred[event]:
+            self._queued_events.append(event)
+            self._queued_displays.append(display)
+        if self._dead:
+            self._prune()
+
+    def flush(self):
+        # Call the deferred handlers, anything they fire waits for the next flush.
+        events, displays = self._queued_events, self._queued_displays
+        count = len(events)
+        for idx in range(count):
+            event = events[idx]
+            self._call(self._deferred[event], event, displays[idx])
+        del events[:count]
+        del displays[:count]
+        if self._dead:
+            self._prune()
+
+
+class FrameSnapshot:
+    # The PlayView's state taken once a frame, so reading it is only an attribute lookup and every
+    # display sees the same values for the whole frame. A new one replaces it rather than it changing,
+    # so holding onto one is safe.
+    __slots__ = (
+        "total_time", "start_time", "display_time", "remaining_time", "tick_speed",
+        "count", "speed", "strikes", "lives_remaining", "on_last_life", "is_speedup",
+        "has_game_finished", "has_game_succeeded", "has_play_finished", "cursor_position"
+    )
+
+    def __init__(self, source: PlayView) -> None:
+        total_time = source.play_clock.time
+        display_time = total_time - source.display_time
+        display = source.active_display
+
+        self.total_time: float = total_time
+        self.start_time: float = source.display_time
+        self.display_time: float = display_time
+        self.remaining_time: float = float('inf') if display is None else display.duration - display_time
+        self.tick_speed: float = source.tick_speed
+
+        self.count: int = source.count
+        self.speed: int = source.speed
+        self.strikes: int = source.strikes
+        self.lives_remaining: int = MAX_STRIKE_COUNT - source.strikes
+        self.on_last_life: bool = source.strikes == MAX_STRIKE_COUNT - 1
+        self.is_speedup: bool = source.is_speedup
+
+        self.has_game_finished: bool = source.active_game_succeeded is not None
+        self.has_game_succeeded: bool | None = source.active_game_succeeded
+        self.has_play_finished: bool = source.play_over
+        # Where the cursor was at the start of the frame, PlayState.cursor_position follows each input.
+        self.cursor_position: tuple[float, float] = source.cursor_position
+
+
 class PlayState:
     
     def __init__(self, source: PlayView) -> None:
         self._source: PlayView = source
 
+    @property
+    def events(self) -> PlayEvents:
+        # Subscribe to know when displays start and finish, games end, and speedups happen.
+        return self._source.events
+
+    @property
+    def frame(self) -> FrameSnapshot:
+        # This frame's snapshot, read this once when reading lots of the state in a loop.
+        return self._source.frame
+
     @property
     def cursor_position(self):
         # Position of the mouse cursor on screen
         return self._source.cursor_position
     
+    @property
+    def random(self) -> Random:
+        # The session's random numbers. Use this rather than the random module so sessions can be replayed.
+        return self._source.random
+
     @property
     def screen_width(self):
         # Screen width (may eventually not be the whole screen if there are frames)
@@ -157,25 +483,25 @@ class PlayState:
     @property
     def count(self) -> int:
         # The total number of games played this session
-        return self._source.count
+        return self._source.frame.count
     
     @property
     def speed(self) -> int:
         # What speed level the game is at currently
-        return self._source.speed
+        return self._source.frame.speed
 
     @property
     def strikes(self) -> int:
         # How many game's have been failed
-        return self._source.strikes
+        return self._source.frame.strikes
     
     @property
     def tick_speed(self) -> float:
-        return self._source.tick_speed
+        return self._source.frame.tick_speed
     
     @property
     def has_play_finished(self) -> bool:
-        return self._source.play_over
+        return self._source.frame.has_play_finished
     
     @property
     def max_strikes(self) -> int:
@@ -183,22 +509,22 @@ class PlayState:
 
     @property
     def lives_remaining(self) -> int:
-        return self.max_strikes - self.strikes
+        return self._source.frame.lives_remaining
 
     @property
     def on_last_life(self) -> bool:
         # Utill bool to check for last life
-        return self._source.strikes == MAX_STRIKE_COUNT - 1
+        return self._source.frame.on_last_life
     
     @property
     def has_game_finished(self) -> bool:
         # has the game currently playing or just played finish?
-        return self._source.active_game_succeeded is not None
+        return self._source.frame.has_game_finished
     
     @property
     def has_game_succeeded(self) -> bool | None:
         # was the game currently playing or just played won?
-        return self._source.active_game_succeeded
+        return self._source.frame.has_game_succeeded
     
     def set_game_succeeded(self, succeeded: bool):
         # Finish the current game and say wether it is done.
@@ -213,29 +539,37 @@ class PlayState:
     @property
     def is_speedup(self) -> bool:
         # Is the next game a speedup?
-        return self._source.count != 0 and self._source.count % SPEED_INCREASE_GAME_COUNT == 0
+        return self._source.frame.is_speedup
     
+    @property
+    def input_time(self) -> float:
+        # The play time the input being handled happened at, more precise than the frame.
+        return self._source.input_time
+
+    @property
+    def step_alpha(self) -> float:
+        # How far between the last two fixed updates this frame is, 0 to 1.
+        return self._source.step_alpha
+
     @property
     def total_time(self) -> float:
         # Total amount of time the current session has been running
-        return self._source.play_clock.time
+        return self._source.frame.total_time
     
     @property
     def start_time(self) -> float:
         # The time that the current display was shown
-        return self._source.display_time
+        return self._source.frame.start_time
 
     @property
     def display_time(self) -> float:
         # The time elapsed since the current display was shown
-        return self._source.play_clock.time - self._source.display_time
+        return self._source.frame.display_time
 
     @property
     def remaining_time(self) -> float:
         # The time left for the current game
-        if self._source.active_display is None:
-            return float('inf')
-        return self._source.active_display.duration - (self._source.play_clock.time - self._source.display_time)
+        return self._source.frame.remaining_time
 
     @property
     def next_prompt(self):
@@ -244,6 +578,11 @@ class PlayState:
             return ""
         return self._source.next_game.prompt
 
+    @property
+    def upcoming(self) -> tuple[type[Game], ...]:
+        # The games after the next game, as far ahead as the playlist looks. They might not be created yet.
+        return self._source.playlist.upcoming()
+
     @property
     def next_controls(self):
         # what are the controls for the next game
@@ -254,8 +593,31 @@ class PlayState:
 
 class PlayView(ArcadeView):
     
-    def __init__(self, games: Iterable[type[Game]], transitions: Iterable[type[Transition]], fails: Iterable[type[Fail]]):
+    def __init__(self, games: Iterable[type[Game]], transitions: Iterable[type[Transition]], fails: Iterable[type[Fail]], seed: int | None = None):
         ArcadeView.__init__(self)
+        # Every random choice in a session comes from here, so the seed and the inputs are enough to replay it.
+        self.seed: int = randrange(1 << 32) if seed is None else seed
+        self.random: Random = Random(self.seed)
+        # When set every frame and input gets recorded, see engine.replay.
+        self.recording: InputRecording | None = None
+        # Whether we are inside on_update or an input, anything they cause is replayed by replaying them.
+        self._dispatching: bool = False
+        # Input waiting for the next update, and the play time of the input being handled.
+        self._input: InputBuffer = InputBuffer()
+        self.input_time: float = 0.0
+        # When the last update happened, to work out when input between updates happened.
+        self._tick_real_time: float = perf_counter()
+        # How long every display takes to update and draw, exported to timings_path at the end of each session if set.
+        self.timings: FrameTimings = FrameTimings()
+        self.timings_path: Path | None = None
+        # Optionally watches for frames which take far too long, see engine.watchdog.
+        self.watchdog: Watchdog | None = None
+        # The game which has had its GL work done ahead of time, and what that work gets drawn into. See warm_up.
+        self._warmed: Game | None = None
+        self._warm_up_framebuffer: gl.Framebuffer | None = None
+        # Optionally keeps the result of every game and run, see engine.stats.
+        self.stats: SessionStats | None = None
+
         # Store the cursor position incase either the Game or Transition want to use it.
         self._cursor_position: tuple[float, float] = (0.0, 0.0)
 
@@ -282,32 +644,55 @@ class PlayView(ArcadeView):
         self.display_time: float = 0.0
         # The clock that gets faster and faster.
         self.play_clock: Clock = Clock(0.0, 0, 1.0)
+        # Play time not yet simulated by a FIXED_STEP display, and how far through the next step that is.
+        self._step_accumulator: float = 0.0
+        self.step_alpha: float = 0.0
 
-        # A read only view of the PlayView.
+        # A read only view of the PlayView, and the snapshot of it displays read each frame.
         self.state: PlayState = PlayState(self)
-
-        # The list of possible games/counters to pick from
-        self._games: tuple[Game, ...] = tuple(game.create(self.state) for game in games)
-        self._transitions: tuple[Transition, ...] = tuple(transition.create(self.state) for transition in transitions)
-        self._fails: tuple[Fail, ...] = tuple(fail.create(self.state) for fail in fails)
-
-        # Whether or not to use bags to pick which game/transition to use.
-        self._pick_games_bagged: bool = True
-        self._game_bag: list[Game] = list(self._games)
+        self.frame: FrameSnapshot = FrameSnapshot(self)
+        self.events: PlayEvents = PlayEvents(self)
+
+        # The list of possible games/counters to pick from. They only get created when picked.
+        self._games: tuple[type[Game], ...] = tuple(games)
+        self._transitions: tuple[type[Transition], ...] = tuple(transitions)
+        self._fails: tuple[type[Fail], ...] = tuple(fails)
+        self._displays: DisplayCache = DisplayCache(self.state)
+
+        # The order the games get played in, replace it to change the mode i.e. with engine.playlist.OrderedPlaylist.
+        # By default the scheduler picks forever, every game getting played before any repeat.
+        self._scheduler: GameScheduler = GameScheduler(self._games, self.random, bagged=True)
+        self.playlist: Playlist = EndlessPlaylist(self._scheduler)
+        # Whether or not to use bags to pick which transition to use.
         self._pick_transitions_bagged: bool = False
-        self._transition_bag: list[Transition] = list(self._transitions)
+        self._transition_bag: list[type[Transition]] = list(self._transitions)
 
         self.remaining_bar = TimeBar(Vec2(0, 0))
-        self.remaining_bar.position = Vec2(self.width, self.remaining_bar.back_sprite.height)
+        self.remaining_bar.position = Vec2(self.width, self.remaining_bar.size.y)
         self.control_icon = Sprite(None, center_x=self.center_x, center_y=self.center_y + 30)
         self.prompt_text = Text('PROMPT!', self.center_x, self.center_y - 30, anchor_x = "center", anchor_y = "top", font_size = 48, font_name = "A-OTF Shin Go Pro", bold = True)
 
         self.stall_text = Text("We think the game might have stalled... press [END] to skip!", 5, 5, anchor_x = "left", anchor_y = "bottom", font_size = 11, font_name = "A-OTF Shin Go Pro")
 
+        # Everything drawn over the displays other than the bar, shown and hidden rather than drawn one by one.
+        self.overlay = DisplayBatch(pixelated = True)
+        self.overlay.add_sprite(self.control_icon)
+        self.overlay.add_text(self.prompt_text)
+        self.overlay.add_text(self.stall_text)
+
     @property
     def cursor_position(self):
         return self._cursor_position
 
+    @property
+    def is_speedup(self) -> bool:
+        # Is the next game a speedup?
+        return self.count != 0 and self.count % SPEED_INCREASE_GAME_COUNT == 0
+
+    def publish_frame(self):
+        # Take a new snapshot for the displays, each time the clock ticks or something they can see changes.
+        self.frame = FrameSnapshot(self)
+
     @property
     def active_display(self) -> Display | None:
         return self._active_display
@@ -324,25 +709,69 @@ class PlayView(ArcadeView):
     def active_game(self) -> Game | None:
         return self._active_game
 
+    @property
+    def displays(self) -> DisplayCache:
+        return self._displays
+
+    @property
+    def games(self) -> tuple[type[Game], ...]:
+        return self._games
+
+    @property
+    def scheduler(self) -> GameScheduler:
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, scheduler: GameScheduler):
+        # A new scheduler only means something to an endless playlist.
+        self._scheduler = scheduler
+        self.playlist = EndlessPlaylist(scheduler, self.playlist.lookahead)
+
+    @property
+    def transitions(self) -> tuple[type[Transition], ...]:
+        return self._transitions
+
+    @property
+    def fails(self) -> tuple[type[Fail], ...]:
+        return self._fails
+
     def on_show_view(self) -> None:
+        if self.watchdog is not None:
+            self.watchdog.start()
         self.next_displayable()
 
+    def on_hide_view(self) -> None:
+        if self.watchdog is not None:
+            self.watchdog.pause()
+
     def next_displayable(self):
+        # Mostly creating the next display, which isn't the one that just finished's fault.
+        self.beat("switch")
+        switch_start = perf_counter_ns()
         # First time we call this method is when the view is shown so we need to pick
         # the next game. Could this be done in a setup method?
-        if self._next_game is None:
-            self._next_game = self.pick_game()
+        if self._active_display is None and self._next_game is None:
+            self._next_game = self._acquire_next_game()
 
         if self._active_display is not None:
+            self.events.fire(PlayEvent.DISPLAY_FINISHED, self._active_display)
             self._active_display.finish()
-        self._active_display
+            self._displays.release(self._active_display)
+
+        if self._active_transition is None and self._next_game is None:
+            # The playlist has run out of games so the session is over.
+            self.play_over = True
+            self.export_timings()
 
         if self.play_over:
+            if not isinstance(self._active_display, Fail):
+                # Only once the last game has finished, not when moving between fail displays.
+                self.events.fire(PlayEvent.PLAY_OVER)
             self._active_game = self._active_transition = None
-            self._active_display = self.pick_fail()
+            self._active_display = self._displays.acquire(self.pick_fail())
         elif self._active_transition is None and self._active_transition is None:
             # show transition as either the first display, or after a game.
-            transition = self.pick_transition()
+            transition = self._displays.acquire(self.pick_transition())
             self._active_game = None
             self._active_transition = self._active_display = transition
             self.prompt_text.text = self._next_game.prompt
@@ -350,19 +779,24 @@ class PlayView(ArcadeView):
             self.control_icon.size = (128, 128)
         else:
             # Show a game after a transition.
-            if self.state.is_speedup:
+            if self.is_speedup:
                 # This works because we:
                 # iterate the count -> move to transition -> speed up -> move to game
                 self.speedup_game()
             self._active_transition = self.active_game_succeeded = None
             self._active_game = self._active_display = self._next_game
-            self._next_game = self.pick_game()
+            self._next_game = self._acquire_next_game()
             # setup the next display.
         self.display_time = self.play_clock.time
+        self._step_accumulator = self.step_alpha = 0.0
+        self.publish_frame()
         self._active_display.start()
-        
-    def pick_transition(self) -> Transition:
-        shuffle(self._transition_bag)
+        self.events.fire(PlayEvent.DISPLAY_STARTED, self._active_display)
+        self.timings.add(type(self._active_display), "switch", self.speed, perf_counter_ns() - switch_start)
+        self.beat()
+
+    def pick_transition(self) -> type[Transition]:
+        self.random.shuffle(self._transition_bag)
         transition = self._transition_bag[-1]
         if not self._pick_transitions_bagged:
             return transition
@@ -371,26 +805,79 @@ class PlayView(ArcadeView):
             self._transition_bag = list(self._transitions)
         return transition
 
-    def pick_game(self) -> Game:
-        shuffle(self._game_bag)
-        game = self._game_bag[-1]
-        if not self._pick_games_bagged:
-            return game
-        self._game_bag.pop()
-        if not self._game_bag:
-            self._game_bag = list(self._games)
-        return game
+    def pick_game(self) -> type[Game] | None:
+        return self.playlist.next()
+
+    def _acquire_next_game(self) -> Game | None:
+        game = self.pick_game()
+        return None if game is None else self._displays.acquire(game)
+
+    def preload_upcoming(self) -> bool:
+        # Create the first upcoming game that isn't cached yet, returns False when they all are.
+        for game in self.playlist.upcoming(self._displays.max_idle):
+            if game in self._displays:
+                continue
+            self.beat("preload", game)
+            start = perf_counter_ns()
+            self._displays.preload(game)
+            self.timings.add(game, "preload", self.speed, perf_counter_ns() - start)
+            self.beat()
+            return True
+        return False
     
-    def pick_fail(self) -> Fail:
-        return choice(self._fails)
+    def warm_up(self, display: Display):
+        # Do a display's GL work before it is shown, see Display.prepare. Timed as its own phase.
+        self.beat("warmup", display)
+        calls = glcounters.snapshot() if glcounters.is_enabled() else None
+        start = perf_counter_ns()
+        if self._warm_up_framebuffer is None:
+            # Only the work matters, not what gets drawn, so one pixel is plenty.
+            self._warm_up_framebuffer = self.window.ctx.framebuffer(color_attachments=[self.window.ctx.texture((1, 1), components=4)])
+        with self._warm_up_framebuffer.activate():
+            display.prepare()
+        self.timings.add(type(display), "warmup", self.speed, perf_counter_ns() - start)
+        if calls is not None:
+            self.add_calls(display, "warmup", calls)
+        self.beat()
+
+    def prepare_upcoming(self):
+        # Nothing is being played during a transition so it is a good time to get the games coming up ready,
+        # one thing a frame. After the transition's update so it isn't counted as part of it.
+        if self._active_transition is None:
+            return
+        if self._next_game is not None and self._warmed is not self._next_game:
+            self._warmed = self._next_game
+            self.warm_up(self._next_game)
+        else:
+            self.preload_upcoming()
+
+    def pick_fail(self) -> type[Fail]:
+        return self.random.choice(self._fails)
 
     def game_succeeded(self, succeeded: bool):
         if not self._active_game:
             return
         
+        changed = self.active_game_succeeded is not succeeded
         self.active_game_succeeded = succeeded
+        self.publish_frame()
+        if changed:
+            self.events.fire(PlayEvent.GAME_SUCCEEDED if succeeded else PlayEvent.GAME_FAILED, self._active_game)
 
     def restart(self):
+        self._record_action(RecordKind.RESTART)
+        # Finished before anything gets reset, so it still sees the frame of the session it was part of.
+        if self._active_display is not None:
+            self.events.fire(PlayEvent.DISPLAY_FINISHED, self._active_display)
+            self._active_display.finish()
+            self._displays.release(self._active_display)
+        if self._next_game is not None:
+            self._displays.release(self._next_game)
+        # Input from the last session isn't for this one, even if it is part way through being handled.
+        self._input.clear()
+        self.input_time = 0.0
+        self._warmed = None
+
         # Store the cursor position incase either the Game or Transition want to use it.
         self._cursor_position: tuple[float, float] = (0.0, 0.0)
 
@@ -402,9 +889,6 @@ class PlayView(ArcadeView):
         # The play is over so let's show the FailDisplay
         self.play_over: bool = False
 
-        if self._active_display is not None:
-            self._active_display.finish()
-
         # The active display is the type indifferent version of active game and counter
         # do we need both? maybe not, but keeping them seperate gives us more control.
         self._active_display: Display | None = None
@@ -420,49 +904,95 @@ class PlayView(ArcadeView):
         self.display_time: float = 0.0
         # The clock that gets faster and faster.
         self.play_clock: Clock = Clock(0.0, 0, 1.0)
+        self._step_accumulator = self.step_alpha = 0.0
 
-        # Whether or not to use bags to pick which game/transition to use.
-        self._pick_games_bagged: bool = True
-        self._game_bag: list[Game] = list(self._games)
+        self.playlist.reset()
+        # Whether or not to use bags to pick which transition to use.
         self._pick_transitions_bagged: bool = False
-        self._transition_bag: list[Transition] = list(self._transitions)
+        self._transition_bag: list[type[Transition]] = list(self._transitions)
+
+        self.publish_frame()
+        self.events.fire(PlayEvent.RESTART)
+        self.next_displayable()
 
+    def skip_display(self):
+        # Move on from the active display early, i.e. when it has stalled.
+        self._record_action(RecordKind.SKIP)
         self.next_displayable()
 
+    def _record_action(self, kind: RecordKind):
+        # Anything done while updating or handling input happens again when they are replayed.
+        if self.recording is None or self._dispatching:
+            return
+        self.recording.add(kind, self.play_clock.time)
+
     def quit(self):
+        self.export_timings()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        if self.stats is not None:
+            self.stats.close()
+        self._displays.clear()
         self.window.close()
 
     def play_failed(self):
         self.play_over = True
+        self.export_timings()
         self.next_displayable()
 
+    def export_timings(self):
+        if self.timings_path is not None and len(self.timings):
+            self.timings.export(self.timings_path)
+
     def speedup_game(self):
         self.speed += 1
         self.tick_speed = 1.0 + self.speed * SPEED_INCREASE_STEP_SIZE
         self.play_clock.set_tick_speed(self.tick_speed)
+        self.events.fire(PlayEvent.SPEEDUP)
+
+    def beat(self, phase: str = "other", display: Display | type[Display] | None = None):
+        # Tell the watchdog what we're about to do, so a stall gets blamed on the right phase and display.
+        if self.watchdog is not None:
+            self.watchdog.beat(phase, display)
 
     def on_update(self, delta_time: float) -> bool | None:
-        self.play_clock.tick(delta_time)
-        if self._active_game is not None:
-            self.update_game(self.play_clock.delta_time)
-            self.remaining_bar.percentage = min(1, self.state.remaining_time / COUNTDOWN_TIME)
-            return
-        elif self._active_transition is not None:
-            self.update_transition(self.play_clock.delta_time)
-            return
+        if self.watchdog is not None and self.watchdog.take_skip():
+            # The active display keeps stalling, so we give up on it.
+            self.skip_display()
+        self.beat("update", self._active_display)
+        if self.recording is not None:
+            self.recording.tick(delta_time)
+        self._dispatching = True
+        try:
+            self.play_clock.tick(delta_time)
+            self._tick_real_time = perf_counter()
+            self.publish_frame()
+            self.flush_input()
+            if self._active_game is not None:
+                self.update_game(self.play_clock.delta_time)
+                self.remaining_bar.percentage = min(1, self.frame.remaining_time / COUNTDOWN_TIME)
+            elif self._active_transition is not None:
+                self.update_transition(self.play_clock.delta_time)
+        finally:
+            self._dispatching = False
+        self.events.flush()
+        self.prepare_upcoming()
+        self.beat()
 
     def update_game(self, delta_time: float):
         if self._active_game is None:
             raise ValueError('There is no active game to update.')
 
         # TODO: this will be called every frame after the game is technically finished which we don't want.
-        if self.state.display_time >= self._active_game.duration:
+        if self.frame.display_time >= self._active_game.duration:
             self._active_game.on_time_runout()
 
         if self.active_game_succeeded is not None:
             if not self.active_game_succeeded:
                 self.strikes += 1
             self.count += 1
+            # Before anything fires, so DISPLAY_FINISHED and PLAY_OVER see the new count and strikes.
+            self.publish_frame()
             if self.strikes >= MAX_STRIKE_COUNT:
                 # The play session is finished.
                 self.play_failed()
@@ -471,60 +1001,161 @@ class PlayView(ArcadeView):
             # the game is finsihed
             return
         
-        self._active_game.update(delta_time)
+        self.step_display(self._active_game, delta_time)
+
+    def step_display(self, display: Display, delta_time: float):
+        calls = glcounters.snapshot() if glcounters.is_enabled() else None
+        start = perf_counter_ns()
+        self._step_display(display, delta_time)
+        self.timings.add(type(display), "update", self.speed, perf_counter_ns() - start)
+        if calls is not None:
+            self.add_calls(display, "update", calls)
+
+    def add_calls(self, display: Display, phase: str, before: tuple[int, ...]):
+        # File the GL work done since the before snapshot, see engine.glcounters.
+        after = glcounters.snapshot()
+        self.timings.add_calls(type(display), phase, [now - then for now, then in zip(after, before)])
+
+    def _step_display(self, display: Display, delta_time: float):
+        if not display.FIXED_STEP:
+            display.update(delta_time)
+            return
+
+        # Only ever update in steps of the same length of play time, so the display acts the same
+        # no matter the frame rate or speed. Any time left over carries into the next frame.
+        self._step_accumulator += delta_time
+        steps = 0
+        # The tiny leeway stops float error from dropping a step when the frame time is a multiple of the step.
+        while self._step_accumulator > FIXED_STEP_TIME - 1e-9:
+            if steps >= MAX_FIXED_STEPS:
+                # We are too far behind to ever catch up, so drop the backlog rather than spiral.
+                self._step_accumulator %= FIXED_STEP_TIME
+                break
+            display.update(FIXED_STEP_TIME)
+            self._step_accumulator -= FIXED_STEP_TIME
+            steps += 1
+            if display is self._active_game and self.active_game_succeeded is not None:
+                break
+        self.step_alpha = max(0.0, self._step_accumulator / FIXED_STEP_TIME)
 
     def update_transition(self, delta_time: float):
         if self._active_transition is None:
             raise ValueError('There is no active trasition to update.')
         
-        if self.state.display_time >= self._active_transition.duration:
+        if self.frame.display_time >= self._active_transition.duration:
             self.next_displayable()
             return
 
-        self._active_transition.update(delta_time)
+        self.step_display(self._active_transition, delta_time)
 
     def on_draw(self) -> bool | None:
         self.clear()
-        if self._active_display:
-            self._active_display.draw()
-        if self._active_game and self.state.remaining_time <= COUNTDOWN_TIME:
+        if self._active_display is None:
+            return
+        self.beat("draw", self._active_display)
+        if glcounters.is_enabled():
+            self.draw_counted()
+            return
+        start = perf_counter_ns()
+        self._active_display.draw()
+        overlay_start = perf_counter_ns()
+        self.draw_overlay()
+        end = perf_counter_ns()
+        self.timings.add(type(self._active_display), "draw", self.speed, overlay_start - start)
+        self.timings.add(type(self._active_display), "overlay", self.speed, end - overlay_start)
+        self.beat()
+
+    def draw_counted(self):
+        # The same as on_draw while the GL work is being counted, kept apart so on_draw doesn't pay for it.
+        display = self._active_display
+        assert display is not None
+        calls = glcounters.snapshot()
+        start = perf_counter_ns()
+        display.draw()
+        draw_end = perf_counter_ns()
+        self.add_calls(display, "draw", calls)
+        calls = glcounters.snapshot()
+        overlay_start = perf_counter_ns()
+        self.draw_overlay()
+        end = perf_counter_ns()
+        self.add_calls(display, "overlay", calls)
+        self.timings.add(type(display), "draw", self.speed, draw_end - start)
+        self.timings.add(type(display), "overlay", self.speed, end - overlay_start)
+        self.beat()
+
+    def draw_overlay(self):
+        frame = self.frame
+        if self._active_game and frame.remaining_time <= COUNTDOWN_TIME:
             self.remaining_bar.draw()
 
-        if (self._active_transition and self.state.remaining_time <= CONTROL_START) or (self._active_game and self.state.display_time <= CONTROL_END):
-            draw_sprite(self.control_icon, pixelated = True)
-
-        if (self._active_transition and self.state.remaining_time <= PROMPT_START) or (self._active_game and self.state.display_time <= PROMPT_END):
-            self.prompt_text.draw()
-
-        if self._active_display and self._active_display.state.display_time > STALL_TIME:
-            self.stall_text.draw()
+        self.control_icon.visible = bool((self._active_transition and frame.remaining_time <= CONTROL_START) or (self._active_game and frame.display_time <= CONTROL_END))
+        self.prompt_text.visible = bool((self._active_transition and frame.remaining_time <= PROMPT_START) or (self._active_game and frame.display_time <= PROMPT_END))
+        self.stall_text.visible = bool(self._active_display and frame.display_time > STALL_TIME)
+        self.overlay.draw()
 
     def on_key_press(self, symbol: int, modifiers: int) -> bool | None:
-        if self._active_display is None:
-            return
-        self._active_display.on_input(symbol, modifiers, True)
+        self.push_input(RecordKind.KEY_PRESS, symbol, modifiers)
 
     def on_key_release(self, symbol: int, modifiers: int) -> bool | None:
-        if self._active_display is None:
-            return
-        self._active_display.on_input(symbol, modifiers, False)
-        if self._active_display.state.display_time > STALL_TIME and symbol == arcade.key.END:
-            self.next_displayable()
+        self.push_input(RecordKind.KEY_RELEASE, symbol, modifiers)
 
     def on_mouse_press(self, x: int, y: int, button: int, modifiers: int) -> bool | None:
-        self._cursor_position = (x, y)
-        if self._active_display is None:
-            return
-        self._active_display.on_input(button, modifiers, True)
+        self.push_input(RecordKind.MOUSE_PRESS, button, modifiers, x, y)
     
     def on_mouse_release(self, x: int, y: int, button: int, modifiers: int) -> bool | None:
-        self._cursor_position = (x, y)
-        if self._active_display is None:
-            return
-        self._active_display.on_input(button, modifiers, False)
+        self.push_input(RecordKind.MOUSE_RELEASE, button, modifiers, x, y)
 
     def on_mouse_motion(self, x: int, y: int, dx: int, dy: int) -> bool | None:
-        self._cursor_position = (x, y)
+        self.push_input(RecordKind.MOUSE_MOTION, 0, 0, x, y, dx, dy)
+
+    def push_input(self, kind: RecordKind, symbol: int = 0, modifiers: int = 0, x: float = 0.0, y: float = 0.0, dx: float = 0.0, dy: float = 0.0, time: float | None = None):
+        # Every input goes through here so it can be recorded with the play time it happened at.
+        # It is buffered and handed to the active display at the start of the next update.
+        if time is None:
+            # More precise than the frame, though only as precise as when the window got the event.
+            time = self.play_clock.time + (perf_counter() - self._tick_real_time) * self.tick_speed
+        if self.recording is not None:
+            self.recording.add(kind, time, symbol, modifiers, x, y, dx, dy)
+        self._input.push(Record(kind, time, symbol, modifiers, x, y, dx, dy))
+
+    def flush_input(self):
+        for event in self._input.drain():
+            if isinstance(event, list):
+                self._handle_motion(event)
+            else:
+                self._handle_input(event)
+
+    def _handle_input(self, event: Record):
+        # Input can't come from the future even if the frame it arrived in was slow.
+        self.input_time = min(event.time, self.play_clock.time)
+        if event.kind != RecordKind.KEY_PRESS and event.kind != RecordKind.KEY_RELEASE:
+            self._cursor_position = (event.x, event.y)
         if self._active_display is None:
             return
-        self._active_display.on_cursor_motion(x, y, dx, dy)
+
+        match event.kind:
+            case RecordKind.KEY_PRESS | RecordKind.MOUSE_PRESS:
+                self._active_display.on_input(event.symbol, event.modifiers, True)
+            case RecordKind.KEY_RELEASE:
+                self._active_display.on_input(event.symbol, event.modifiers, False)
+                if self.frame.display_time > STALL_TIME and event.symbol == arcade.key.END:
+                    self.next_displayable()
+            case RecordKind.MOUSE_RELEASE:
+                self._active_display.on_input(event.symbol, event.modifiers, False)
+
+    def _handle_motion(self, events: list[Record]):
+        last = events[-1]
+        self._cursor_position = (last.x, last.y)
+        display = self._active_display
+        if display is None:
+            return
+
+        if display.MOTION_SAMPLES:
+            for event in events:
+                self.input_time = min(event.time, self.play_clock.time)
+                display.on_cursor_motion(event.x, event.y, event.dx, event.dy)
+            return
+
+        # Most displays only care where the cursor ended up, so one call covers all of the motion.
+        self.input_time = min(last.time, self.play_clock.time)
+        display.on_cursor_motion(last.x, last.y, sum(event.dx for event in events), sum(event.dy for event in events))
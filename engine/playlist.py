@@ -0,0 +1,141 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from collections.abc import Iterable, Sequence
+from collections import deque
+from random import Random
+
+from engine.schedule import GameScheduler
+
+if TYPE_CHECKING:
+    from engine.play import Game
+    from engine.finder import PackManager
+
+__all__ = (
+    "Playlist",
+    "EndlessPlaylist",
+    "OrderedPlaylist",
+    "GrabBagPlaylist",
+    "pack_playlist",
+)
+
+# How many games a playlist works out at once, and so how far ahead the PlayView can see.
+DEFAULT_LOOKAHEAD = 5
+
+
+class Playlist:
+    # The order games get played in a session, worked out a chunk of games ahead of time.
+    # Subclasses only have to say what the next chunk is.
+
+    def __init__(self, lookahead: int = DEFAULT_LOOKAHEAD) -> None:
+        self.lookahead: int = max(1, lookahead)
+        self._queue: deque[type[Game]] = deque()
+        self._exhausted: bool = False
+
+    def _chunk(self, count: int) -> Iterable[type[Game]]:
+        """Up to count more games, fewer once the playlist is ending and none after it has."""
+        raise NotImplementedError()
+
+    def _restart(self):
+        pass
+
+    def _fill(self):
+        while not self._exhausted and len(self._queue) < self.lookahead:
+            chunk = tuple(self._chunk(self.lookahead))
+            if not chunk:
+                self._exhausted = True
+                return
+            self._queue.extend(chunk)
+
+    @property
+    def finished(self) -> bool:
+        self._fill()
+        return not self._queue
+
+    def upcoming(self, count: int | None = None) -> tuple[type[Game], ...]:
+        """The games that will be played next, in order, without moving on."""
+        self._fill()
+        count = self.lookahead if count is None else min(count, self.lookahead)
+        queue = self._queue
+        return tuple(queue[idx] for idx in range(min(count, len(queue))))
+
+    def next(self) -> type[Game] | None:
+        """Move on to the next game, None once there are no more."""
+        self._fill()
+        if not self._queue:
+            return None
+        return self._queue.popleft()
+
+    def reset(self):
+        self._queue.clear()
+        self._exhausted = False
+        self._restart()
+
+
+class EndlessPlaylist(Playlist):
+    # Keep picking games with a scheduler until the player runs out of lives.
+
+    def __init__(self, scheduler: GameScheduler, lookahead: int = DEFAULT_LOOKAHEAD) -> None:
+        super().__init__(lookahead)
+        self.scheduler: GameScheduler = scheduler
+
+    def _chunk(self, count: int) -> Iterable[type[Game]]:
+        return [self.scheduler.pick() for _ in range(count)]
+
+    def _restart(self):
+        self.scheduler.reset()
+
+
+class OrderedPlaylist(Playlist):
+    # Play the games in the order given, optionally starting over when they run out.
+
+    def __init__(self, games: Sequence[type[Game]], loop: bool = False, lookahead: int = DEFAULT_LOOKAHEAD) -> None:
+        super().__init__(lookahead)
+        self.games: tuple[type[Game], ...] = tuple(games)
+        self.loop: bool = loop
+        self._position: int = 0
+
+    def _chunk(self, count: int) -> Iterable[type[Game]]:
+        games = self.games
+        if not games:
+            return ()
+        if self.loop:
+            chunk = [games[(self._position + idx) % len(games)] for idx in range(count)]
+        else:
+            chunk = list(games[self._position:self._position + count])
+        self._position += len(chunk)
+        return chunk
+
+    def _restart(self):
+        self._position = 0
+
+
+class GrabBagPlaylist(Playlist):
+    # A handful of games picked at random from a larger set, each played once.
+
+    def __init__(self, games: Sequence[type[Game]], size: int, rng: Random, lookahead: int = DEFAULT_LOOKAHEAD) -> None:
+        super().__init__(lookahead)
+        self.games: tuple[type[Game], ...] = tuple(games)
+        self.size: int = min(size, len(self.games))
+        self.rng: Random = rng
+        self._bag: list[type[Game]] | None = None
+
+    def _chunk(self, count: int) -> Iterable[type[Game]]:
+        if self._bag is None:
+            # Drawn on the first chunk rather than when created, so the session's random numbers stay in order.
+            self._bag = self.rng.sample(self.games, self.size)
+        chunk = self._bag[:count]
+        del self._bag[:count]
+        return chunk
+
+    def _restart(self):
+        self._bag = None
+
+
+def pack_playlist(pack: str, rng: Random, manager: PackManager | None = None, ordered: bool = False, include_external: bool = True, lookahead: int = DEFAULT_LOOKAHEAD) -> Playlist:
+    """Only play the games from one pack, either in the order the pack gives or endlessly shuffled."""
+    if manager is None:
+        from engine.finder import packs as manager
+    games = manager.get_pack_games(pack, include_external)
+    if ordered:
+        return OrderedPlaylist(games, lookahead=lookahead)
+    return EndlessPlaylist(GameScheduler(games, rng, bagged=True), lookahead)
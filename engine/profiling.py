@@ -0,0 +1,270 @@
+"""Frame timing histograms for every display the PlayView shows.
+
+Times are CPU time spent in python and submitting GL work, the GPU runs behind so
+a slow draw here is slow to submit rather than slow to render.
+
+Every histogram is kept twice, once for the whole session and once rolling over only the latest
+frames, so a stutter a minute ago isn't drowned out by twenty minutes of smooth frames before it.
+"""
+from __future__ import annotations
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from pathlib import Path
+from array import array
+from math import log2
+import json
+
+__all__ = (
+    "Histogram",
+    "RollingHistogram",
+    "CallCounts",
+    "FrameTimings",
+    "display_name",
+    "PHASES",
+)
+
+# update: the display's update. draw: the display's draw. overlay: the PlayView's prompt, controls, and timer
+# drawn over the display. switch: moving onto the display, which includes creating it if it isn't cached.
+# preload: creating the display ahead of time during a transition. warmup: the next game's GL work done
+# ahead of time during a transition, see Display.prepare.
+PHASES = ("update", "draw", "overlay", "switch", "preload", "warmup")
+
+# Buckets per doubling of time, 16 keeps every bucket within ~4.4% of the real time.
+SUB_BUCKETS = 16
+# 2^40ns is around 18 minutes, plenty for one frame.
+BUCKET_COUNT = 40 * SUB_BUCKETS
+# Samples the rolling histograms keep per half, around 10 seconds of a display's frames at 60fps.
+ROLLING_WINDOW = 600
+
+_NAMES: dict[type, str] = {}
+
+
+def display_name(display_type: type) -> str:
+    name = _NAMES.get(display_type)
+    if name is None:
+        name = _NAMES[display_type] = f"{display_type.__module__}.{display_type.__qualname__}"
+    return name
+
+
+class Histogram:
+    # Log spaced buckets of nanosecond times, adding is constant time and the memory never grows.
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.buckets: array[int] = array("Q", bytes(8 * BUCKET_COUNT))
+        self.count: int = 0
+        self.total: int = 0
+        self.max: int = 0
+
+    def add(self, ns: int):
+        idx = 0 if ns <= 1 else min(BUCKET_COUNT - 1, int(log2(ns) * SUB_BUCKETS))
+        self.buckets[idx] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other: Histogram):
+        buckets = self.buckets
+        for idx, count in enumerate(other.buckets):
+            if count:
+                buckets[idx] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def clear(self):
+        self.buckets = array("Q", bytes(8 * BUCKET_COUNT))
+        self.count = self.total = self.max = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """The time in nanoseconds which p (0 to 1) of the samples are at or under."""
+        if not self.count:
+            return 0.0
+        target = max(1, int(p * self.count + 0.5))
+        seen = 0
+        for idx, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                if idx == BUCKET_COUNT - 1:
+                    # The last bucket has no top, it holds everything too slow for the rest.
+                    return float(self.max)
+                # The top of the bucket, but never past the slowest sample.
+                return min(2.0 ** ((idx + 1) / SUB_BUCKETS), float(self.max))
+        return float(self.max)
+
+    def summary(self) -> dict[str, float]:
+        # In milliseconds which is easier to read against a 16.6ms frame.
+        return {
+            "count": self.count,
+            "mean": self.mean / 1e6,
+            "p50": self.percentile(0.5) / 1e6,
+            "p95": self.percentile(0.95) / 1e6,
+            "p99": self.percentile(0.99) / 1e6,
+            "max": self.max / 1e6,
+        }
+
+
+class RollingHistogram:
+    # Only the latest samples, kept in two halves. When the newer half fills up the older one is
+    # emptied and they swap, so reading merges between one and two windows of the latest samples.
+    __slots__ = ("window", "current", "previous")
+
+    def __init__(self, window: int = ROLLING_WINDOW) -> None:
+        self.window: int = window
+        self.current: Histogram = Histogram()
+        self.previous: Histogram = Histogram()
+
+    def add(self, ns: int):
+        current = self.current
+        if current.count >= self.window:
+            current, self.previous = self.previous, current
+            current.clear()
+            self.current = current
+        current.add(ns)
+
+    def histogram(self) -> Histogram:
+        merged = Histogram()
+        merged.merge(self.previous)
+        merged.merge(self.current)
+        return merged
+
+
+class CallCounts:
+    # The GL work counted over every frame of one display's phase, see engine.glcounters.
+    __slots__ = ("frames", "totals", "max")
+
+    def __init__(self, size: int) -> None:
+        self.frames: int = 0
+        self.totals: list[int] = [0] * size
+        self.max: list[int] = [0] * size
+
+    def add(self, counts: Sequence[int]):
+        self.frames += 1
+        totals, highest = self.totals, self.max
+        for idx, count in enumerate(counts):
+            totals[idx] += count
+            if count > highest[idx]:
+                highest[idx] = count
+
+    def summary(self, names: Sequence[str]) -> dict[str, float]:
+        # The mean and most of each counter in a frame.
+        frames = self.frames or 1
+        row: dict[str, float] = {"frames": self.frames}
+        for idx, name in enumerate(names):
+            row[name] = self.totals[idx] / frames
+            row[f"{name}_max"] = self.max[idx]
+        return row
+
+
+class FrameTimings:
+    # One histogram per display type, phase, and speed level, for the whole session and rolling.
+
+    def __init__(self, window: int = ROLLING_WINDOW) -> None:
+        self.window: int = window
+        self._histograms: dict[tuple[type, str, int], Histogram] = {}
+        self._recent: dict[tuple[type, str, int], RollingHistogram] = {}
+        # GL work per display type and phase, only when it's being counted.
+        self._calls: dict[tuple[type, str], CallCounts] = {}
+        self.started: datetime = datetime.now()
+
+    def __len__(self) -> int:
+        return len(self._histograms)
+
+    def add(self, display_type: type, phase: str, speed: int, ns: int):
+        key = (display_type, phase, speed)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+            self._recent[key] = RollingHistogram(self.window)
+        histogram.add(ns)
+        self._recent[key].add(ns)
+
+    def add_calls(self, display_type: type, phase: str, counts: Sequence[int]):
+        key = (display_type, phase)
+        calls = self._calls.get(key)
+        if calls is None:
+            calls = self._calls[key] = CallCounts(len(counts))
+        calls.add(counts)
+
+    def clear(self):
+        self._histograms = {}
+        self._recent = {}
+        self._calls = {}
+        self.started = datetime.now()
+
+    def _source(self, recent: bool) -> dict[tuple[type, str, int], Histogram]:
+        if not recent:
+            return self._histograms
+        return {key: rolling.histogram() for key, rolling in self._recent.items()}
+
+    def get(self, display_type: type, phase: str, speed: int | None = None, recent: bool = False) -> Histogram:
+        """The timings of one display's phase, at one speed or every speed merged.
+
+        With recent only the latest frames count, see RollingHistogram.
+        """
+        if speed is not None:
+            key = (display_type, phase, speed)
+            if recent:
+                return self._recent[key].histogram() if key in self._recent else Histogram()
+            return self._histograms.get(key) or Histogram()
+        merged = Histogram()
+        for (key_type, key_phase, key_speed) in self._histograms:
+            if key_type is display_type and key_phase == phase:
+                merged.merge(self.get(key_type, key_phase, key_speed, recent))
+        return merged
+
+    @property
+    def display_types(self) -> tuple[type, ...]:
+        return tuple(dict.fromkeys(key[0] for key in self._histograms))
+
+    def summary(self, phases: Iterable[str] = PHASES, by_speed: bool = True, recent: bool = False) -> list[dict]:
+        phases = tuple(phases)
+        rows = []
+        if by_speed:
+            for (display_type, phase, speed), histogram in self._source(recent).items():
+                if phase in phases:
+                    rows.append({"display": display_name(display_type), "phase": phase, "speed": speed, **histogram.summary()})
+        else:
+            for display_type in self.display_types:
+                for phase in phases:
+                    histogram = self.get(display_type, phase, recent=recent)
+                    if histogram.count:
+                        rows.append({"display": display_name(display_type), "phase": phase, "speed": None, **histogram.summary()})
+        rows.sort(key=lambda row: (row["display"], phases.index(row["phase"]), row["speed"] or 0))
+        return rows
+
+    def slowest(self, phase: str, count: int = 5, stat: str = "p99", recent: bool = False) -> list[dict]:
+        """The displays with the worst stat for one phase, every speed merged."""
+        rows = self.summary((phase,), by_speed=False, recent=recent)
+        rows.sort(key=lambda row: row[stat], reverse=True)
+        return rows[:count]
+
+    def call_summary(self, names: Sequence[str]) -> list[dict]:
+        rows = [{"display": display_name(display_type), "phase": phase, **calls.summary(names)} for (display_type, phase), calls in self._calls.items()]
+        rows.sort(key=lambda row: (row["display"], row["phase"]))
+        return rows
+
+    def busiest(self, phase: str, names: Sequence[str], counter: str = "draws", count: int = 5) -> list[dict]:
+        """The displays with the most of one GL counter in a frame of one phase."""
+        rows = [row for row in self.call_summary(names) if row["phase"] == phase]
+        rows.sort(key=lambda row: row[counter], reverse=True)
+        return rows[:count]
+
+    def export(self, pth: Path):
+        report = {
+            "started": self.started.isoformat(),
+            "exported": datetime.now().isoformat(),
+            "unit": "ms",
+            "displays": self.summary(by_speed=False),
+            "by_speed": self.summary(),
+            "recent": self.summary(by_speed=False, recent=True),
+        }
+        if self._calls:
+            from engine.glcounters import COUNTERS
+            report["gl_calls"] = self.call_summary(COUNTERS)
+        pth.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,265 @@
+"""Record everything that drives a play session so it can be played back exactly.
+
+python -m engine.headless --sessions 1 --record session.awr
+python -m engine.replay session.awr
+
+A session is reproducible from its seed, the displays it could pick from, the length of every frame,
+and every input. Those get stored in a handful of flat arrays, around 40 bytes a record.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, NamedTuple, Iterator
+from collections.abc import Iterable
+from enum import IntEnum
+from pathlib import Path
+from array import array
+import argparse
+import struct
+import json
+import sys
+
+if TYPE_CHECKING:
+    from engine.play import PlayView, Display
+    from engine.finder import PackManager
+
+__all__ = (
+    "RecordKind",
+    "Record",
+    "InputRecording",
+    "start_recording",
+    "Replayer",
+)
+
+MAGIC = b"AWREPLAY"
+VERSION = 1
+# magic, version, seed, record count, length of the json names block
+HEADER = struct.Struct("<8sHQQI")
+
+
+class RecordKind(IntEnum):
+    # A frame, the time is the delta time given to PlayView.on_update.
+    TICK = 0
+    KEY_PRESS = 1
+    KEY_RELEASE = 2
+    MOUSE_PRESS = 3
+    MOUSE_RELEASE = 4
+    MOUSE_MOTION = 5
+    # Things done to the PlayView from outside of an input or update, i.e. a headless driver restarting.
+    SKIP = 6
+    RESTART = 7
+
+
+class Record(NamedTuple):
+    kind: RecordKind
+    # The play clock time of the input, or the delta time for a TICK.
+    time: float
+    # The key or mouse button and the modifiers.
+    symbol: int
+    modifiers: int
+    x: float
+    y: float
+    dx: float
+    dy: float
+
+
+class InputRecording:
+    # Every record is spread over parallel arrays rather than stored as an object, so even hours
+    # of frames and mouse motion stay small in memory and on disk.
+
+    def __init__(self, seed: int, games: Iterable[str] = (), transitions: Iterable[str] = (), fails: Iterable[str] = ()) -> None:
+        self.seed: int = seed
+        # Namespaced names of what the session could pick from, so the PlayView can be rebuilt.
+        self.games: tuple[str, ...] = tuple(games)
+        self.transitions: tuple[str, ...] = tuple(transitions)
+        self.fails: tuple[str, ...] = tuple(fails)
+
+        self.kinds: array[int] = array("B")
+        self.times: array[float] = array("d")
+        # Two ints (symbol, modifiers) and four floats (x, y, dx, dy) per record.
+        self.codes: array[int] = array("i")
+        self.positions: array[float] = array("f")
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, idx: int) -> Record:
+        c, p = idx * 2, idx * 4
+        codes, positions = self.codes, self.positions
+        return Record(RecordKind(self.kinds[idx]), self.times[idx], codes[c], codes[c + 1], positions[p], positions[p + 1], positions[p + 2], positions[p + 3])
+
+    def __iter__(self) -> Iterator[Record]:
+        for idx in range(len(self.kinds)):
+            yield self[idx]
+
+    @property
+    def tick_count(self) -> int:
+        return self.kinds.count(RecordKind.TICK)
+
+    @property
+    def play_time(self) -> float:
+        # Real frame time, which the play clock then speeds up.
+        kinds = self.kinds
+        return sum(time for idx, time in enumerate(self.times) if kinds[idx] == RecordKind.TICK)
+
+    def tick(self, delta_time: float):
+        self.kinds.append(RecordKind.TICK)
+        self.times.append(delta_time)
+        self.codes.extend((0, 0))
+        self.positions.extend((0.0, 0.0, 0.0, 0.0))
+
+    def add(self, kind: RecordKind, time: float, symbol: int = 0, modifiers: int = 0, x: float = 0.0, y: float = 0.0, dx: float = 0.0, dy: float = 0.0):
+        self.kinds.append(kind)
+        self.times.append(time)
+        self.codes.extend((symbol, modifiers))
+        self.positions.extend((x, y, dx, dy))
+
+    def save(self, pth: Path):
+        names = json.dumps({"games": self.games, "transitions": self.transitions, "fails": self.fails}).encode()
+        with open(pth, "wb") as fp:
+            fp.write(HEADER.pack(MAGIC, VERSION, self.seed, len(self.kinds), len(names)))
+            fp.write(names)
+            for data in (self.kinds, self.times, self.codes, self.positions):
+                if sys.byteorder == "big":
+                    data = array(data.typecode, data)
+                    data.byteswap()
+                data.tofile(fp)
+
+    @classmethod
+    def load(cls, pth: Path) -> InputRecording:
+        with open(pth, "rb") as fp:
+            magic, version, seed, count, names_size = HEADER.unpack(fp.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{pth} is not a replay file")
+            if version != VERSION:
+                raise ValueError(f"{pth} is a version {version} replay, only version {VERSION} can be loaded")
+            names = json.loads(fp.read(names_size))
+            recording = cls(seed, names["games"], names["transitions"], names["fails"])
+            for data, size in ((recording.kinds, count), (recording.times, count), (recording.codes, count * 2), (recording.positions, count * 4)):
+                data.fromfile(fp, size)
+                if sys.byteorder == "big":
+                    data.byteswap()
+        return recording
+
+
+def _display_names(displays: Iterable[type[Display]], manager: PackManager) -> tuple[str, ...]:
+    names = []
+    for display in displays:
+        name = manager.get_display_name(display)
+        if name is None:
+            raise ValueError(f"{display.__qualname__} isn't from a loaded pack so it can't be replayed")
+        names.append(name)
+    return tuple(names)
+
+
+def start_recording(view: PlayView, manager: PackManager | None = None) -> InputRecording:
+    """Record everything the view does from now on. This has to happen before it gets shown."""
+    if view.active_display is not None:
+        raise ValueError("Recording has to start before the PlayView is shown, otherwise the replay can't match it")
+    if manager is None:
+        from engine.finder import packs as manager
+    recording = InputRecording(
+        view.seed,
+        _display_names(view.games, manager),
+        _display_names(view.transitions, manager),
+        _display_names(view.fails, manager)
+    )
+    view.recording = recording
+    return recording
+
+
+class Replayer:
+    # Feeds a recording back through a new PlayView as fast as it can be processed.
+
+    def __init__(self, recording: InputRecording, manager: PackManager | None = None) -> None:
+        from engine.play import PlayView
+        if manager is None:
+            from engine.finder import packs as manager
+
+        self.recording: InputRecording = recording
+        self.view: PlayView = PlayView(
+            tuple(manager.get_game(name) for name in recording.games),
+            tuple(manager.get_transition(name) for name in recording.transitions),
+            tuple(manager.get_fail(name) for name in recording.fails),
+            seed = recording.seed
+        )
+        self.position: int = 0
+        self.ticks: int = 0
+        self.sessions: int = 0
+        self._started: bool = False
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.recording)
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        self.view.window.show_view(self.view)
+
+    def step(self) -> bool:
+        """Replay every record up to and including the next frame. Returns False once there is nothing left."""
+        self.start()
+        recording = self.recording
+        view = self.view
+        kinds, times, codes, positions = recording.kinds, recording.times, recording.codes, recording.positions
+        while self.position < len(kinds):
+            idx = self.position
+            self.position += 1
+            kind = kinds[idx]
+            c, p = idx * 2, idx * 4
+            match kind:
+                case RecordKind.TICK:
+                    view.on_update(times[idx])
+                    self.ticks += 1
+                    return True
+                case RecordKind.SKIP:
+                    view.skip_display()
+                case RecordKind.RESTART:
+                    if view.play_over:
+                        self.sessions += 1
+                    view.restart()
+                case _:
+                    # Inputs keep the time they were recorded at, rather than when they get replayed.
+                    view.push_input(RecordKind(kind), codes[c], codes[c + 1], positions[p], positions[p + 1], positions[p + 2], positions[p + 3], times[idx])
+        return False
+
+    def run(self, draw_every: int = 0):
+        while self.step():
+            if draw_every and self.ticks % draw_every == 0:
+                self.view.on_draw()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play back a recorded session headless and as fast as possible.")
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--draw-every", type=int, default=0)
+    args = parser.parse_args()
+
+    import pyglet
+    pyglet.options.audio = ("silent",)
+
+    from time import perf_counter
+    from aware.launch import load_fonts
+    from engine.finder import packs
+    from engine.resources import load_resources
+    from engine.headless import create_headless_window
+
+    recording = InputRecording.load(args.recording)
+    load_fonts()
+    load_resources()
+    packs.load_packs()
+    window = create_headless_window()
+
+    replayer = Replayer(recording)
+    start = perf_counter()
+    replayer.run(args.draw_every)
+    real_time = perf_counter() - start
+    view = replayer.view
+    window.close()
+
+    print(f"Replayed {len(recording)} records ({replayer.ticks} frames, seed {recording.seed}) in {real_time:.2f}s")
+    print(f"Finished on {view.count} games with {view.strikes} strikes at speed {view.speed} after {replayer.sessions} lost sessions")
+
+
+if __name__ == "__main__":
+    main()
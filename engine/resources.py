@@ -82,8 +82,8 @@ def load_font(target) -> None:
     pth = FONT_MAP[target]
     arcade_load_font(pth)
 
-def load_resources() -> None:
-    pth = Path().absolute() / "resources"
+def load_resources(pth: Path | None = None) -> None:
+    pth = pth or Path().absolute() / "resources"
     depth = len(pth.parts)
     for current, _, files in pth.walk():
         for file in files:
@@ -0,0 +1,237 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from collections.abc import Iterable, Sequence, Mapping
+from collections import deque
+from random import Random
+
+if TYPE_CHECKING:
+    # engine.play creates the default scheduler so it can't be imported here.
+    from engine.play import Game, ContentFlag
+
+__all__ = (
+    "FenwickTree",
+    "GameScheduler",
+)
+
+# Weights are stored as ints so adding and removing them never drifts, this is their precision.
+WEIGHT_SCALE = 1000
+
+
+class FenwickTree:
+    # Prefix sums of int values, with O(log n) updates and O(log n) lookups by cumulative value.
+    __slots__ = ("_tree", "_values", "_top_bit")
+
+    def __init__(self, values: Sequence[int]) -> None:
+        self._values: list[int] = list(values)
+        size = len(self._values)
+        tree = [0] + self._values
+        # Building from the bottom up is O(n) rather than n inserts.
+        for idx in range(1, size + 1):
+            parent = idx + (idx & -idx)
+            if parent <= size:
+                tree[parent] += tree[idx]
+        self._tree: list[int] = tree
+        self._top_bit: int = 1 << (size.bit_length() - 1) if size else 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, idx: int) -> int:
+        return self._values[idx]
+
+    @property
+    def total(self) -> int:
+        return self.prefix(len(self._values))
+
+    def prefix(self, end: int) -> int:
+        """The sum of the first end values."""
+        tree = self._tree
+        total = 0
+        while end > 0:
+            total += tree[end]
+            end -= end & -end
+        return total
+
+    def set(self, idx: int, value: int):
+        delta = value - self._values[idx]
+        if not delta:
+            return
+        self._values[idx] = value
+        tree = self._tree
+        size = len(tree)
+        idx += 1
+        while idx < size:
+            tree[idx] += delta
+            idx += idx & -idx
+
+    def find(self, target: int) -> int:
+        """The index whose span of the cumulative values contains target, 0 <= target < total."""
+        tree = self._tree
+        size = len(self._values)
+        pos = 0
+        bit = self._top_bit
+        while bit:
+            nxt = pos + bit
+            if nxt <= size and tree[nxt] <= target:
+                target -= tree[nxt]
+                pos = nxt
+            bit >>= 1
+        return pos
+
+
+class _Pool:
+    # The games one kind of slot picks from, either every normal game or only the bosses.
+
+    def __init__(self, indices: list[int], weights: list[int]) -> None:
+        self.indices: list[int] = indices
+        self.weights: list[int] = weights
+        self.tree: FenwickTree = FenwickTree(weights)
+        # Picked since the bag was last refilled.
+        self.spent: set[int] = set()
+
+    @property
+    def playable(self) -> bool:
+        return any(self.weights)
+
+
+class GameScheduler:
+    """Picks the games for a PlayView.
+
+    * `weights`: overrides each game's WEIGHT, how likely it is to be picked compared to the others.
+    * `min_gap`: how many other games have to be picked before a game can be picked again.
+    * `exclude`: games with any of these content flags never get picked.
+    * `boss_every`: every nth game is a boss game, and boss games are only picked then. 0 treats bosses like any other game.
+    * `bagged`: every game gets picked once before any game gets picked again.
+    """
+
+    def __init__(
+            self,
+            games: Iterable[type[Game]],
+            rng: Random,
+            weights: Mapping[type[Game], float] | None = None,
+            min_gap: int = 0,
+            exclude: ContentFlag | None = None,
+            boss_every: int = 0,
+            bagged: bool = False
+        ) -> None:
+        self.games: tuple[type[Game], ...] = tuple(games)
+        self.rng: Random = rng
+        self.min_gap: int = min_gap
+        self.boss_every: int = boss_every
+        self.bagged: bool = bagged
+        self._weight_overrides: dict[type[Game], float] = dict(weights or {})
+        self._exclude: ContentFlag | None = exclude
+
+        self.picks: int = 0
+        # (pick count it can be picked again at, pool, index in the pool)
+        self._cooling: deque[tuple[int, _Pool, int]] = deque()
+        self._locations: dict[type[Game], tuple[_Pool, int]] = {}
+        self._pool: _Pool = _Pool([], [])
+        self._boss_pool: _Pool = _Pool([], [])
+        self.reset()
+
+    def reset(self):
+        # Forget everything that has been picked, i.e. when a session restarts.
+        self.picks = 0
+        self._cooling.clear()
+
+        normal: tuple[list[int], list[int]] = ([], [])
+        bosses: tuple[list[int], list[int]] = ([], [])
+        for idx, game in enumerate(self.games):
+            indices, weights = bosses if (self.boss_every and game.BOSS) else normal
+            indices.append(idx)
+            weights.append(self._base_weight(game))
+        self._pool = _Pool(*normal)
+        self._boss_pool = _Pool(*bosses)
+
+        self._locations = {}
+        for pool in (self._pool, self._boss_pool):
+            for local, idx in enumerate(pool.indices):
+                self._locations.setdefault(self.games[idx], (pool, local))
+
+    @property
+    def exclude(self) -> ContentFlag | None:
+        return self._exclude
+
+    @exclude.setter
+    def exclude(self, flags: ContentFlag | None):
+        self._exclude = flags
+        self.reset()
+
+    def _base_weight(self, game: type[Game]) -> int:
+        if self._exclude is not None and game.FLAGS & self._exclude:
+            return 0
+        weight = self._weight_overrides.get(game, game.WEIGHT)
+        return max(0, round(weight * WEIGHT_SCALE))
+
+    def set_weight(self, game: type[Game], weight: float):
+        self._weight_overrides[game] = weight
+        location = self._locations.get(game)
+        if location is None:
+            return
+        pool, local = location
+        pool.weights[local] = self._base_weight(game)
+        if self._available(pool, local):
+            pool.tree.set(local, pool.weights[local])
+
+    def chance(self, game: type[Game]) -> float:
+        """How likely game is to be the next normal pick right now."""
+        location = self._locations.get(game)
+        if location is None:
+            return 0.0
+        pool, local = location
+        total = pool.tree.total
+        return pool.tree[local] / total if total else 0.0
+
+    def _available(self, pool: _Pool, local: int) -> bool:
+        if self.bagged and local in pool.spent:
+            return False
+        return not any(cooling_pool is pool and cooling_local == local for _, cooling_pool, cooling_local in self._cooling)
+
+    def _restore(self, pool: _Pool, local: int):
+        if self.bagged and local in pool.spent:
+            return
+        pool.tree.set(local, pool.weights[local])
+
+    def _refill(self, pool: _Pool):
+        pool.spent.clear()
+        cooling = {cooling_local for _, cooling_pool, cooling_local in self._cooling if cooling_pool is pool}
+        for local, weight in enumerate(pool.weights):
+            if local not in cooling:
+                pool.tree.set(local, weight)
+
+    def _release_early(self, pool: _Pool):
+        # Everything left is cooling down, so let whichever has waited longest go.
+        for entry in self._cooling:
+            if entry[1] is pool:
+                self._cooling.remove(entry)
+                pool.tree.set(entry[2], pool.weights[entry[2]])
+                pool.spent.discard(entry[2])
+                return
+
+    def pick(self) -> type[Game]:
+        while self._cooling and self._cooling[0][0] <= self.picks:
+            _, pool, local = self._cooling.popleft()
+            self._restore(pool, local)
+
+        pool = self._pool
+        if self.boss_every and self.picks % self.boss_every == self.boss_every - 1 and self._boss_pool.playable:
+            pool = self._boss_pool
+
+        tree = pool.tree
+        if not tree.total and self.bagged:
+            self._refill(pool)
+        if not tree.total:
+            self._release_early(pool)
+        if not tree.total:
+            raise ValueError("There are no games which can be picked, they are all excluded or have no weight")
+
+        local = tree.find(self.rng.randrange(tree.total))
+        self.picks += 1
+        if self.bagged:
+            pool.spent.add(local)
+            tree.set(local, 0)
+        if self.min_gap:
+            tree.set(local, 0)
+            self._cooling.append((self.picks + self.min_gap, pool, local))
+        return self.games[pool.indices[local]]
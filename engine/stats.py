@@ -0,0 +1,320 @@
+"""Keep the results of every run, so they can be looked back over once the game is closed.
+
+Every game played gets a row with whether it was won, how long it took, and the speed it was played at.
+Writes happen on a background thread in batches, so the PlayView only ever puts them on a queue.
+The win rate of each game at each speed is kept up to date as rows get written, so asking for it
+never has to go over every game ever played.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, NamedTuple
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Thread, Event
+from queue import SimpleQueue, Empty
+from time import perf_counter
+from pathlib import Path
+import sqlite3
+
+from engine.finder import USER_APPDATA_PATH, packs
+from engine.play import PlayEvent, Game
+from engine.profiling import display_name
+
+if TYPE_CHECKING:
+    from engine.play import PlayView, Display
+
+__all__ = (
+    "Run",
+    "WinRate",
+    "StatsStore",
+    "SessionStats",
+    "DEFAULT_STATS_PATH",
+)
+
+DEFAULT_STATS_PATH = USER_APPDATA_PATH / "stats.db"
+SCHEMA_VERSION = 1
+# The most writes done in one transaction, and the longest a write waits for others to join it.
+BATCH_SIZE = 512
+FLUSH_INTERVAL = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    seed INTEGER NOT NULL,
+    started TEXT NOT NULL,
+    ended TEXT,
+    games INTEGER NOT NULL DEFAULT 0,
+    strikes INTEGER NOT NULL DEFAULT 0,
+    speed INTEGER NOT NULL DEFAULT 0,
+    play_time REAL NOT NULL DEFAULT 0.0,
+    finished INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_best ON runs (games DESC, strikes ASC);
+
+CREATE TABLE IF NOT EXISTS games (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    position INTEGER NOT NULL,
+    game TEXT NOT NULL,
+    speed INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_game ON games (game, speed, won);
+CREATE INDEX IF NOT EXISTS games_by_run ON games (run, position);
+
+-- Running totals of the games table, so win rates don't scan it.
+CREATE TABLE IF NOT EXISTS game_totals (
+    game TEXT NOT NULL,
+    speed INTEGER NOT NULL,
+    plays INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    play_time REAL NOT NULL,
+    PRIMARY KEY (game, speed)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class Run:
+    # A run that is being recorded, the id only exists once the writer has got to it.
+    seed: int
+    started: datetime
+    id: int | None = None
+    games: int = 0
+    strikes: int = 0
+    speed: int = 0
+    play_time: float = 0.0
+    ended: bool = False
+
+
+class WinRate(NamedTuple):
+    game: str
+    speed: int | None
+    plays: int
+    wins: int
+    # The mean time taken to finish the game.
+    mean_time: float
+
+    @property
+    def rate(self) -> float:
+        return self.wins / self.plays if self.plays else 0.0
+
+
+class StatsStore:
+
+    def __init__(self, path: Path = DEFAULT_STATS_PATH, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL) -> None:
+        self.path: Path = path
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+
+        self._queue: SimpleQueue[tuple | None] = SimpleQueue()
+        # Made on the writer thread, sqlite connections can't be shared between threads.
+        self._connection: sqlite3.Connection | None = None
+        self._ready = Event()
+        self._error: Exception | None = None
+        self._thread: Thread = Thread(target=self._write, name="aware-stats", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10.0)
+        # WAL lets the queries read while the writer writes.
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    # -- Writing, all of which only queues the write --
+
+    def start_run(self, seed: int) -> Run:
+        run = Run(seed, datetime.now())
+        self._queue.put(("start", run))
+        return run
+
+    def record_game(self, run: Run, game: str, won: bool, speed: int, duration: float):
+        run.games += 1
+        run.strikes += not won
+        run.speed = max(run.speed, speed)
+        self._queue.put(("game", run, run.games, game, speed, won, duration))
+
+    def end_run(self, run: Run, play_time: float, finished: bool):
+        if run.ended:
+            return
+        run.ended = True
+        run.play_time = play_time
+        self._queue.put(("end", run, datetime.now(), finished))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait for everything queued so far to be written."""
+        done = Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self):
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+
+    # -- The writer thread --
+
+    def _write(self):
+        try:
+            connection = self._connection = self._connect()
+            connection.executescript(SCHEMA)
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version == 0:
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            elif version != SCHEMA_VERSION:
+                raise ValueError(f"{self.path} is a version {version} stats database, only version {SCHEMA_VERSION} can be used")
+            connection.commit()
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            deadline = perf_counter() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None and batch[-1][0] != "flush":
+                remaining = deadline - perf_counter()
+                if remaining <= 0.0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except Empty:
+                    break
+            closing = batch[-1] is None
+            self._write_batch(connection, [item for item in batch if item is not None])
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: list[tuple]):
+        flushes: list[Event] = []
+        with connection:
+            for item in batch:
+                match item:
+                    case ("start", run):
+                        cursor = connection.execute("INSERT INTO runs (seed, started) VALUES (?, ?)", (run.seed, run.started.isoformat()))
+                        run.id = cursor.lastrowid
+                    case ("game", run, position, game, speed, won, duration):
+                        connection.execute(
+                            "INSERT INTO games (run, position, game, speed, won, duration) VALUES (?, ?, ?, ?, ?, ?)",
+                            (run.id, position, game, speed, int(won), duration)
+                        )
+                        connection.execute(
+                            "INSERT INTO game_totals (game, speed, plays, wins, play_time) VALUES (?, ?, 1, ?, ?) "
+                            "ON CONFLICT (game, speed) DO UPDATE SET plays = plays + 1, wins = wins + excluded.wins, play_time = play_time + excluded.play_time",
+                            (game, speed, int(won), duration)
+                        )
+                    case ("end", run, ended, finished):
+                        connection.execute(
+                            "UPDATE runs SET ended = ?, games = ?, strikes = ?, speed = ?, play_time = ?, finished = ? WHERE id = ?",
+                            (ended.isoformat(), run.games, run.strikes, run.speed, run.play_time, int(finished), run.id)
+                        )
+                    case ("flush", done):
+                        flushes.append(done)
+        for done in flushes:
+            done.set()
+
+    # -- Queries, these read straight from the database on the calling thread --
+
+    def _read(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10.0)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def win_rates(self, speed: int | None = None) -> list[WinRate]:
+        """The win rate of every game at each speed, or at only one speed."""
+        with self._read() as connection:
+            if speed is None:
+                rows = connection.execute("SELECT game, speed, plays, wins, play_time FROM game_totals ORDER BY game, speed").fetchall()
+            else:
+                rows = connection.execute("SELECT game, speed, plays, wins, play_time FROM game_totals WHERE speed = ? ORDER BY game", (speed,)).fetchall()
+        return [WinRate(row["game"], row["speed"], row["plays"], row["wins"], row["play_time"] / row["plays"]) for row in rows]
+
+    def win_rate(self, game: str, speed: int | None = None) -> WinRate:
+        """One game's win rate at one speed, or at every speed added together."""
+        with self._read() as connection:
+            if speed is None:
+                row = connection.execute("SELECT sum(plays), sum(wins), sum(play_time) FROM game_totals WHERE game = ?", (game,)).fetchone()
+            else:
+                row = connection.execute("SELECT plays, wins, play_time FROM game_totals WHERE game = ? AND speed = ?", (game, speed)).fetchone()
+        plays, wins, play_time = row if row is not None and row[0] else (0, 0, 0.0)
+        return WinRate(game, speed, plays, wins, play_time / plays if plays else 0.0)
+
+    def best_runs(self, count: int = 1) -> list[dict]:
+        """The runs that got through the most games, the fewest strikes breaking ties."""
+        with self._read() as connection:
+            rows = connection.execute("SELECT * FROM runs ORDER BY games DESC, strikes ASC LIMIT ?", (count,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def best_run(self) -> dict | None:
+        runs = self.best_runs(1)
+        return runs[0] if runs else None
+
+    def run_games(self, run_id: int) -> list[dict]:
+        with self._read() as connection:
+            rows = connection.execute("SELECT * FROM games WHERE run = ? ORDER BY position", (run_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def _game_name(game: type[Display]) -> str:
+    # The namespaced name when it's from a pack, so the same game keeps the same name between versions.
+    return packs.get_display_name(game) or display_name(game)
+
+
+class SessionStats:
+    # Records what happens in a PlayView into a store, only through its events so it costs nothing a frame.
+    # The PlayView holds onto it as view.stats, the events only hold it weakly.
+
+    def __init__(self, view: PlayView, store: StatsStore | None = None) -> None:
+        self.view: PlayView = view
+        self.store: StatsStore = store if store is not None else StatsStore()
+        self.run: Run | None = None
+        # How long the current game took to be won or lost, DISPLAY_FINISHED is a frame later.
+        self._result_time: float | None = None
+
+        events = view.events
+        events.subscribe(PlayEvent.DISPLAY_STARTED, self._on_started)
+        events.subscribe(PlayEvent.GAME_SUCCEEDED, self._on_result)
+        events.subscribe(PlayEvent.GAME_FAILED, self._on_result)
+        events.subscribe(PlayEvent.DISPLAY_FINISHED, self._on_finished)
+        events.subscribe(PlayEvent.PLAY_OVER, self._on_play_over)
+        events.subscribe(PlayEvent.RESTART, self._on_restart)
+        view.stats = self
+
+    def _on_started(self, event: PlayEvent, view: PlayView, display: Display | None):
+        self._result_time = None
+        if self.run is None and isinstance(display, Game):
+            self.run = self.store.start_run(view.seed)
+
+    def _on_result(self, event: PlayEvent, view: PlayView, display: Display | None):
+        self._result_time = view.frame.display_time
+
+    def _on_finished(self, event: PlayEvent, view: PlayView, display: Display | None):
+        # Games skipped or restarted before they finished don't count.
+        if self.run is None or not isinstance(display, Game) or view.active_game_succeeded is None:
+            return
+        frame = view.frame
+        duration = self._result_time if self._result_time is not None else frame.display_time
+        self.run.play_time = frame.total_time
+        self.store.record_game(self.run, _game_name(type(display)), view.active_game_succeeded, frame.speed, duration)
+
+    def _on_play_over(self, event: PlayEvent, view: PlayView, display: Display | None):
+        if self.run is not None:
+            self.store.end_run(self.run, view.frame.total_time, True)
+            self.run = None
+
+    def _on_restart(self, event: PlayEvent, view: PlayView, display: Display | None):
+        # Restarted part way through, the clock has already been reset so use the time of the last game.
+        if self.run is not None:
+            self.store.end_run(self.run, self.run.play_time, False)
+            self.run = None
+
+    def close(self):
+        if self.run is not None:
+            self.store.end_run(self.run, self.view.frame.total_time, False)
+            self.run = None
+        self.store.close()
@@ -0,0 +1,177 @@
+"""Catch frames that take far too long, and find out where they spent the time.
+
+A background thread watches for the PlayView's heartbeat. The PlayView beats as it starts each phase
+of a frame and says which display it is working on. When the beat stops for longer than the budget
+the thread samples the main thread's stack until it starts again, and blames that phase and display.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Thread, Event, Lock, main_thread
+from time import perf_counter
+from pathlib import Path
+import traceback
+import json
+import sys
+
+from engine.profiling import display_name
+
+if TYPE_CHECKING:
+    from engine.play import PlayView, Display
+
+__all__ = (
+    "Stall",
+    "Watchdog",
+)
+
+# How long a frame can take before it counts as a stall, and how often to check/sample.
+DEFAULT_BUDGET = 0.1
+SAMPLE_INTERVAL = 0.005
+# Stalls in update before a display gets flagged.
+FLAG_STALLS = 3
+# Innermost frames kept from each sample.
+STACK_DEPTH = 24
+
+
+@dataclass
+class Stall:
+    display: type | None
+    # What the PlayView said it was doing: update, draw, warmup, preload, switch, or other.
+    phase: str
+    duration: float
+    # How many times each stack was sampled, innermost frame last.
+    stacks: Counter[tuple[str, ...]] = field(default_factory=Counter)
+
+    def report(self, top: int = 5) -> dict:
+        return {
+            "display": display_name(self.display) if self.display is not None else None,
+            "phase": self.phase,
+            "duration": self.duration,
+            "samples": self.stacks.total(),
+            "stacks": [{"count": count, "stack": list(stack)} for stack, count in self.stacks.most_common(top)],
+        }
+
+
+class Watchdog:
+
+    def __init__(self, view: PlayView, budget: float = DEFAULT_BUDGET, flag_stalls: int = FLAG_STALLS, auto_skip: bool = False, report_path: Path | None = None) -> None:
+        self.view: PlayView = view
+        self.budget: float = budget
+        self.flag_stalls: int = flag_stalls
+        # Skip a flagged display the next time it stalls, rather than just reporting it.
+        self.auto_skip: bool = auto_skip
+        self.report_path: Path | None = report_path
+
+        self.stalls: list[Stall] = []
+        # Stalls in update per display, and the displays that went over flag_stalls.
+        self.offences: Counter[type] = Counter()
+        self.flagged: set[type] = set()
+
+        # Written by the main thread, read by the watchdog. The time of the last beat (0 until the first one),
+        # and the phase and display it started. Replaced as a whole so the watchdog never sees half of one.
+        self._beat: tuple[float, str, type | None] = (0.0, "other", None)
+        self._skip: type | None = None
+
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self._main_id: int | None = main_thread().ident
+        self.started: datetime = datetime.now()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._beat = (0.0, "other", None)
+        self._thread = Thread(target=self._watch, name="aware-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self.report_path is not None:
+            self.write_report(self.report_path)
+
+    def beat(self, phase: str = "other", display: Display | type[Display] | None = None):
+        # Called by the PlayView as it starts each phase, with the display it's working on if there is one.
+        # A stall gets blamed on whatever the last beat said, so beat again with nothing once the phase is over.
+        if display is not None and not isinstance(display, type):
+            display = type(display)
+        self._beat = (perf_counter(), phase, display)
+
+    def pause(self):
+        # Stop watching until the next beat, i.e. while the view isn't being shown.
+        self._beat = (0.0, "other", None)
+
+    def take_skip(self) -> bool:
+        """Whether the active display was flagged and has stalled again. Only call from the main thread."""
+        skip = self._skip
+        if skip is None:
+            return False
+        self._skip = None
+        active = self.view.active_display
+        return active is not None and type(active) is skip
+
+    def _watch(self):
+        stall: Stall | None = None
+        stalled = self._beat
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            current = self._beat
+            if stall is not None:
+                if current is not stalled:
+                    # The main thread is moving again.
+                    stall.duration = (current[0] or perf_counter()) - stalled[0]
+                    self._finish(stall)
+                    stall = None
+                else:
+                    self._sample(stall)
+                    continue
+
+            beat, phase, display = current
+            if beat and perf_counter() - beat > self.budget:
+                stall = Stall(display, phase, 0.0)
+                stalled = current
+                self._sample(stall)
+
+    def _sample(self, stall: Stall):
+        frame = sys._current_frames().get(self._main_id) # type: ignore -- it's not going anywhere
+        if frame is None:
+            return
+        summary = traceback.extract_stack(frame)[-STACK_DEPTH:]
+        stack = tuple(f"{entry.filename}:{entry.lineno} {entry.name}" for entry in summary)
+        stall.stacks[stack] += 1
+
+    def _finish(self, stall: Stall):
+        # Only stalls in a display's own update count against it, skipping it won't help any of the others.
+        with self._lock:
+            self.stalls.append(stall)
+            if stall.display is None or stall.phase != "update":
+                return
+            self.offences[stall.display] += 1
+            if self.offences[stall.display] >= self.flag_stalls:
+                self.flagged.add(stall.display)
+                if self.auto_skip:
+                    self._skip = stall.display
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started.isoformat(),
+                "exported": datetime.now().isoformat(),
+                "budget": self.budget,
+                "flagged": sorted(display_name(display) for display in self.flagged),
+                "offences": {display_name(display): count for display, count in self.offences.most_common()},
+                "stalls": [stall.report() for stall in self.stalls],
+            }
+
+    def write_report(self, pth: Path):
+        pth.write_text(json.dumps(self.report(), indent=2))
@@ -2,6 +2,7 @@ from arcade import Text
 
 from aware.graphics import style
 from aware.graphics.gradient import Gradient
+from aware.graphics.compositor import Compositor
 from engine.play import Fail, PlayState
 
 class DefaultFail(Fail):
@@ -12,8 +13,14 @@ class DefaultFail(Fail):
                                       font_size = 72, font_name = "A-OTF Shin Go Pro", bold = True)
         self.text2 = Text("PRESS ANY KEY TO RESTART", self.window.center_x, self.text.bottom - 15, anchor_x="center", anchor_y="top",
                                                       font_size = 32, font_name = "A-OTF Shin Go Pro", bold = True)
+        # Nothing here ever changes, so it only gets drawn once.
+        self.compositor = Compositor()
+        self.compositor.add_layer(self.draw_background)
 
     def draw(self):
+        self.compositor.draw()
+
+    def draw_background(self):
         self.gradient.draw()
         self.text.draw()
         self.text2.draw()
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
-from random import random
 from math import copysign
 
 import arcade
 
+from aware.anim import lerp
 from engine.play import PlayState, Game
 from engine.resources import get_sound
 
+# Play time between two shakes for them to count, so a high polling rate mouse jittering doesn't count as shaking.
+SHAKE_INTERVAL = 0.03
+
 class ShakeEmUp(Game):
+    PROMPT = "SHAKE!"
+    CONTROLS = "default.inputs.mouse_move"
+    DURATION = 4.0
+    # Every change in direction matters, so don't add the motion up.
+    MOTION_SAMPLES = True
     
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "SHAKE!", controls = "default.inputs.mouse_move", duration = 4.0)
+        super().__init__(state)
         self.box = arcade.SpriteSolidColor(100, 100, self.state.screen_width / 2, self.state.screen_height / 2)
         self.text = arcade.Text("0 SHAKES!", self.state.screen_width / 2, 100, anchor_x='center', anchor_y='center', font_size = 26, font_name = "A-OTF Shin Go Pro")
         self.dragging: bool = False
@@ -19,6 +27,7 @@ class ShakeEmUp(Game):
         self.shakes: int = 0
         self.shake_goal: int = 30
         self.motion_dir: tuple[float, float] | None = None
+        self.shake_time: float = 0.0
         self.sound = get_sound('default.growth')
         self.player = None
     
@@ -29,6 +38,7 @@ class ShakeEmUp(Game):
         self.shakes = 0
         self.shake_goal = 30
         self.motion_dir = None
+        self.shake_time = self.state.total_time
         self.player = self.sound.play(0.0, speed=self.state.tick_speed)
         self.text.text = "0 SHAKES!"
         self.text.color = arcade.color.WHITE
@@ -68,8 +78,9 @@ class ShakeEmUp(Game):
                 self.motion_dir = dx, dy
             else:
                 diff = dx * self.motion_dir[0] + dy * self.motion_dir[1]
-                if diff < 0.0:
+                if diff < 0.0 and self.state.input_time - self.shake_time >= SHAKE_INTERVAL:
                     # The motion of the mouse has switched so we have shaken once.
+                    self.shake_time = self.state.input_time
                     self.shakes += 1
                     self.motion_dir = dx, dy
                     self.text.text = f"{self.shakes} SHAKES!"
@@ -80,16 +91,25 @@ class ShakeEmUp(Game):
 
 
 class JuggleTheBall(Game):
+    PROMPT = "JUGGLE!"
+    CONTROLS = "default.inputs.mouse"
+    DURATION = 5.0
+    # The balls fall with gravity so keep the physics the same at every frame rate and speed.
+    FIXED_STEP = True
     REQUIRED_CLICKS = 5
     
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, "JUGGLE!", "default.inputs.mouse", 5.0)
+        super().__init__(state)
         self.balls: arcade.SpriteList[arcade.Sprite] = arcade.SpriteList()
         self._last_active_ball: arcade.Sprite | None = None
         self._closest_ball: arcade.Sprite | None = None
         self.balls.extend((arcade.SpriteCircle(25, (255, 255, 255, 255), center_x=self.state.screen_width/2, center_y=self.state.screen_height/2) for _ in range(3)))
         self.clicks = 0
 
+        # Where each ball was after the last two updates, the sprites get drawn in between.
+        self._previous: list[tuple[float, float]] = [ball.position for ball in self.balls]
+        self._current: list[tuple[float, float]] = list(self._previous)
+
         self.clicks_remaining_text = arcade.Text(f"{self.REQUIRED_CLICKS}", self.window.center_x, self.window.center_y, color = arcade.color.WHITE.replace(a = 64), font_size = 100, align = "center", anchor_x = "center", anchor_y = "center", font_name = "Josefin Sans")
 
     def start(self):
@@ -100,10 +120,12 @@ class JuggleTheBall(Game):
         self._last_active_ball = self._closest_ball = None
 
         for ball in self.balls:
-            ball.position = self.state.screen_width * random(), 0.5 * self.state.screen_height
+            ball.position = self.state.screen_width * self.state.random.random(), 0.5 * self.state.screen_height
             ball.change_x = copysign(200, self.state.screen_width/2 - ball.center_x)
             # Will always be positive but that's fine
             ball.change_y = 360
+        self._previous = [ball.position for ball in self.balls]
+        self._current = list(self._previous)
         self.clicks = 0
         self.clicks_remaining_text.text = str(self.REQUIRED_CLICKS)
 
@@ -111,18 +133,20 @@ class JuggleTheBall(Game):
         self.succeed()
 
     def update(self, delta_time: float):
-        for ball in self.balls:
-            pos = ball.position
+        for idx, ball in enumerate(self.balls):
+            x, y = self._previous[idx] = self._current[idx]
             ball.change_y = ball.change_y - 400 * delta_time
-            ball.position = pos[0] + ball.change_x * delta_time, pos[1] + ball.change_y * delta_time
-            if ball.center_x <= 25:
-                ball.center_x = 25
+            x, y = x + ball.change_x * delta_time, y + ball.change_y * delta_time
+            if x <= 25:
+                x = 25
                 ball.change_x = copysign(ball.change_x, 1.0)
-            elif ball.center_x >= self.state.screen_width - 25:
-                ball.center_x = self.state.screen_width - 25
+            elif x >= self.state.screen_width - 25:
+                x = self.state.screen_width - 25
                 ball.change_x = copysign(ball.change_x, -1.0)
+            # The sprites hold the simulated position so hit testing works without drawing.
+            ball.position = self._current[idx] = x, y
 
-            if ball.center_y < 25:
+            if y < 25:
                 self.fail()
                 return
             
@@ -170,5 +194,11 @@ class JuggleTheBall(Game):
         
 
     def draw(self):
+        # Drawn in between the last two updates, then put back on the simulated position.
+        alpha = self.state.step_alpha
+        for ball, (px, py), (cx, cy) in zip(self.balls, self._previous, self._current):
+            ball.position = lerp(px, cx, alpha), lerp(py, cy, alpha)
         self.clicks_remaining_text.draw()
         self.balls.draw()
+        for ball, position in zip(self.balls, self._current):
+            ball.position = position
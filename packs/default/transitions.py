@@ -4,8 +4,10 @@ import arcade
 
 from aware.anim import ease_quadout, perc
 from aware.graphics import style
+from aware.graphics.compositor import Compositor, Layer
+from aware.graphics.batch import DisplayBatch
 from aware.graphics.gradient import Gradient
-from aware.graphics.wave import Wave
+from aware.graphics.wave import Wave, WaveBatch
 from engine.play import PlayState, Transition
 from engine.resources import get_sprite
 
@@ -15,8 +17,9 @@ class DefaultTransition(Transition):
     def __init__(self, state: PlayState) -> None:
         super().__init__(state, 3.0)
         self.gradient = Gradient(self.window.rect, ((0.0, style.MENU_LIGHT), (0.5, style.MENU_MIDDLE), (1.0, style.MENU_DARK)), vertical=True)
-        self.wave_1 = Wave(arcade.LRBT(0, self.window.width, 0, 215), 110, 1300, style.SMALL_WAVE_SPEED, 0.0, style.MENU_YELLOW, Wave.TOP_FACE, 3)
-        self.wave_2 = Wave(arcade.LRBT(0, self.window.width, 0, 290), 135, 2000, style.BIG_WAVE_SPEED, 0.0, style.MENU_YELLOW, Wave.TOP_FACE, 3)
+        self.waves = WaveBatch()
+        self.wave_1 = self.waves.add(arcade.LRBT(0, self.window.width, 0, 215), 110, 1300, style.SMALL_WAVE_SPEED, 0.0, style.MENU_YELLOW, Wave.TOP_FACE, 3)
+        self.wave_2 = self.waves.add(arcade.LRBT(0, self.window.width, 0, 290), 135, 2000, style.BIG_WAVE_SPEED, 0.0, style.MENU_YELLOW, Wave.TOP_FACE, 3)
 
         self.text = arcade.Text("", self.state.screen_width/2.0, self.state.screen_height/4.0, anchor_x="center", anchor_y="center",
                                 font_size = 24, font_name = "A-OTF Shin Go Pro", bold = True)
@@ -41,33 +44,50 @@ class DefaultTransition(Transition):
                                  font_size = 48, font_name = "A-OTF Shin Go Pro", bold = True)
         self.text2_shadow = arcade.Text("", self.state.screen_width/2.0 + SHADOW_DISTANCE, self.heart_1.center_y - SHADOW_DISTANCE, anchor_x="center", anchor_y="center",
                                         font_size = 48, font_name = "A-OTF Shin Go Pro", bold = True, color = arcade.color.BLACK.replace(a = 128))
+
+        # The shadows go under the text, and the hearts get hidden as lives are lost.
+        self.batch = DisplayBatch()
+        self.batch.add_text(self.text_shadow, 0)
+        self.batch.add_text(self.text2_shadow, 0)
+        self.batch.add_text(self.text, 1)
+        self.batch.add_text(self.text2, 1)
+        self.hearts = [self.heart_1, self.heart_2, self.heart_3, self.heart_4]
+        for h in self.hearts:
+            self.batch.add_sprite(h)
+
+        # The gradient never changes and the text only changes a few times, so they get cached under and
+        # over the waves, which move every frame.
+        self.compositor = Compositor()
+        self.compositor.add_layer(self.gradient.draw)
+        self.compositor.add_layer(self.draw_waves, Layer.TIMED)
+        self.compositor.add_layer(self.draw_text, Layer.DIRTY, key=lambda: (self.text.text, self.text2.text, self.state.frame.lives_remaining))
     
     def update(self, delta_time: float):
-        self.wave_1.time = self.wave_2.time = self.state.total_time
-        alpha = int(ease_quadout(0, 128, perc(0, 1, self.time)))
-        self.wave_1.color = (*self.wave_1.color[0:3], int(alpha))
-        self.wave_2.color = (*self.wave_2.color[0:3], int(alpha))
-
-        if self.state.is_speedup and self.state.display_time >= 2.0:
-            text = f"SPEEDUP! ({round(self.state.tick_speed, 2)}x)"
-        elif self.state.has_game_finished:
-            text = "WELL DONE!" if self.state.has_game_succeeded else "YOU FAILED."
+        frame = self.state.frame
+        self.waves.time = self.compositor.time = frame.total_time
+        self.waves.opacity = ease_quadout(0, 1, perc(0, 1, frame.display_time))
+
+        if frame.is_speedup and frame.display_time >= 2.0:
+            text = f"SPEEDUP! ({round(frame.tick_speed, 2)}x)"
+        elif frame.has_game_finished:
+            text = "WELL DONE!" if frame.has_game_succeeded else "YOU FAILED."
         else:
             text = ""
         self.text.text = text
-        self.text2.text = f"{self.state.count}"
+        self.text2.text = f"{frame.count}"
 
         self.text_shadow.text = self.text.text
         self.text2_shadow.text = self.text2.text
 
     def draw(self):
-        self.gradient.draw()
-        self.wave_1.draw()
-        self.wave_2.draw()
-        self.text_shadow.draw()
-        self.text2_shadow.draw()
-        self.text.draw()
-        self.text2.draw()
-
-        for h in [self.heart_1, self.heart_2, self.heart_3, self.heart_4][:self.state.lives_remaining]:
-            arcade.draw_sprite(h)
+        self.compositor.draw()
+
+    def draw_waves(self):
+        self.waves.draw()
+
+    def draw_text(self):
+        lives = self.state.frame.lives_remaining
+        for idx, h in enumerate(self.hearts):
+            h.visible = idx < lives
+        self.batch.draw()
+
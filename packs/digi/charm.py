@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
-import random
+from random import Random
 
 import arcade
 from arcade.types import Color
@@ -50,8 +50,12 @@ class NoteSprite:
         self.sprite.alpha = 255 if not self.note.hit else 0
 
 class CharmGame(Game):
+    PROMPT = "HIT NOTES!"
+    CONTROLS = "digi.inputs.dfjk"
+    DURATION = FRONT_PORCH + (NOTES * SPN) + BACK_PORCH
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "HIT NOTES!", controls = "digi.inputs.dfjk", duration = FRONT_PORCH + (NOTES * SPN) + BACK_PORCH)
+        super().__init__(state)
         self.chart: list[Note] = []
         self.note_sprites: list[NoteSprite] = []
         self.spritelist = arcade.SpriteList()
@@ -74,12 +78,12 @@ class CharmGame(Game):
         self.strikeline_spritelist.extend(self.strikeline_sprites)
 
     @staticmethod
-    def generate_chart(notes: int, bpm: float) -> list[Note]:
+    def generate_chart(notes: int, bpm: float, rng: Random) -> list[Note]:
         chart = []
         spn = 1 / (bpm / 60)
         for i in range(notes):
             time = spn * i
-            chart.append(Note(time, random.choice((0, 1, 2, 3))))
+            chart.append(Note(time, rng.choice((0, 1, 2, 3))))
         return chart
     
     @property
@@ -91,7 +95,7 @@ class CharmGame(Game):
         return len([n for n in self.chart if n.miss])
 
     def start(self):
-        self.chart: list[Note] = self.generate_chart(NOTES, BPM)
+        self.chart: list[Note] = self.generate_chart(NOTES, BPM, self.state.random)
         self.note_sprites: list[NoteSprite] = [NoteSprite(n) for n in self.chart]
         self.spritelist.extend([n.sprite for n in self.note_sprites])
         for n, s in enumerate(self.strikeline_sprites):
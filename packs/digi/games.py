@@ -1,11 +1,11 @@
 from __future__ import annotations
-import random
 
 import arcade
 from arcade.types import AnchorPoint
 
 from aware.anim import bounce, lerp
 from aware.utils import clamp, map_range
+from aware.graphics.batch import DisplayBatch
 from engine.play import ContentFlag, PlayState, Game
 from engine.resources import get_sound, get_sprite
 from packs.digi.lib.slider import Slider
@@ -15,8 +15,13 @@ from .lib import noa
 LEEWAY_TIME = 1.5
 
 class DoNothingGame(Game):
+    PROMPT = "DO NOTHING!"
+    CONTROLS = "default.inputs.nothing"
+    DURATION = LEEWAY_TIME + 3
+    FLAGS = ContentFlag.PHOTOSENSITIVE
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "DO NOTHING!", controls = "default.inputs.nothing", duration = LEEWAY_TIME + 3, flags = ContentFlag.PHOTOSENSITIVE)
+        super().__init__(state)
         self.sprites = [
             get_sprite("digi.donothing.3", self.window.center_x, self.window.center_y),
             get_sprite("digi.donothing.2", self.window.center_x, self.window.center_y),
@@ -82,8 +87,13 @@ BLUE_BALL_COLOR = noa.get_color(9, 4, 9)
 BLUE_SIDE_COLOR = noa.get_color(9, 8, 9)
 
 class SortGame(Game):
+    PROMPT = "SORT!"
+    CONTROLS = "default.inputs.mouse"
+    DURATION = VERY_LONG
+    FLAGS = ContentFlag.COLORBLIND
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "SORT!", controls = "default.inputs.mouse", duration = VERY_LONG, flags = ContentFlag.COLORBLIND)
+        super().__init__(state)
         self.red_balls = [arcade.SpriteCircle(BALL_RADIUS, RED_BALL_COLOR) for _ in range(int(BALL_COUNT / 2))]
         self.blue_balls = [arcade.SpriteCircle(BALL_RADIUS, BLUE_BALL_COLOR)  for _ in range(int(BALL_COUNT / 2))]
 
@@ -108,8 +118,8 @@ class SortGame(Game):
     
     def scramble(self) -> None:
         for ball in self.all_balls:
-            x = random.randrange(BALL_RADIUS, self.window.width - BALL_RADIUS)
-            y = random.randrange(BALL_RADIUS, self.window.height - BALL_RADIUS - 65) + 65
+            x = self.state.random.randrange(BALL_RADIUS, self.window.width - BALL_RADIUS)
+            y = self.state.random.randrange(BALL_RADIUS, self.window.height - BALL_RADIUS - 65) + 65
             ball.position = (x, y)
 
     @property
@@ -185,9 +195,14 @@ KEY_MAPPING = {getattr(arcade.key, let.upper()): let for let in LETTERS}
 LEAVE_TIME = 1.0
 
 class LetterGame(Game):
+    PROMPT = "PRESS!"
+    CONTROLS = "default.inputs.keyboard"
+    DURATION = 3.0
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "PRESS!", controls = "default.inputs.keyboard", duration = 3.0)
-        self.chosen_letter = random.choice(LETTERS)
+        super().__init__(state)
+        # The real letter is picked every time the game starts.
+        self.chosen_letter = LETTERS[0]
         self.sound = get_sound(f"digi.letters.{self.chosen_letter}")
         self.text = arcade.Text('?', self.window.center_x, self.window.center_y, anchor_x = "center", anchor_y = "bottom", font_size = 240, font_name = "8BITOPERATOR JVE")
 
@@ -198,7 +213,7 @@ class LetterGame(Game):
         self.win_time = float("inf")
 
     def start(self):
-        self.chosen_letter = random.choice(LETTERS)
+        self.chosen_letter = self.state.random.choice(LETTERS)
         self.sound = get_sound(f"digi.letters.{self.chosen_letter}")
         self.text.text = self.chosen_letter.upper()
         self.text.color = arcade.color.WHITE
@@ -239,8 +254,12 @@ GRID_COLUMNS = 7
 SPOT_SIZE = 25
 
 class WhackAMoleGame(Game):
+    PROMPT = "WHACK!"
+    CONTROLS = "default.inputs.mouse"
+    DURATION = REQUIRED_WHACKS / WHACKS_PER_SECOND
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "WHACK!", controls = "default.inputs.mouse", duration = REQUIRED_WHACKS / WHACKS_PER_SECOND)
+        super().__init__(state)
 
         self.sprites = [arcade.SpriteCircle(SPOT_SIZE, arcade.color.RED) for _ in range(GRID_ROWS * GRID_COLUMNS)]
         self.spritelist = arcade.SpriteList()
@@ -268,7 +287,7 @@ class WhackAMoleGame(Game):
         return all([s.color == arcade.color.RED for s in self.sprites])
 
     def starting_state(self):
-        idxs = random.choices(range(GRID_COLUMNS * GRID_ROWS), k = REQUIRED_WHACKS)
+        idxs = self.state.random.choices(range(GRID_COLUMNS * GRID_ROWS), k = REQUIRED_WHACKS)
         for i in idxs:
             self.sprites[i].color = arcade.color.GREEN
 
@@ -309,8 +328,12 @@ PENCIL_START = 1359 * CSB_TO_AW
 PENCIL_LENGTH = 716 * CSB_TO_AW
 
 class PencilSharpeningGame(Game):
+    PROMPT = "SHARPEN!"
+    CONTROLS = "digi.inputs.qe"
+    DURATION = 5.0
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "SHARPEN!", controls = "digi.inputs.qe", duration = 5.0)
+        super().__init__(state)
 
         self.bg = get_sprite("digi.pencil.stage_back")
         self.stage_right_1 = get_sprite("digi.pencil.stage_right_1")
@@ -422,16 +445,19 @@ MOVE_SPEED = 1.0
 KNIFE_WIDTH = 10
 
 class ChopGame(Game):
+    PROMPT = "CHOP!"
+    CONTROLS = "default.inputs.spacebar"
+    DURATION = 3.0
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "CHOP!", controls = "default.inputs.spacebar", duration = 3.0)
+        super().__init__(state)
 
-        self.chop_region = arcade.rect.XYWH(0, self.window.center_y, CHOP_REGION_SIZE, self.window.height / 3)
-        self.chop_region = self.chop_region.align_x(random.randrange(int(CHOP_REGION_SIZE / 2), int(self.window.width - CHOP_REGION_SIZE / 2)))
+        self.chop_region = arcade.rect.XYWH(self.window.center_x, self.window.center_y, CHOP_REGION_SIZE, self.window.height / 3)
 
         self.knife = arcade.rect.XYWH(self.window.center_x, self.window.center_y, KNIFE_WIDTH, self.window.height / 1.5)
 
     def start(self):
-        ...
+        self.chop_region = self.chop_region.align_x(self.state.random.randrange(int(CHOP_REGION_SIZE / 2), int(self.window.width - CHOP_REGION_SIZE / 2)))
 
     def draw(self):
         arcade.draw_rect_filled(self.chop_region, arcade.color.RED.replace(a = 128))
@@ -454,8 +480,12 @@ class ChopGame(Game):
                 self.fail()
 
 class ComboLockGame(Game):
+    PROMPT = "UNLOCK!"
+    CONTROLS = "default.inputs.arrows"
+    DURATION = 5.0
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "UNLOCK!", controls = "default.inputs.arrows", duration = 5.0)
+        super().__init__(state)
 
         self.digit_2 = arcade.Text('2', self.window.center_x, self.window.center_y + 60, anchor_x = "center", anchor_y = "center", align = "center", font_size = 240, font_name = "8BITOPERATOR JVE")
         self.digit_1 = arcade.Text('1', self.digit_2.left - 10, self.window.center_y + 60, anchor_x = "right", anchor_y = "center", align = "right", font_size = 240, font_name = "8BITOPERATOR JVE")
@@ -500,8 +530,13 @@ class ComboLockGame(Game):
                                 self.digit_2_up, self.digit_2_down,
                                 self.digit_3_up, self.digit_3_down])
 
-        self.combination = random.randrange(000, 1000)
-        self.current_combination = self.generate_starting_combo()
+        self.batch = DisplayBatch(sprites_over_text = True, spritelist = self.spritelist)
+        for t in [self.digit_1, self.digit_2, self.digit_3]:
+            self.batch.add_text(t)
+
+        # The real combination is picked every time the game starts.
+        self.combination = 0
+        self.current_combination = 0
 
         self.selected_digit = 0
         self.success_time = None
@@ -521,7 +556,7 @@ class ComboLockGame(Game):
         return f"{self.current_combination:03}"
 
     def start(self):
-        self.combination = random.randrange(000, 1000)
+        self.combination = self.state.random.randrange(000, 1000)
         self.current_combination = self.generate_starting_combo()
         self.set_arrows()
         self.highlight()
@@ -534,7 +569,7 @@ class ComboLockGame(Game):
         all_digits = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
         for digit in self.intended_combo_string:
             d = int(digit)
-            combo += (str(random.choice([nd for nd in all_digits if nd != d])))
+            combo += (str(self.state.random.choice([nd for nd in all_digits if nd != d])))
         return int(combo)
 
     def reset_arrows(self):
@@ -581,10 +616,7 @@ class ComboLockGame(Game):
             t.text = str(i)
 
     def draw(self):
-        self.digit_1.draw()
-        self.digit_2.draw()
-        self.digit_3.draw()
-        self.spritelist.draw()
+        self.batch.draw()
 
         # for t in [self.digit_1, self.digit_2, self.digit_3]:
         #     # OG method
@@ -653,11 +685,16 @@ class ComboLockGame(Game):
 IN_TIME_NEEDED = 1.0
 
 class SliderGame(Game):
+    PROMPT = "SLIDE!"
+    CONTROLS = "default.inputs.mouse"
+    DURATION = 6.0
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "SLIDE!", controls = "default.inputs.mouse", duration = 6.0)
+        super().__init__(state)
         self.slider = Slider(arcade.XYWH(self.window.center_x, self.window.center_y * 0.25, self.window.width * 0.75, 25),
                              inner_color = arcade.color.SLATE_GRAY, rounding_function = int)
-        self.intended_value = random.randrange(0, 100)
+        # The real value is picked every time the game starts.
+        self.intended_value = 0
 
         self.time_correct = 0.0
 
@@ -666,7 +703,7 @@ class SliderGame(Game):
 
     def start(self):
         self.slider.value = 0
-        self.intended_value = random.randrange(0, 100)
+        self.intended_value = self.state.random.randrange(0, 100)
         self.time_correct = 0.0
         self.text.text = str(self.intended_value)
         self.slider_text.text = "0"
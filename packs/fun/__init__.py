@@ -10,5 +10,6 @@ def setup():
     return Pack(
         games=(ShooterGame),
         transitions=(),
-        fails=()
+        fails=(),
+        definitions="games.toml"
     )
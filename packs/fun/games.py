@@ -6,9 +6,13 @@ from engine.play import ContentFlag, PlayState, Game
 from engine.resources import get_sound, get_sprite
 
 class ShooterGame(Game):
+    PROMPT = "SHOOT!"
+    CONTROLS = "default.inputs.mouse"
+    DURATION = 3.0
+    FLAGS = ContentFlag.NONE
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "SHOOT!", controls = "default.inputs.mouse",
-                         duration = 3.0, flags = ContentFlag.NONE)
+        super().__init__(state)
         
         self.sky = get_sprite("fun.gun.sky")
         self.wood = get_sprite("fun.gun.wood")
@@ -2,11 +2,18 @@ from __future__ import annotations
 
 import arcade
 
-from engine.play import PlayState, Game
+from engine.play import ContentFlag, PlayState, Game
 
 class TemplateGame(Game):
+    # The metadata is read without creating the game, so keep it on the class.
+    PROMPT = "PROMPT"
+    CONTROLS = "default.inputs.nothing"
+    DURATION = 10.0
+    FLAGS = ContentFlag.NONE
+    BOSS = False
+
     def __init__(self, state: PlayState) -> None:
-        super().__init__(state, prompt = "PROMPT", controls = "default.inputs.nothing", duration = 10.0)
+        super().__init__(state)
         ...
     
     def start(self):
@@ -15,6 +22,9 @@ class TemplateGame(Game):
     def finish(self):
         ...
 
+    def teardown(self):
+        ...
+
     def draw(self):
         ...
 
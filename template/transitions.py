@@ -10,11 +10,12 @@ class TemplateTransition(Transition):
         self.text = arcade.Text("", self.state.screen_width/2.0, self.state.screen_height/2.0, anchor_x="center", anchor_y="center", font_size = 24, font_name = "A-OTF Shin Go Pro", bold = True)
     
     def draw(self):
-        if self.state.display_time <= 1.0 and self.state.has_game_finished:
-            text = "WELL DONE!" if self.state.has_game_succeeded else "YOU FAILED."
-        elif self.state.is_speedup and self.state.display_time >= 2.0:
-            text = f"SPEEDUP!!! ({self.state.tick_speed:.2f}x)"
+        frame = self.state.frame
+        if frame.display_time <= 1.0 and frame.has_game_finished:
+            text = "WELL DONE!" if frame.has_game_succeeded else "YOU FAILED."
+        elif frame.is_speedup and frame.display_time >= 2.0:
+            text = f"SPEEDUP!!! ({frame.tick_speed:.2f}x)"
         else:
             text = "TRANSITION..."
-        self.text.text = f"{text} GAME: {self.state.count}, FAILED: {self.state.strikes}"
+        self.text.text = f"{text} GAME: {frame.count}, FAILED: {frame.strikes}"
         self.text.draw()
@@ -0,0 +1,39 @@
+import os
+
+# Both have to be set before arcade or pyglet are imported anywhere.
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+
+import pyglet
+pyglet.options.audio = ("silent",)
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def window():
+    # One offscreen context with every pack loaded, shared by every test which needs GL.
+    # Resources are found relative to the working directory, so run pytest from the repo root.
+    from aware.launch import load_fonts
+    from engine.finder import packs
+    from engine.headless import create_headless_window
+    from engine.resources import load_resources
+
+    load_fonts()
+    load_resources()
+    packs.load_packs()
+    win = create_headless_window()
+    yield win
+    win.close()
+
+
+@pytest.fixture(scope="session")
+def games(window):
+    # Games which play fine without audio, the same set the farm is usually pointed at.
+    from engine.finder import packs
+    names = (
+        "digi.ChopGame", "digi.SortGame", "digi.LetterGame", "digi.SliderGame", "digi.ComboLockGame",
+        "digi.WhackAMoleGame", "digi.PencilSharpeningGame", "digi.CharmGame",
+        "fun.ShooterGame", "fun.TargetShootingGame", "fun.HoldFireGame",
+        "default.ShakeEmUp", "default.JuggleTheBall",
+    )
+    return tuple(packs.get_game(name) for name in names)
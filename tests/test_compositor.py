@@ -0,0 +1,76 @@
+from arcade import Text, color, draw_lbwh_rectangle_filled
+
+from aware.graphics.compositor import Compositor, Layer
+
+
+class Scene:
+    # An opaque background, a live layer which moves every frame, and see through layers over it.
+
+    def __init__(self, tint: tuple[int, int, int] = (40, 90, 160)) -> None:
+        self.tint = tint
+        self.x = 0.0
+        self.label = "hello"
+        self.text = Text(self.label, 200, 200, font_size=40, color=(255, 255, 255, 200))
+        self.shadow = Text(self.label, 203, 197, font_size=40, color=color.BLACK.replace(a=128))
+
+    def background(self):
+        draw_lbwh_rectangle_filled(0, 0, 1280, 720, self.tint)
+        draw_lbwh_rectangle_filled(100, 100, 300, 300, (200, 30, 30))
+
+    def live(self):
+        draw_lbwh_rectangle_filled(self.x, 150, 400, 200, (250, 220, 0, 180))
+
+    def over(self):
+        draw_lbwh_rectangle_filled(150, 120, 200, 200, (0, 200, 100, 100))
+        draw_lbwh_rectangle_filled(250, 220, 200, 200, (255, 0, 255, 160))
+        self.shadow.text = self.text.text = self.label
+        self.shadow.draw()
+        self.text.draw()
+
+    def draw(self):
+        self.background()
+        self.live()
+        self.over()
+
+    def compositor(self) -> Compositor:
+        compositor = Compositor()
+        compositor.add_layer(self.background)
+        compositor.add_layer(self.live, Layer.TIMED)
+        compositor.add_layer(self.over, Layer.DIRTY, key=lambda: self.label)
+        return compositor
+
+
+def _draw(window, draw) -> bytes:
+    window.ctx.screen.use()
+    window.clear()
+    draw()
+    return bytes(window.ctx.screen.read(components=3))
+
+
+def _close(a: bytes, b: bytes) -> bool:
+    # Going through 8 bit framebuffers twice can round a little differently.
+    return len(a) == len(b) and max(abs(x - y) for x, y in zip(a, b)) <= 3
+
+
+def test_compositor_matches_drawing_directly(window):
+    scene = Scene()
+    compositor = scene.compositor()
+    for x, label in ((0.0, "hello"), (120.0, "hello"), (240.0, "changed")):
+        scene.x, scene.label = x, label
+        assert _close(_draw(window, compositor.draw), _draw(window, scene.draw))
+    # Both caches drawn once, then the one over the live layer again when the label changed.
+    assert compositor.redraws == 3
+
+
+def test_compositors_share_framebuffers(window):
+    first, second = Scene(), Scene((120, 20, 60))
+    first_compositor, second_compositor = first.compositor(), second.compositor()
+
+    assert _close(_draw(window, first_compositor.draw), _draw(window, first.draw))
+    assert _close(_draw(window, second_compositor.draw), _draw(window, second.draw))
+    # The second one drew over the first one's caches, so they have to be drawn again.
+    redraws = first_compositor.redraws
+    assert _close(_draw(window, first_compositor.draw), _draw(window, first.draw))
+    assert first_compositor.redraws == redraws + 2
+    _draw(window, first_compositor.draw)
+    assert first_compositor.redraws == redraws + 2
@@ -0,0 +1,101 @@
+import json
+import os
+
+import arcade
+import pytest
+
+from engine.definitions import DeclaredGame, compile_games, load_definitions
+from engine.play import ContentFlag
+
+
+TOML = """
+[pack]
+name = "Test Pack"
+
+[[games]]
+name = "PressGame"
+prompt = "PRESS!"
+duration = 3.5
+keys = ["space", "a"]
+count = 3
+flags = ["PHOTOSENSITIVE"]
+
+[[games]]
+name = "ClickGame"
+goal = "click"
+boss = true
+
+[[games.sprites]]
+texture = "default.ball"
+x = 0.25
+target = true
+"""
+
+
+def test_toml_games_are_compiled(tmp_path):
+    pth = tmp_path / "games.toml"
+    pth.write_text(TOML)
+    pack, games = load_definitions(pth, "test")
+
+    assert pack == {"name": "Test Pack"}
+    press, click = games
+    assert issubclass(press, DeclaredGame)
+    assert press.__module__ == "test" and press.__qualname__ == "PressGame"
+    assert press.PROMPT == "PRESS!"
+    assert press.DURATION == 3.5
+    assert press.KEYS == frozenset((arcade.key.SPACE, arcade.key.A))
+    assert press.COUNT == 3
+    assert press.FLAGS == ContentFlag.PHOTOSENSITIVE
+    assert not press.BOSS
+
+    # Click games default to the left mouse button and every target.
+    assert click.GOAL == "click" and click.BOSS
+    assert click.KEYS == frozenset((arcade.MOUSE_BUTTON_LEFT,))
+    assert click.COUNT == 0
+    (sprite,) = click.SPRITES
+    assert (sprite.texture, sprite.x, sprite.y, sprite.target) == ("default.ball", 0.25, 0.5, True)
+
+
+def test_json_matches_toml(tmp_path):
+    pth = tmp_path / "games.json"
+    pth.write_text(json.dumps({"games": [{"name": "AvoidGame", "goal": "avoid"}]}))
+    (game,) = compile_games(pth, "test")
+    # Avoiding is won by running out the clock.
+    assert game.GOAL == "avoid" and game.ON_TIMEOUT == "succeed"
+
+
+def test_compiled_games_are_cached_until_modified(tmp_path):
+    pth = tmp_path / "games.toml"
+    pth.write_text(TOML)
+    first = compile_games(pth, "test")
+    assert compile_games(pth, "test") is first
+
+    pth.write_text(TOML.replace("PRESS!", "PRESS AGAIN!"))
+    stat = pth.stat()
+    os.utime(pth, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = compile_games(pth, "test")
+    assert second is not first
+    assert second[0].PROMPT == "PRESS AGAIN!"
+
+
+@pytest.mark.parametrize("definition", [
+    {"name": "not an identifier"},
+    {"goal": "press"},
+    {"name": "BadGoal", "goal": "dance"},
+    {"name": "BadKey", "keys": ["NOT_A_KEY"]},
+    {"name": "BadFlag", "flags": ["NOT_A_FLAG"]},
+    {"name": "BadTimeout", "on_timeout": "explode"},
+    {"name": "BadWrongInput", "wrong_input": "succeed"},
+])
+def test_invalid_definitions_raise(tmp_path, definition):
+    pth = tmp_path / "games.json"
+    pth.write_text(json.dumps({"games": [definition]}))
+    with pytest.raises(ValueError):
+        load_definitions(pth, "test")
+
+
+def test_unknown_suffix_raises(tmp_path):
+    pth = tmp_path / "games.yaml"
+    pth.write_text("games: []")
+    with pytest.raises(ValueError):
+        load_definitions(pth, "test")
@@ -0,0 +1,78 @@
+import gc
+
+from engine.finder import packs
+from engine.headless import HeadlessDriver, random_policy
+from engine.play import PlayEvent, PlayEvents, PlayView
+
+
+class Listener:
+    def __init__(self) -> None:
+        self.seen: list[PlayEvent] = []
+
+    def on_event(self, event, view, display):
+        self.seen.append(event)
+
+
+def test_subscribers_are_held_weakly():
+    events = PlayEvents(object())  # type: ignore
+    listener = Listener()
+    seen = []
+
+    def handler(event, view, display):
+        seen.append(event)
+
+    events.subscribe(PlayEvent.SPEEDUP, listener.on_event)
+    events.subscribe(PlayEvent.SPEEDUP, handler)
+    events.fire(PlayEvent.SPEEDUP)
+    assert listener.seen == seen == [PlayEvent.SPEEDUP]
+
+    del listener
+    gc.collect()
+    events.fire(PlayEvent.SPEEDUP)
+    assert seen == [PlayEvent.SPEEDUP] * 2
+    assert len(events._now[PlayEvent.SPEEDUP]) == 1
+
+    events.unsubscribe(PlayEvent.SPEEDUP, handler)
+    events.fire(PlayEvent.SPEEDUP)
+    assert len(seen) == 2
+
+
+def test_deferred_handlers_wait_for_flush():
+    view = object()
+    events = PlayEvents(view)  # type: ignore
+    seen = []
+
+    def handler(event, source, display):
+        seen.append((event, source, display))
+
+    events.subscribe(PlayEvent.DISPLAY_STARTED, handler, deferred=True)
+    events.fire(PlayEvent.DISPLAY_STARTED, "first")  # type: ignore
+    events.fire(PlayEvent.DISPLAY_STARTED, "second")  # type: ignore
+    assert seen == []
+    events.flush()
+    assert seen == [(PlayEvent.DISPLAY_STARTED, view, "first"), (PlayEvent.DISPLAY_STARTED, view, "second")]
+    events.flush()
+    assert len(seen) == 2
+
+
+def test_frame_matches_the_view_when_events_fire(window, games):
+    view = PlayView(games, packs.get_all_transitions(), packs.get_all_fails(), seed=11)
+    mismatched = []
+    counts = {event: 0 for event in PlayEvent}
+
+    def handler(event, source, display):
+        counts[event] += 1
+        frame = source.frame
+        if (frame.count, frame.strikes, frame.speed) != (source.count, source.strikes, source.speed):
+            mismatched.append((event, frame.count, source.count, frame.strikes, source.strikes))
+
+    for event in PlayEvent:
+        view.events.subscribe(event, handler)
+
+    driver = HeadlessDriver(view, 1 / 30, random_policy(9))
+    result = driver.run(sessions=2, play_time=900.0)
+    assert result.sessions == 2
+    assert counts[PlayEvent.PLAY_OVER] == 2
+    assert counts[PlayEvent.RESTART] == 2
+    assert counts[PlayEvent.GAME_SUCCEEDED] + counts[PlayEvent.GAME_FAILED] == result.games
+    assert mismatched == []
@@ -0,0 +1,86 @@
+import pytest
+
+import engine.play
+import tools.farm as farm
+from engine.finder import packs
+from engine.play import MAX_STRIKE_COUNT
+from tools.farm import ChunkResult, FarmConfig, FarmReport, check_chunk, chunk_seeds, run_farm, set_constants
+
+
+def test_check_chunk():
+    result = ChunkResult(0, games=[("a.Game", 0, True, 1.0), ("a.Game", 0, False, 2.0)], sessions=[(2, 1, 0, 10.0)])
+    check_chunk(result)
+    result.games.append(("b.Game", 1, False, 3.0))
+    with pytest.raises(RuntimeError):
+        check_chunk(result)
+
+
+def test_chunk_seeds():
+    assert chunk_seeds(4, 10) == chunk_seeds(4, 10)
+    # Nearby farm seeds shouldn't play any of the same chunks.
+    assert not set(chunk_seeds(0, 100)) & set(chunk_seeds(1, 100))
+    assert len(set(chunk_seeds(0, 100))) == 100
+
+
+def test_set_constants(monkeypatch):
+    # Put them back afterwards.
+    for name in ("MAX_STRIKE_COUNT", "FIXED_STEP_RATE", "FIXED_STEP_TIME"):
+        monkeypatch.setattr(engine.play, name, getattr(engine.play, name))
+
+    set_constants({"MAX_STRIKE_COUNT": 5.0, "FIXED_STEP_RATE": 60.0})
+    assert engine.play.MAX_STRIKE_COUNT == 5 and isinstance(engine.play.MAX_STRIKE_COUNT, int)
+    assert engine.play.FIXED_STEP_TIME == 1.0 / 60.0
+
+    with pytest.raises(ValueError):
+        set_constants({"FIXED_STEP_TIME": 0.01})
+    with pytest.raises(ValueError):
+        set_constants({"NOT_A_CONSTANT": 1.0})
+    with pytest.raises(ValueError):
+        run_farm(1, FarmConfig(constants={"FIXED_STEP_TIME": 0.01}), workers=1, progress=False)
+
+
+def test_report_totals():
+    report = FarmReport()
+    report.add(ChunkResult(0, games=[("a.Game", 0, True, 1.0), ("a.Game", 0, False, 3.0)], sessions=[(2, 1, 0, 10.0)], steps=5, real_time=1.0))
+    report.add(ChunkResult(1, games=[("a.Game", 1, True, 2.0)], sessions=[(1, 0, 1, 20.0)], steps=7, real_time=2.0))
+
+    assert (report.chunks, report.steps, report.worker_time, report.sessions) == (2, 12, 3.0, 2)
+    assert report.success_rates() == [
+        {"game": "a.Game", "speed": 0, "plays": 2, "wins": 1, "rate": 0.5, "mean_time": 2.0},
+        {"game": "a.Game", "speed": 1, "plays": 1, "wins": 1, "rate": 1.0, "mean_time": 2.0},
+    ]
+    lengths = report.session_lengths()
+    assert lengths["mean_games"] == 1.5
+    assert lengths["games"] == {"1": 1, "2": 1}
+    assert lengths["play_time"]["max"] == 20.0
+
+
+def _check_totals(result: ChunkResult, sessions: int):
+    check_chunk(result)
+    assert len(result.sessions) == sessions
+    # Every session is played until it's lost, and every strike is a game that was lost.
+    assert all(strikes == MAX_STRIKE_COUNT for _, strikes, _, _ in result.sessions)
+    assert sum(not won for _, _, won, _ in result.games) == sum(strikes for _, strikes, _, _ in result.sessions)
+    assert sum(play_time for *_, play_time in result.sessions) > 0.0
+
+
+def test_chunk_totals_add_up(window, games, monkeypatch):
+    # Play a chunk in this process rather than setting up a worker, the window is already made.
+    monkeypatch.setattr(farm, "_config", FarmConfig(step=1 / 30))
+    monkeypatch.setattr(farm, "_games", games)
+    monkeypatch.setattr(farm, "_transitions", packs.get_all_transitions())
+    monkeypatch.setattr(farm, "_fails", packs.get_all_fails())
+
+    result = farm._run_chunk(5, 3)
+    _check_totals(result, 3)
+    assert {name for name, *_ in result.games} <= {packs.get_display_name(game) for game in games}
+
+
+def test_farm_workers():
+    # Spawned workers make their own contexts, they get ARCADE_HEADLESS from this process.
+    config = FarmConfig(step=1 / 30, games=("digi.ChopGame", "digi.SliderGame", "fun.HoldFireGame", "default.ShakeEmUp"))
+    report = run_farm(4, config, workers=1, chunk=2, progress=False)
+    assert (report.chunks, report.sessions) == (2, 4)
+    plays = sum(int(totals[0]) for totals in report.games.values())
+    assert plays == sum(length * count for length, count in report.session_games.items())
+    assert {name for name, _ in report.games} <= set(config.games)
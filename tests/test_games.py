@@ -0,0 +1,28 @@
+from engine.finder import packs
+from engine.headless import HeadlessDriver, random_policy
+from engine.play import PlayView
+
+
+def _juggle(window, draw_every: int):
+    juggle = packs.get_game("default.JuggleTheBall")
+    view = PlayView((juggle,), packs.get_all_transitions(), packs.get_all_fails(), seed=7)
+    driver = HeadlessDriver(view, 1 / 60, random_policy(3, press_chance=0.2), draw_every=draw_every)
+    driver.start()
+
+    trace = []
+    for _ in range(900):
+        driver.step()
+        game = view.active_game
+        if isinstance(game, juggle):
+            # Drawing interpolates the sprites but always puts them back where the simulation has them.
+            assert [ball.position for ball in game.balls] == game._current
+            trace.append((view.count, view.strikes, tuple(game._current), game.clicks))
+        if view.play_over:
+            view.restart()
+    return trace
+
+
+def test_juggle_hit_testing_ignores_drawing(window):
+    drawn = _juggle(window, draw_every=1)
+    assert drawn
+    assert _juggle(window, draw_every=0) == drawn
@@ -0,0 +1,70 @@
+from arcade import LRBT
+
+from aware.graphics.gradient import Gradient, GradientBatch
+
+
+def _specs():
+    return [
+        [LRBT(0, 400, 0, 300), [(0.0, (10, 20, 30)), (0.5, (90, 20, 200)), (1.0, (200, 200, 0))], True],
+        [LRBT(100, 700, 200, 500), [(0.1, (255, 0, 0)), (0.3, (0, 255, 0, 128)), (0.9, (0, 0, 255))], False],
+        [LRBT(500, 900, 50, 150), [(0.5, (255, 255, 0)), (0.7, (0, 255, 255))], True],
+    ]
+
+
+def _draw(window, draw) -> bytes:
+    window.ctx.screen.use()
+    window.clear()
+    draw()
+    return bytes(window.ctx.screen.read(components=3))
+
+
+def _matches(window, batch: GradientBatch, specs) -> bool:
+    # The batch has to look the same as drawing each gradient on its own.
+    singles = [Gradient(*spec) for spec in specs]
+
+    def draw_singles():
+        for gradient in singles:
+            gradient.draw()
+    return _draw(window, draw_singles) == _draw(window, batch.draw)
+
+
+def test_batch_matches_single_gradients(window):
+    specs = _specs()
+    batch = GradientBatch()
+    handles = [batch.add(*spec) for spec in specs]
+    assert len(batch) == 3
+    assert _matches(window, batch, specs)
+
+    # Changes which fit in a gradient's range, and one which has to pack everything again.
+    specs[0][1][0] = (0.0, (1, 2, 3))
+    handles[0].set_color((1, 2, 3), 0)
+    specs[2][0] = LRBT(0, 50, 0, 50)
+    handles[2].rect = LRBT(0, 50, 0, 50)
+    assert _matches(window, batch, specs)
+
+    specs[1][1].append((0.6, (9, 9, 9)))
+    handles[1].add_color(0.6, (9, 9, 9))
+    assert _matches(window, batch, specs)
+
+
+def test_removed_gradients_are_detached(window):
+    specs = _specs()
+    batch = GradientBatch()
+    handles = [batch.add(*spec) for spec in specs]
+    batch.draw()
+
+    # Changed and then removed in the same frame, it mustn't get written anywhere.
+    gone = handles.pop(0)
+    gone.set_color((0, 0, 0), 0)
+    batch.remove(gone)
+    specs.pop(0)
+    assert gone.batch is None
+    assert _matches(window, batch, specs)
+
+    # After the others are packed into its old range, changing it still mustn't write over them.
+    gone.set_color((255, 255, 255), 0)
+    gone.rect = LRBT(0, 1280, 0, 720)
+    handles[0].set_color((50, 60, 70), 0)
+    specs[0][1][0] = (0.1, (50, 60, 70))
+    assert _matches(window, batch, specs)
+    assert len(batch) == 2
@@ -0,0 +1,12 @@
+from random import Random
+
+from engine.headless import SEED_BITS, derive_seed
+
+
+def test_derived_seeds_are_independent():
+    assert derive_seed(5, "policy") == derive_seed(5, "policy")
+    seeds = {derive_seed(seed, stream) for seed in range(100) for stream in ("policy", "chunk")}
+    assert len(seeds) == 200
+    assert all(0 <= seed < 1 << SEED_BITS for seed in seeds)
+    # Not the session's own stream.
+    assert Random(derive_seed(5, "policy")).random() != Random(5).random()
@@ -0,0 +1,67 @@
+from engine.input import InputBuffer
+from engine.replay import Record, RecordKind
+
+
+def _record(kind: RecordKind, time: float, x: float = 0.0) -> Record:
+    return Record(kind, time, 0, 0, x, 0.0, 1.0, 0.0)
+
+
+def test_motion_runs_are_grouped():
+    buffer = InputBuffer()
+    events = [
+        _record(RecordKind.MOUSE_MOTION, 0.0, 1.0),
+        _record(RecordKind.MOUSE_MOTION, 0.1, 2.0),
+        _record(RecordKind.MOUSE_PRESS, 0.2),
+        _record(RecordKind.KEY_PRESS, 0.3),
+        _record(RecordKind.MOUSE_MOTION, 0.4, 3.0),
+        _record(RecordKind.MOUSE_RELEASE, 0.5),
+        _record(RecordKind.MOUSE_MOTION, 0.6, 4.0),
+        _record(RecordKind.MOUSE_MOTION, 0.7, 5.0),
+        _record(RecordKind.MOUSE_MOTION, 0.8, 6.0),
+    ]
+    for event in events:
+        buffer.push(event)
+    assert len(buffer) == len(events)
+
+    # Motion never gets moved past a press or release, so the order stays the same.
+    assert list(buffer.drain()) == [events[0:2], events[2], events[3], [events[4]], events[5], events[6:9]]
+    assert len(buffer) == 0
+    assert list(buffer.drain()) == []
+
+
+def test_input_pushed_while_draining_waits():
+    buffer = InputBuffer()
+    first = _record(RecordKind.KEY_PRESS, 0.0)
+    late = _record(RecordKind.KEY_RELEASE, 0.1)
+    buffer.push(first)
+
+    drained = []
+    for event in buffer.drain():
+        drained.append(event)
+        buffer.push(late)
+    assert drained == [first]
+    assert list(buffer.drain()) == [late]
+
+
+def test_clear():
+    buffer = InputBuffer()
+    buffer.push(_record(RecordKind.KEY_PRESS, 0.0))
+    buffer.clear()
+    assert len(buffer) == 0
+    assert list(buffer.drain()) == []
+
+
+def test_clear_while_draining_stops_the_drain():
+    buffer = InputBuffer()
+    events = [_record(RecordKind.KEY_PRESS, 0.0), _record(RecordKind.MOUSE_MOTION, 0.1), _record(RecordKind.KEY_RELEASE, 0.2)]
+    for event in events:
+        buffer.push(event)
+
+    drained = []
+    for event in buffer.drain():
+        drained.append(event)
+        # i.e. the first press restarts the session.
+        buffer.push(_record(RecordKind.KEY_PRESS, 0.3))
+        buffer.clear()
+    assert drained == [events[0]]
+    assert list(buffer.drain()) == []
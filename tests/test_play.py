@@ -0,0 +1,82 @@
+from engine.finder import packs
+from engine.headless import HeadlessDriver, random_policy
+from engine.play import Display, PlayView, Transition
+from engine.replay import RecordKind
+
+
+def _session(games, steps: int = 3000):
+    view = PlayView(games, packs.get_all_transitions(), packs.get_all_fails(), seed=17)
+    driver = HeadlessDriver(view, 1 / 30, random_policy(2))
+    driver.start()
+    trace = []
+    for _ in range(steps):
+        driver.step()
+        trace.append((view.count, view.strikes, type(view.active_display).__name__, view.play_clock.time, view.random.getstate()))
+        if view.play_over:
+            view.restart()
+    return view, trace
+
+
+def test_warm_up_changes_nothing(window, games, monkeypatch):
+    view, prepared = _session(games)
+    assert sum(view.timings.get(game, "warmup").count for game in games)
+
+    monkeypatch.setattr(Display, "prepare", lambda self: None)
+    _, unprepared = _session(games)
+    assert prepared == unprepared
+
+
+def test_games_are_prepared_during_the_transition(window, games, monkeypatch):
+    prepared = []
+    original = Display.prepare
+
+    def prepare(self):
+        view = self.state._source
+        prepared.append((self, isinstance(view.active_display, Transition), view.next_game))
+        original(self)
+
+    monkeypatch.setattr(Display, "prepare", prepare)
+    _session(games, 600)
+    assert prepared
+    for display, in_transition, next_game in prepared:
+        assert in_transition and display is next_game
+
+
+def test_eviction_ignores_tracemalloc(window, games):
+    import tracemalloc
+    from engine.play import DEFAULT_DISPLAY_FOOTPRINT, DisplayCache
+
+    def kept() -> tuple[list[type[Display]], dict[type[Display], int]]:
+        view = PlayView(games, packs.get_all_transitions(), packs.get_all_fails(), seed=17)
+        cache = DisplayCache(view.state, max_memory=3 * DEFAULT_DISPLAY_FOOTPRINT)
+        for game in games[:5]:
+            cache.preload(game)
+        assert cache.idle_memory == 3 * DEFAULT_DISPLAY_FOOTPRINT
+        idle = list(cache._idle)
+        measured = cache.measured
+        cache.clear()
+        return idle, measured
+
+    idle, measured = kept()
+    tracemalloc.start()
+    try:
+        traced_idle, traced_measured = kept()
+    finally:
+        tracemalloc.stop()
+    assert idle == traced_idle == list(games[2:5])
+    assert not measured and traced_measured
+
+
+def test_restart_starts_from_nothing(window, games):
+    view = PlayView(games, packs.get_all_transitions(), packs.get_all_fails(), seed=17)
+    driver = HeadlessDriver(view, 1 / 30, random_policy(2))
+    driver.start()
+    while view._warmed is None:
+        driver.step()
+    view._step_accumulator = view.step_alpha = 0.5
+    view.push_input(RecordKind.KEY_PRESS, 1)
+
+    view.restart()
+    assert view._warmed is None
+    assert len(view._input) == 0
+    assert (view._step_accumulator, view.step_alpha, view.input_time) == (0.0, 0.0, 0.0)
@@ -0,0 +1,72 @@
+from random import Random
+
+from engine.finder import packs
+from engine.headless import HeadlessDriver
+from engine.play import PlayView
+from engine.playlist import EndlessPlaylist, GrabBagPlaylist, OrderedPlaylist
+from engine.schedule import GameScheduler
+
+GAMES = tuple(type(f"Game{idx}", (), {"WEIGHT": 1.0, "BOSS": False, "FLAGS": 0}) for idx in range(7))
+
+
+def test_ordered_plays_each_game_once():
+    playlist = OrderedPlaylist(GAMES, lookahead=3)
+    assert playlist.upcoming() == GAMES[:3]
+    assert playlist.upcoming(2) == GAMES[:2]
+    # Looking ahead never goes further than the lookahead.
+    assert playlist.upcoming(10) == GAMES[:3]
+
+    played = []
+    while not playlist.finished:
+        played.append(playlist.next())
+    assert tuple(played) == GAMES
+    assert playlist.next() is None
+    assert playlist.upcoming() == ()
+
+    playlist.reset()
+    assert playlist.next() is GAMES[0]
+
+
+def test_ordered_loop():
+    playlist = OrderedPlaylist(GAMES[:3], loop=True, lookahead=2)
+    assert [playlist.next() for _ in range(7)] == [*GAMES[:3], *GAMES[:3], GAMES[0]]
+    assert not playlist.finished
+    assert OrderedPlaylist((), loop=True).finished
+
+
+def test_grab_bag():
+    playlist = GrabBagPlaylist(GAMES, 4, Random(1), lookahead=3)
+    played = []
+    while not playlist.finished:
+        played.append(playlist.next())
+    assert len(played) == len(set(played)) == 4
+    assert set(played) <= set(GAMES)
+
+    # Starting over draws a new bag.
+    playlist.reset()
+    assert len([playlist.next() for _ in range(4)]) == 4
+    assert playlist.finished
+    assert GrabBagPlaylist(GAMES[:2], 10, Random(1)).size == 2
+
+
+def test_endless_upcoming_is_what_gets_played():
+    playlist = EndlessPlaylist(GameScheduler(GAMES, Random(2), bagged=True), lookahead=4)
+    for _ in range(20):
+        upcoming = playlist.upcoming()
+        assert len(upcoming) == 4
+        assert playlist.next() is upcoming[0]
+        assert playlist.upcoming()[:3] == upcoming[1:]
+
+    playlist.reset()
+    # The queue only gets refilled once something looks at it.
+    assert playlist.scheduler.picks == 0
+    # A fresh bag, so the first seven are every game.
+    assert {playlist.next() for _ in GAMES} == set(GAMES)
+
+
+def test_session_ends_with_the_playlist(window, games):
+    view = PlayView(games, packs.get_all_transitions(), packs.get_all_fails(), seed=3)
+    view.playlist = OrderedPlaylist(games[:3])
+    result = HeadlessDriver(view).run(sessions=1, play_time=600.0)
+    assert result.sessions == 1
+    assert result.games == 3
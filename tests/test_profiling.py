@@ -0,0 +1,117 @@
+import json
+from random import Random
+
+import pytest
+
+from engine.profiling import SUB_BUCKETS, CallCounts, FrameTimings, Histogram, RollingHistogram
+
+# Every bucket's top is within one sub bucket of anything in it.
+BUCKET_ERROR = 2.0 ** (1 / SUB_BUCKETS)
+
+
+class GameA: ...
+class GameB: ...
+
+
+def _samples(seed: int, count: int) -> list[int]:
+    rng = Random(seed)
+    return [int(rng.lognormvariate(15, 1)) for _ in range(count)]
+
+
+def test_percentiles_stay_within_a_bucket():
+    samples = _samples(1, 5000)
+    histogram = Histogram()
+    for ns in samples:
+        histogram.add(ns)
+    ordered = sorted(samples)
+
+    assert histogram.count == len(samples)
+    assert histogram.total == sum(samples)
+    assert histogram.max == ordered[-1]
+    assert histogram.mean == pytest.approx(sum(samples) / len(samples))
+    for p in (0.0, 0.1, 0.5, 0.95, 0.99, 1.0):
+        exact = ordered[max(1, int(p * len(samples) + 0.5)) - 1]
+        assert exact <= histogram.percentile(p) <= exact * BUCKET_ERROR
+    # Never past the slowest sample.
+    assert histogram.percentile(1.0) == histogram.max
+
+
+def test_tiny_and_huge_times_are_kept():
+    histogram = Histogram()
+    for ns in (0, 1, 2 ** 50):
+        histogram.add(ns)
+    assert histogram.buckets[0] == 2
+    assert histogram.buckets[-1] == 1
+    assert histogram.percentile(1.0) == 2 ** 50
+    assert Histogram().percentile(0.5) == 0.0
+
+
+def test_merge_matches_adding_everything():
+    first, second = _samples(2, 1000), _samples(3, 700)
+    a, b, both = Histogram(), Histogram(), Histogram()
+    for ns in first:
+        a.add(ns)
+        both.add(ns)
+    for ns in second:
+        b.add(ns)
+        both.add(ns)
+    a.merge(b)
+    assert (a.buckets, a.count, a.total, a.max) == (both.buckets, both.count, both.total, both.max)
+
+
+def test_rolling_histogram_forgets_old_samples():
+    rolling = RollingHistogram(window=10)
+    for _ in range(10):
+        rolling.add(1_000_000_000)
+    for _ in range(10):
+        rolling.add(1000)
+    # Still between one and two windows.
+    assert rolling.histogram().count == 20
+    assert rolling.histogram().max == 1_000_000_000
+
+    rolling.add(1000)
+    merged = rolling.histogram()
+    assert merged.count == 11
+    assert merged.max == 1000
+
+
+def test_frame_timings_by_speed_and_recent(tmp_path):
+    timings = FrameTimings(window=4)
+    for _ in range(20):
+        timings.add(GameA, "update", 0, 2_000_000)
+    for _ in range(8):
+        timings.add(GameA, "update", 1, 1_000_000)
+    timings.add(GameB, "draw", 0, 5_000_000)
+
+    assert len(timings) == 3
+    assert timings.display_types == (GameA, GameB)
+    assert timings.get(GameA, "update", 0).count == 20
+    assert timings.get(GameA, "update").count == 28
+    assert timings.get(GameA, "update", recent=True).count == 8 + 8
+    assert timings.get(GameA, "draw").count == 0
+    assert timings.get(GameA, "draw", 0, recent=True).count == 0
+
+    (slowest,) = timings.slowest("draw")
+    assert slowest["display"].endswith("GameB")
+    assert slowest["max"] == pytest.approx(5.0)
+
+    pth = tmp_path / "timings.json"
+    timings.export(pth)
+    report = json.loads(pth.read_text())
+    assert {row["phase"] for row in report["displays"]} == {"update", "draw"}
+    assert len(report["by_speed"]) == 3
+    assert "gl_calls" not in report
+
+
+def test_call_counts():
+    calls = CallCounts(2)
+    calls.add((3, 1))
+    calls.add((5, 0))
+    assert calls.summary(("draws", "programs")) == {"frames": 2, "draws": 4.0, "draws_max": 5, "programs": 0.5, "programs_max": 1}
+
+    timings = FrameTimings()
+    timings.add_calls(GameA, "draw", (10, 2))
+    timings.add_calls(GameB, "draw", (1, 1))
+    timings.add_calls(GameB, "update", (50, 0))
+    busiest = timings.busiest("draw", ("draws", "programs"))
+    assert [row["display"].rsplit(".", 1)[-1] for row in busiest] == ["GameA", "GameB"]
@@ -0,0 +1,63 @@
+import pytest
+
+from engine.finder import packs
+from engine.headless import HeadlessDriver, random_policy
+from engine.play import PlayView
+from engine.replay import InputRecording, Record, RecordKind, Replayer, start_recording
+
+
+def test_recording_save_load(tmp_path):
+    recording = InputRecording(1234, ("a.Game",), ("a.Transition",), ("a.Fail",))
+    recording.tick(1 / 60)
+    recording.add(RecordKind.KEY_PRESS, 0.5, symbol=32, modifiers=1)
+    recording.add(RecordKind.MOUSE_MOTION, 0.75, x=10.0, y=20.0, dx=-1.0, dy=2.5)
+    recording.tick(1 / 30)
+
+    pth = tmp_path / "session.awr"
+    recording.save(pth)
+    loaded = InputRecording.load(pth)
+
+    assert loaded.seed == 1234
+    assert (loaded.games, loaded.transitions, loaded.fails) == (("a.Game",), ("a.Transition",), ("a.Fail",))
+    assert list(loaded) == list(recording)
+    assert loaded[1] == Record(RecordKind.KEY_PRESS, 0.5, 32, 1, 0.0, 0.0, 0.0, 0.0)
+    assert loaded.tick_count == 2
+    assert loaded.play_time == pytest.approx(1 / 60 + 1 / 30)
+
+
+def test_load_rejects_other_files(tmp_path):
+    pth = tmp_path / "not_a_replay.awr"
+    pth.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        InputRecording.load(pth)
+
+
+def _snapshot(view: PlayView):
+    return (view.count, view.strikes, view.speed, type(view.active_display).__name__, view.play_clock.time, view.cursor_position)
+
+
+def test_replay_matches_recorded_session(window, games, tmp_path):
+    view = PlayView(games, packs.get_all_transitions(), packs.get_all_fails(), seed=123)
+    recording = start_recording(view)
+    driver = HeadlessDriver(view, 1 / 50, random_policy(5))
+    driver.start()
+
+    recorded = []
+    restarts = 0
+    for _ in range(4000):
+        driver.step()
+        recorded.append(_snapshot(view))
+        if view.play_over:
+            view.restart()
+            restarts += 1
+    # Losing a session or two means restarts get recorded and replayed too.
+    assert restarts
+
+    pth = tmp_path / "session.awr"
+    recording.save(pth)
+    replayer = Replayer(InputRecording.load(pth))
+    replayed = []
+    while replayer.step():
+        replayed.append(_snapshot(replayer.view))
+
+    assert replayed == recorded
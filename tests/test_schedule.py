@@ -0,0 +1,114 @@
+from collections import Counter
+from random import Random
+
+import pytest
+
+from engine.play import ContentFlag
+from engine.schedule import FenwickTree, GameScheduler
+
+
+def _game(name: str, weight: float = 1.0, boss: bool = False, flags: ContentFlag = ContentFlag.NONE) -> type:
+    # The scheduler only reads these, so there's no need for a real Game.
+    return type(name, (), {"WEIGHT": weight, "BOSS": boss, "FLAGS": flags})
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 8, 33])
+def test_fenwick_matches_brute_force(size):
+    rng = Random(size)
+    values = [rng.randrange(0, 10) for _ in range(size)]
+    tree = FenwickTree(values)
+    for _ in range(50):
+        values[idx := rng.randrange(size)] = rng.randrange(0, 10)
+        tree.set(idx, values[idx])
+
+        assert len(tree) == size
+        assert [tree[i] for i in range(size)] == values
+        assert [tree.prefix(end) for end in range(size + 1)] == [sum(values[:end]) for end in range(size + 1)]
+        assert tree.total == sum(values)
+        # Every target lands on the value whose span holds it, skipping zeros.
+        expected = [idx for idx, value in enumerate(values) for _ in range(value)]
+        assert [tree.find(target) for target in range(tree.total)] == expected
+
+
+def test_empty_fenwick():
+    tree = FenwickTree([])
+    assert tree.total == 0
+    assert len(tree) == 0
+
+
+def test_picks_follow_weights():
+    common, rare, never = _game("Common", 3.0), _game("Rare", 1.0), _game("Never", 0.0)
+    scheduler = GameScheduler((common, rare, never), Random(1))
+    assert scheduler.chance(common) == pytest.approx(0.75)
+    assert scheduler.chance(never) == 0.0
+
+    picks = Counter(scheduler.pick() for _ in range(8000))
+    assert never not in picks
+    assert picks[common] / picks[rare] == pytest.approx(3.0, rel=0.1)
+
+    scheduler.set_weight(never, 1.0)
+    scheduler.set_weight(common, 0.0)
+    picks = Counter(scheduler.pick() for _ in range(2000))
+    assert common not in picks
+    assert picks[never] and picks[rare]
+
+
+def test_min_gap():
+    games = tuple(_game(f"Game{idx}") for idx in range(5))
+    scheduler = GameScheduler(games, Random(2), min_gap=3)
+    picks = [scheduler.pick() for _ in range(500)]
+    for idx, game in enumerate(picks):
+        assert game not in picks[idx + 1:idx + 4]
+
+
+def test_min_gap_longer_than_the_games():
+    # Rather than running dry the longest waiting game gets let out early.
+    games = (_game("A"), _game("B"))
+    scheduler = GameScheduler(games, Random(3), min_gap=5)
+    picks = [scheduler.pick() for _ in range(10)]
+    assert picks[::2] == [picks[0]] * 5 and picks[1::2] == [picks[1]] * 5
+
+
+def test_bagged():
+    games = tuple(_game(f"Game{idx}", weight=idx + 1) for idx in range(6))
+    scheduler = GameScheduler(games, Random(4), bagged=True)
+    for _ in range(10):
+        assert set(scheduler.pick() for _ in games) == set(games)
+
+
+def test_exclude():
+    calm, flashing = _game("Calm"), _game("Flashing", flags=ContentFlag.PHOTOSENSITIVE)
+    scheduler = GameScheduler((calm, flashing), Random(5), exclude=ContentFlag.PHOTOSENSITIVE)
+    assert {scheduler.pick() for _ in range(100)} == {calm}
+
+    scheduler.exclude = None
+    assert {scheduler.pick() for _ in range(100)} == {calm, flashing}
+
+    scheduler.exclude = ContentFlag.PHOTOSENSITIVE
+    scheduler.set_weight(calm, 0.0)
+    with pytest.raises(ValueError):
+        scheduler.pick()
+
+
+def test_boss_every():
+    games = tuple(_game(f"Game{idx}") for idx in range(3))
+    boss = _game("Boss", boss=True)
+    scheduler = GameScheduler(games + (boss,), Random(6), boss_every=4)
+    picks = [scheduler.pick() for _ in range(40)]
+    assert [idx for idx, game in enumerate(picks) if game is boss] == list(range(3, 40, 4))
+
+    # Without boss_every it's just another game.
+    scheduler = GameScheduler(games + (boss,), Random(6))
+    assert scheduler.chance(boss) == pytest.approx(0.25)
+
+
+def test_reset_and_seed():
+    games = tuple(_game(f"Game{idx}") for idx in range(4))
+    first = GameScheduler(games, Random(7), min_gap=1, bagged=True)
+    picks = [first.pick() for _ in range(20)]
+
+    second = GameScheduler(games, Random(7), min_gap=1, bagged=True)
+    assert [second.pick() for _ in range(20)] == picks
+    second.reset()
+    assert second.picks == 0
+    assert all(second.chance(game) == pytest.approx(0.25) for game in games)
@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+from engine.finder import packs
+from engine.headless import HeadlessDriver, random_policy
+from engine.play import PlayEvent, PlayView
+from engine.stats import SessionStats, StatsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StatsStore(tmp_path / "stats.db", flush_interval=0.05)
+    yield store
+    store.close()
+
+
+def test_win_rates_and_best_runs(store):
+    first = store.start_run(1)
+    store.record_game(first, "a.Game", True, 0, 2.0)
+    store.record_game(first, "a.Game", False, 0, 4.0)
+    store.record_game(first, "b.Game", True, 1, 1.0)
+    store.end_run(first, 30.0, True)
+
+    second = store.start_run(2)
+    store.record_game(second, "a.Game", True, 1, 3.0)
+    store.end_run(second, 10.0, False)
+    # Ending twice does nothing.
+    store.end_run(second, 99.0, True)
+    assert store.flush(5.0)
+
+    assert (first.games, first.strikes, first.speed) == (3, 1, 1)
+    assert [(rate.game, rate.speed, rate.plays, rate.wins, rate.mean_time) for rate in store.win_rates()] == [
+        ("a.Game", 0, 2, 1, 3.0),
+        ("a.Game", 1, 1, 1, 3.0),
+        ("b.Game", 1, 1, 1, 1.0),
+    ]
+    assert [rate.game for rate in store.win_rates(speed=1)] == ["a.Game", "b.Game"]
+
+    total = store.win_rate("a.Game")
+    assert (total.plays, total.wins, total.rate) == (3, 2, pytest.approx(2 / 3))
+    assert store.win_rate("a.Game", 0).rate == 0.5
+    assert store.win_rate("missing.Game").plays == 0
+
+    best, runner_up = store.best_runs(2)
+    assert (best["id"], best["games"], best["strikes"], best["finished"]) == (first.id, 3, 1, 1)
+    assert (runner_up["id"], runner_up["play_time"], runner_up["finished"]) == (second.id, 10.0, 0)
+    assert store.best_run() == best
+    assert [(game["position"], game["game"], game["won"]) for game in store.run_games(first.id)] == [
+        (1, "a.Game", 1), (2, "a.Game", 0), (3, "b.Game", 1)
+    ]
+
+
+def test_other_schema_versions_are_refused(tmp_path):
+    pth = tmp_path / "stats.db"
+    with sqlite3.connect(pth) as connection:
+        connection.execute("PRAGMA user_version = 99")
+    connection.close()
+    with pytest.raises(ValueError):
+        StatsStore(pth)
+
+
+def test_session_stats_match_the_session(window, games, store):
+    view = PlayView(games, packs.get_all_transitions(), packs.get_all_fails(), seed=21)
+    stats = SessionStats(view, store)
+    results = []
+
+    def on_result(event, source, display):
+        results.append((event == PlayEvent.GAME_SUCCEEDED, source.frame.display_time))
+
+    view.events.subscribe(PlayEvent.GAME_SUCCEEDED, on_result)
+    view.events.subscribe(PlayEvent.GAME_FAILED, on_result)
+
+    result = HeadlessDriver(view, 1 / 30, random_policy(4)).run(sessions=2, play_time=900.0)
+    stats.close()
+
+    runs = sorted(store.best_runs(10), key=lambda run: run["id"])
+    assert len(runs) == result.sessions == 2
+    assert all(run["finished"] for run in runs)
+    assert sum(run["games"] for run in runs) == result.games
+    assert sum(run["strikes"] for run in runs) == result.strikes
+
+    # Each game's duration is when it was won or lost, not when the display after it started.
+    recorded = [(bool(game["won"]), game["duration"]) for run in runs for game in store.run_games(run["id"])]
+    assert recorded == results
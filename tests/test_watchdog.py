@@ -0,0 +1,44 @@
+from time import sleep
+
+from engine.watchdog import Watchdog
+
+
+class Slow:
+    pass
+
+
+class Upcoming:
+    pass
+
+
+def _stall(watchdog: Watchdog, phase: str, display: type | None):
+    watchdog.beat(phase, display)
+    sleep(0.08)
+    watchdog.beat()
+    # Give the watchdog time to see the main thread moving again.
+    sleep(0.01)
+
+
+def test_stalls_are_blamed_on_the_phase_they_happen_in():
+    # It only needs the view for take_skip and the report.
+    watchdog = Watchdog(None, budget=0.04, flag_stalls=2, auto_skip=True)  # type: ignore -- see above
+    watchdog.start()
+    try:
+        # Warming up or creating the next game isn't the display being updated's fault.
+        _stall(watchdog, "warmup", Upcoming)
+        _stall(watchdog, "switch", None)
+        _stall(watchdog, "draw", Slow)
+        assert not watchdog.offences and watchdog._skip is None
+
+        _stall(watchdog, "update", Slow)
+        _stall(watchdog, "update", Slow)
+    finally:
+        watchdog.stop()
+
+    # Waiting between stalls can count as an other stall if the machine is slow, those don't matter here.
+    stalls = [stall for stall in watchdog.stalls if stall.phase != "other"]
+    assert [(stall.phase, stall.display) for stall in stalls] == [
+        ("warmup", Upcoming), ("switch", None), ("draw", Slow), ("update", Slow), ("update", Slow)
+    ]
+    assert all(stall.duration >= 0.08 and stall.stacks for stall in stalls)
+    assert watchdog.flagged == {Slow} and watchdog._skip is Slow
@@ -0,0 +1,87 @@
+from array import array
+
+from arcade import LRBT
+
+from aware.graphics.wave import WAVE_FLOATS, Wave, WaveBatch
+
+
+def _specs():
+    return [
+        (LRBT(0, 1280, 0, 215), 110, 1300, 0.5, 0.0, (255, 200, 0), Wave.TOP_FACE, 3),
+        (LRBT(0, 1280, 0, 290), 135, 2000, 0.25, 1.0, (255, 200, 0, 128), Wave.TOP_FACE, 3),
+        (LRBT(900, 1280, 0, 720), 40, 300, 1.0, 0.5, (0, 100, 255), Wave.LEFT_FACE, 0),
+    ]
+
+
+def _values(wave: Wave) -> tuple[float, ...]:
+    # What a single wave draws with, in the batch's layout.
+    left, right, bottom, top = wave.rect.lrbt
+    r, g, b, *a = wave.color
+    a = a[0] if a else 255
+    return (left, bottom, right, top, wave.depth, wave.width, wave.speed, wave.phase, r / 255, g / 255, b / 255, a / 255, wave.face, wave.blend)
+
+
+def _batch_values(batch: WaveBatch) -> list[tuple[float, ...]]:
+    batch.update_buffer()
+    data = array('f', batch.instance_buffer.read(size=4 * WAVE_FLOATS * len(batch)))
+    # Written to the GPU exactly as it is kept.
+    assert data == batch._data[:WAVE_FLOATS * len(batch)]
+    return [tuple(data[idx * WAVE_FLOATS:(idx + 1) * WAVE_FLOATS]) for idx in range(len(batch))]
+
+
+def _expected(specs) -> list[tuple[float, ...]]:
+    return [tuple(array('f', _values(Wave(*spec)))) for spec in specs]
+
+
+def _draw(window, draw) -> bytes:
+    window.ctx.screen.use()
+    window.clear()
+    draw()
+    return bytes(window.ctx.screen.read(components=3))
+
+
+def test_batch_matches_single_waves(window):
+    specs = _specs()
+    batch = WaveBatch(capacity=1)
+    handles = [batch.add(*spec) for spec in specs]
+    assert len(batch) == 3
+    assert _batch_values(batch) == _expected(specs)
+
+    handles[1].color = (10, 20, 30)
+    handles[2].rect = LRBT(0, 100, 0, 100)
+    handles[0].phase = 2.0
+    specs[1] = specs[1][:5] + ((10, 20, 30),) + specs[1][6:]
+    specs[2] = (LRBT(0, 100, 0, 100),) + specs[2][1:]
+    specs[0] = specs[0][:4] + (2.0,) + specs[0][5:]
+    assert _batch_values(batch) == _expected(specs)
+
+
+def test_removal_keeps_order_and_detaches(window):
+    specs = _specs()
+    batch = WaveBatch()
+    handles = [batch.add(*spec) for spec in specs]
+    batch.time = 1.5
+    batch.draw()
+
+    gone = handles.pop(1)
+    batch.remove(gone)
+    specs.pop(1)
+    assert gone.batch is None
+    assert batch.waves == handles
+    assert _batch_values(batch) == _expected(specs)
+
+    # Changing a removed wave only changes the wave.
+    before = bytes(batch._data)
+    gone.color = (255, 255, 255)
+    gone.rect = LRBT(0, 1280, 0, 720)
+    gone.depth = 999
+    assert gone.depth == 999
+    assert bytes(batch._data) == before
+    assert _batch_values(batch) == _expected(specs)
+
+    # And draws the same as a batch which never had it.
+    fresh = WaveBatch()
+    for spec in specs:
+        fresh.add(*spec)
+    fresh.time = batch.time
+    assert _draw(window, batch.draw) == _draw(window, fresh.draw)
@@ -0,0 +1,134 @@
+"""Measure how the pack loading, resource indexing, and play view scale with the size of the game catalog.
+
+python -m tools.bench_catalog --sizes 10 100 1000 --output bench_catalog.json
+
+Run it from the repository root, like the game, so the built in resources are found.
+Set ARCADE_HEADLESS=1 to run on a machine without a display.
+"""
+from __future__ import annotations
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from pathlib import Path
+from datetime import datetime
+import tracemalloc
+import platform
+import argparse
+import json
+import sys
+import gc
+
+import pyglet
+pyglet.options.audio = ("silent",)
+
+import arcade
+
+from engine.finder import PackManager
+from engine.resources import load_resources
+from engine.play import PlayView
+from tools.synthetic import generate_tree
+
+PICK_COUNT = 10_000
+
+
+def _unload_modules(prefix: str):
+    # The pack loader refuses to load a module twice, so tidy up between runs.
+    for name in tuple(sys.modules):
+        if name.startswith(f"packs.{prefix}"):
+            del sys.modules[name]
+
+
+def bench_size(size: int, root: Path, transitions: int, fails: int, packs: int | None, construct_view: bool) -> dict:
+    prefix = f"s{size}"
+    result: dict = {"games": size}
+
+    start = perf_counter()
+    tree = generate_tree(root, size, transitions, fails, packs=packs, prefix=prefix)
+    result["generate_time"] = perf_counter() - start
+    result["packs"] = len(tree.pack_names)
+    result["resources"] = tree.resource_count
+    result["external_references"] = tree.external_count
+
+    start = perf_counter()
+    load_resources(tree.resources_path)
+    result["resource_index_time"] = perf_counter() - start
+
+    empty = root / "empty"
+    empty.mkdir(exist_ok=True)
+    manager = PackManager(tree.packs_path, empty)
+
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    manager.load_packs()
+    result["pack_load_time"] = perf_counter() - start
+    result["pack_load_memory"] = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = perf_counter()
+    playable = [name for name in tree.pack_names if manager.can_play_pack(name)]
+    result["can_play_time"] = perf_counter() - start
+    result["playable_packs"] = len(playable)
+
+    start = perf_counter()
+    manager.query(controls=f"{tree.pack_names[0]}.texture_0")
+    result["query_time"] = perf_counter() - start
+
+    games = manager.get_all_games()
+    if construct_view:
+        gc.collect()
+        tracemalloc.start()
+        start = perf_counter()
+        view = PlayView(games, manager.get_all_transitions(), manager.get_all_fails())
+        result["view_construct_time"] = perf_counter() - start
+        result["view_construct_memory"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = perf_counter()
+        for _ in range(PICK_COUNT):
+            view.pick_game()
+        result["pick_time"] = (perf_counter() - start) / PICK_COUNT
+        del view
+
+    _unload_modules(prefix)
+    gc.collect()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark how the engine scales with the number of games.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--transitions", type=int, default=10)
+    parser.add_argument("--fails", type=int, default=5)
+    parser.add_argument("--packs", type=int, default=None, help="Number of packs per size, defaults to one per 50 games.")
+    parser.add_argument("--no-view", action="store_true", help="Skip constructing a PlayView.")
+    parser.add_argument("--output", type=Path, default=Path("bench_catalog.json"))
+    args = parser.parse_args()
+
+    # Games grab the window when they are created, even if nothing gets drawn.
+    window = arcade.Window(1280, 720, "Catalog Benchmark", visible=False)
+    # The play view itself needs the default resources.
+    load_resources()
+
+    results = []
+    for size in args.sizes:
+        with TemporaryDirectory(prefix="aware_bench_") as tmp:
+            result = bench_size(size, Path(tmp), args.transitions, args.fails, args.packs, not args.no_view)
+        results.append(result)
+        print(", ".join(f"{key}: {value:.6g}" if isinstance(value, float) else f"{key}: {value}" for key, value in result.items()))
+
+    window.close()
+
+    report = {
+        "benchmark": "catalog",
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "arcade": arcade.version.VERSION,
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
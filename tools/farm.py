@@ -0,0 +1,358 @@
+"""Play thousands of headless sessions over every core to see how the balance plays out.
+
+python -m tools.farm --sessions 2000 --output farm.json
+python -m tools.farm --sessions 500 --set MAX_STRIKE_COUNT=3 --duration digi.ChopGame=4.0
+
+Each worker process gets its own GL context and packs, then plays chunks of sessions with their own seeds,
+which are drawn from the farm's seed so runs with nearby seeds don't share any chunks.
+Results stream back as each chunk finishes and get added up into the success rate of every game at
+every speed level, and how long sessions last. Games can be given a script rather than random input
+with --script GAME=module:function, where the function takes a seed and returns an InputPolicy.
+
+Run it from the repository root, like the game, so the built in resources are found.
+Set ARCADE_HEADLESS=1 to run on a machine without a display.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from dataclasses import dataclass, field
+from importlib import import_module
+from random import Random
+from time import perf_counter
+from datetime import datetime
+from pathlib import Path
+import argparse
+import platform
+import json
+import os
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from engine.play import PlayView, PlayEvent, Display
+    from engine.headless import InputPolicy
+
+__all__ = (
+    "FarmConfig",
+    "ChunkResult",
+    "FarmReport",
+    "run_farm",
+    "chunk_seeds",
+    "check_constants",
+    "set_constants",
+    "check_chunk",
+)
+
+DEFAULT_CHUNK = 10
+# engine.play constants which are worked out from another when it is imported: name -> (source, how).
+# They get worked out again after the overrides, and can't be set themselves.
+DERIVED_CONSTANTS = {
+    "FIXED_STEP_TIME": ("FIXED_STEP_RATE", lambda rate: 1.0 / rate),
+}
+
+
+@dataclass
+class FarmConfig:
+    # Everything a worker needs to set itself up, it gets pickled over to each process.
+    step: float = 1.0 / 60.0
+    draw_every: int = 0
+    games: tuple[str, ...] = ()
+    # Namespaced game to "module:function" which makes its input policy from a seed.
+    scripts: dict[str, str] = field(default_factory=dict)
+    # engine.play constants to change, i.e. MAX_STRIKE_COUNT. See set_constants.
+    constants: dict[str, float] = field(default_factory=dict)
+    # Namespaced game to the duration it should have.
+    durations: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class ChunkResult:
+    seed: int
+    # (game, speed, won, seconds taken) for every game finished.
+    games: list[tuple[str, int, bool, float]] = field(default_factory=list)
+    # (games, strikes, speed, play time) for every session lost.
+    sessions: list[tuple[int, int, int, float]] = field(default_factory=list)
+    steps: int = 0
+    real_time: float = 0.0
+
+
+# -- The worker processes --
+
+_config: FarmConfig | None = None
+_games: tuple = ()
+_transitions: tuple = ()
+_fails: tuple = ()
+
+
+def check_constants(names: Iterable[str]):
+    """Raise a ValueError if any of the names can't be overridden with set_constants."""
+    import engine.play
+    for name in names:
+        if name in DERIVED_CONSTANTS:
+            raise ValueError(f"{name} is worked out from {DERIVED_CONSTANTS[name][0]}, set that instead")
+        if not name.isupper() or not isinstance(getattr(engine.play, name, None), (int, float)):
+            raise ValueError(f"engine.play has no constant called {name}")
+
+
+def set_constants(constants: dict[str, float]):
+    """Override engine.play constants, keeping their types, and work the derived ones out again."""
+    import engine.play
+    check_constants(constants)
+    for name, value in constants.items():
+        setattr(engine.play, name, type(getattr(engine.play, name))(value))
+    for name, (source, derive) in DERIVED_CONSTANTS.items():
+        setattr(engine.play, name, derive(getattr(engine.play, source)))
+
+
+def _setup_worker(config: FarmConfig):
+    global _config, _games, _transitions, _fails
+    import pyglet
+    pyglet.options.audio = ("silent",)
+
+    from aware.launch import load_fonts
+    from engine.finder import packs
+    from engine.resources import load_resources
+    from engine.headless import create_headless_window
+
+    set_constants(config.constants)
+
+    load_fonts()
+    load_resources()
+    packs.load_packs()
+    create_headless_window()
+
+    for name, duration in config.durations.items():
+        packs.get_game(name).DURATION = duration
+
+    _config = config
+    _games = tuple(packs.get_game(name) for name in config.games) if config.games else packs.get_all_games()
+    _transitions = packs.get_all_transitions()
+    _fails = packs.get_all_fails()
+
+
+def _load_script(path: str):
+    module, _, function = path.partition(":")
+    return getattr(import_module(module), function)
+
+
+def per_game_policy(default: InputPolicy, policies: dict[type, InputPolicy]) -> InputPolicy:
+    """Use the active game's own policy when it has one, otherwise the default."""
+    def policy(view: PlayView, delta_time: float):
+        game = view.active_game
+        chosen = policies.get(type(game), default) if game is not None else default
+        chosen(view, delta_time)
+    return policy
+
+
+class _Collector:
+    # Notes the result of every game and session through the view's events.
+
+    def __init__(self, view: PlayView, result: ChunkResult) -> None:
+        from engine.play import PlayEvent
+        from engine.finder import packs
+        self.result: ChunkResult = result
+        self._names = packs.get_display_name
+        # When the current game was won or lost, DISPLAY_FINISHED is a frame later.
+        self._result_time: float | None = None
+        view.events.subscribe(PlayEvent.DISPLAY_STARTED, self._on_started)
+        view.events.subscribe(PlayEvent.GAME_SUCCEEDED, self._on_result)
+        view.events.subscribe(PlayEvent.GAME_FAILED, self._on_result)
+        view.events.subscribe(PlayEvent.DISPLAY_FINISHED, self._on_finished)
+        view.events.subscribe(PlayEvent.PLAY_OVER, self._on_play_over)
+
+    def _on_started(self, event: PlayEvent, view: PlayView, display: Display | None):
+        self._result_time = None
+
+    def _on_result(self, event: PlayEvent, view: PlayView, display: Display | None):
+        self._result_time = view.frame.display_time
+
+    def _on_finished(self, event: PlayEvent, view: PlayView, display: Display | None):
+        from engine.play import Game
+        if not isinstance(display, Game) or view.active_game_succeeded is None:
+            return
+        frame = view.frame
+        name = self._names(type(display)) or type(display).__qualname__
+        duration = self._result_time if self._result_time is not None else frame.display_time
+        self.result.games.append((name, frame.speed, view.active_game_succeeded, duration))
+
+    def _on_play_over(self, event: PlayEvent, view: PlayView, display: Display | None):
+        self.result.sessions.append((view.count, view.strikes, view.speed, view.frame.total_time))
+
+
+def _run_chunk(seed: int, sessions: int) -> ChunkResult:
+    from engine.play import PlayView
+    from engine.finder import packs
+    from engine.headless import HeadlessDriver, random_policy, derive_seed
+
+    config = _config
+    assert config is not None, "The worker wasn't set up"
+    result = ChunkResult(seed)
+    view = PlayView(_games, _transitions, _fails, seed)
+    collector = _Collector(view, result)
+
+    # The input gets seeds of its own, so it doesn't follow the same random numbers that picked the games.
+    policy = random_policy(derive_seed(seed, "policy"))
+    if config.scripts:
+        policy = per_game_policy(policy, {packs.get_game(name): _load_script(script)(derive_seed(seed, name)) for name, script in config.scripts.items()})
+
+    start = perf_counter()
+    driver = HeadlessDriver(view, config.step, policy, config.draw_every)
+    driver.run(sessions=sessions)
+    result.real_time = perf_counter() - start
+    result.steps = driver.result.steps
+
+    view.displays.clear()
+    del collector
+    check_chunk(result)
+    return result
+
+
+def check_chunk(result: ChunkResult):
+    """Every game played belongs to a session, so their counts have to add up."""
+    played = sum(games for games, *_ in result.sessions)
+    if played != len(result.games):
+        raise RuntimeError(f"Chunk {result.seed} recorded {len(result.games)} games but its sessions add up to {played}")
+
+
+# -- Adding it all up --
+
+class FarmReport:
+
+    def __init__(self) -> None:
+        # (game, speed) to [plays, wins, seconds taken]
+        self.games: dict[tuple[str, int], list[float]] = {}
+        self.session_games: Counter[int] = Counter()
+        self.session_speeds: Counter[int] = Counter()
+        self.session_times: list[float] = []
+        self.chunks: int = 0
+        self.steps: int = 0
+        self.worker_time: float = 0.0
+
+    @property
+    def sessions(self) -> int:
+        return len(self.session_times)
+
+    def add(self, chunk: ChunkResult):
+        self.chunks += 1
+        self.steps += chunk.steps
+        self.worker_time += chunk.real_time
+        for name, speed, won, duration in chunk.games:
+            totals = self.games.get((name, speed))
+            if totals is None:
+                totals = self.games[(name, speed)] = [0, 0, 0.0]
+            totals[0] += 1
+            totals[1] += won
+            totals[2] += duration
+        for games, _, speed, play_time in chunk.sessions:
+            self.session_games[games] += 1
+            self.session_speeds[speed] += 1
+            self.session_times.append(play_time)
+
+    def success_rates(self) -> list[dict]:
+        rows = []
+        for (name, speed), (plays, wins, duration) in sorted(self.games.items()):
+            rows.append({"game": name, "speed": speed, "plays": plays, "wins": wins, "rate": wins / plays, "mean_time": duration / plays})
+        return rows
+
+    def session_lengths(self) -> dict:
+        times = sorted(self.session_times)
+        def percentile(p: float) -> float:
+            return times[min(len(times) - 1, int(p * len(times)))] if times else 0.0
+        games = sum(count * length for length, count in self.session_games.items())
+        return {
+            "sessions": self.sessions,
+            "mean_games": games / self.sessions if self.sessions else 0.0,
+            "games": {str(length): count for length, count in sorted(self.session_games.items())},
+            "speed": {str(speed): count for speed, count in sorted(self.session_speeds.items())},
+            "play_time": {"p10": percentile(0.1), "p50": percentile(0.5), "p90": percentile(0.9), "max": times[-1] if times else 0.0},
+        }
+
+    def report(self) -> dict:
+        return {"sessions": self.session_lengths(), "success": self.success_rates()}
+
+
+def chunk_seeds(seed: int, count: int) -> list[int]:
+    # Drawn from the farm's seed rather than counted up from it, so runs with nearby seeds don't overlap.
+    from engine.headless import SEED_BITS
+    rng = Random(seed)
+    return [rng.getrandbits(SEED_BITS) for _ in range(count)]
+
+
+def run_farm(sessions: int, config: FarmConfig, workers: int | None = None, chunk: int = DEFAULT_CHUNK, seed: int = 0, progress: bool = True) -> FarmReport:
+    check_constants(config.constants)
+    workers = workers or os.cpu_count() or 1
+    count = (sessions + chunk - 1) // chunk
+    chunks = [(chunk_seed, min(chunk, sessions - idx * chunk)) for idx, chunk_seed in enumerate(chunk_seeds(seed, count))]
+    report = FarmReport()
+    start = perf_counter()
+    # Spawned rather than forked so no process shares a GL context or the window.
+    with ProcessPoolExecutor(workers, get_context("spawn"), _setup_worker, (config,)) as pool:
+        futures = [pool.submit(_run_chunk, chunk_seed, count) for chunk_seed, count in chunks]
+        for future in as_completed(futures):
+            report.add(future.result())
+            if progress:
+                elapsed = perf_counter() - start
+                print(f"\r{report.sessions}/{sessions} sessions, {report.sessions / elapsed:.1f} sessions/s", end="", flush=True)
+    if progress:
+        print()
+    return report
+
+
+def _pairs(values: list[str]) -> dict[str, str]:
+    pairs = {}
+    for value in values:
+        key, sep, item = value.partition("=")
+        if not sep:
+            raise ValueError(f"Expected NAME=VALUE, got {value}")
+        pairs[key] = item
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play headless sessions over every core and add up how they went.")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to one per core.")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="Sessions a worker plays before sending the results back.")
+    parser.add_argument("--seed", type=int, default=0, help="The chunks' seeds are drawn from this.")
+    parser.add_argument("--step", type=float, default=1.0 / 60.0)
+    parser.add_argument("--draw-every", type=int, default=0)
+    parser.add_argument("--filter", nargs="*", default=(), help="Namespaced games to play, i.e. digi.ChopGame.")
+    parser.add_argument("--script", nargs="*", default=[], help="GAME=module:function input policies.")
+    parser.add_argument("--set", nargs="*", default=[], help="NAME=VALUE engine.play constants, i.e. MAX_STRIKE_COUNT=3.")
+    parser.add_argument("--duration", nargs="*", default=[], help="GAME=SECONDS durations.")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    config = FarmConfig(
+        args.step,
+        args.draw_every,
+        tuple(args.filter),
+        _pairs(args.script),
+        {name: float(value) for name, value in _pairs(args.set).items()},
+        {name: float(value) for name, value in _pairs(args.duration).items()},
+    )
+    start = perf_counter()
+    report = run_farm(args.sessions, config, args.workers, args.chunk, args.seed)
+    real_time = perf_counter() - start
+
+    lengths = report.session_lengths()
+    print(f"{report.sessions} sessions in {real_time:.1f}s ({report.worker_time / real_time:.1f}x a single worker)")
+    print(f"{lengths['mean_games']:.1f} games a session, play time p50 {lengths['play_time']['p50']:.0f}s p90 {lengths['play_time']['p90']:.0f}s")
+    for row in sorted(report.success_rates(), key=lambda row: row["rate"])[:5]:
+        print(f"Hardest: {row['game']} at speed {row['speed']} won {row['rate']:.0%} of {row['plays']}")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({
+            "farm": vars(args) | {"output": str(args.output)},
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "real_time": real_time,
+            **report.report(),
+        }, indent=2))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
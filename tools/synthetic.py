@@ -0,0 +1,259 @@
+"""Generate a synthetic pack tree for stress testing the pack, resource, and play code.
+
+python -m tools.synthetic OUTPUT --games 1000 --packs 20
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from random import Random
+from io import BytesIO
+import argparse
+
+from PIL import Image
+
+__all__ = (
+    "SyntheticTree",
+    "generate_tree",
+)
+
+# Every flag name in engine.play.ContentFlag other than NONE.
+FLAG_NAMES = ("PHOTOSENSITIVE", "EXTREME_MOTION", "COLORBLIND", "REQUIRES_AUDIO", "REQUIRES_TYPING", "JUMPSCARE")
+
+PACK_SOURCE = '''\
+# Generated by tools.synthetic, do not edit.
+import arcade
+
+from engine.pack import Pack
+from engine.play import ContentFlag, PlayState, Game, Transition, Fail
+from engine.resources import get_texture
+
+{classes}
+
+def setup():
+    return Pack(
+        games = ({games}),
+        transitions = ({transitions}),
+        fails = ({fails}),
+        external_games = ({external_games}),
+        external_transitions = ({external_transitions}),
+        external_fails = ({external_fails}),
+        requires_external = {requires_external},
+    )
+'''
+
+GAME_SOURCE = '''\
+class {name}(Game):
+    PROMPT = "{prompt}"
+    CONTROLS = "{controls}"
+    DURATION = {duration}
+    FLAGS = {flags}
+    BOSS = {boss}
+
+    def __init__(self, state: PlayState) -> None:
+        super().__init__(state)
+        self.sprite = arcade.Sprite(get_texture("{texture}"), center_x = self.window.center_x, center_y = self.window.center_y)
+        self.text = arcade.Text("{prompt}", self.window.center_x, 100, anchor_x = "center")
+
+    def draw(self):
+        arcade.draw_sprite(self.sprite)
+        self.text.draw()
+
+    def on_input(self, symbol: int, modifier: int, pressed: bool):
+        if pressed:
+            self.succeed()
+
+'''
+
+TRANSITION_SOURCE = '''\
+class {name}(Transition):
+    def __init__(self, state: PlayState) -> None:
+        super().__init__(state, {duration})
+        self.text = arcade.Text("", self.window.center_x, self.window.center_y, anchor_x = "center")
+
+    def update(self, delta_time: float):
+        self.text.text = str(self.state.count)
+
+    def draw(self):
+        self.text.draw()
+
+'''
+
+FAIL_SOURCE = '''\
+class {name}(Fail):
+    def __init__(self, state: PlayState) -> None:
+        super().__init__(state)
+        self.text = arcade.Text("FAILED", self.window.center_x, self.window.center_y, anchor_x = "center")
+
+    def draw(self):
+        self.text.draw()
+
+    def on_input(self, symbol: int, modifier: int, pressed: bool):
+        if pressed:
+            self.restart()
+
+'''
+
+
+@dataclass
+class SyntheticTree:
+    root: Path
+    prefix: str
+    pack_names: list[str] = field(default_factory=list)
+    game_names: list[str] = field(default_factory=list)
+    transition_names: list[str] = field(default_factory=list)
+    fail_names: list[str] = field(default_factory=list)
+    resource_count: int = 0
+    external_count: int = 0
+
+    @property
+    def packs_path(self) -> Path:
+        return self.root / "packs"
+
+    @property
+    def resources_path(self) -> Path:
+        return self.root / "resources"
+
+
+def _spread(total: int, buckets: int) -> list[int]:
+    # Split total into buckets as evenly as possible.
+    base, extra = divmod(total, buckets)
+    return [base + (idx < extra) for idx in range(buckets)]
+
+
+def _tuple_source(items: list[str], quote: bool = False) -> str:
+    if not items:
+        return ""
+    if quote:
+        items = [f'"{item}"' for item in items]
+    return ", ".join(items) + ","
+
+
+def generate_tree(
+        root: Path,
+        games: int,
+        transitions: int = 1,
+        fails: int = 1,
+        resources: int | None = None,
+        packs: int | None = None,
+        externals: int = 2,
+        prefix: str = "stress",
+        seed: int = 0
+    ) -> SyntheticTree:
+    """Write a synthetic tree of packs and resources to root.
+
+    * `games`, `transitions`, `fails`: the totals spread across every pack.
+    * `resources`: the number of textures to generate, defaults to one per game.
+    * `packs`: the number of packs, defaults to one per 50 games.
+    * `externals`: how many games each pack pulls from other packs through `external_games`.
+    * `prefix`: the start of every pack name, so multiple trees can be loaded by one process.
+    """
+    rng = Random(seed)
+    packs = packs or max(1, games // 50)
+    resources = max(1, games if resources is None else resources)
+    tree = SyntheticTree(root, prefix)
+
+    # One tiny texture, written many times over, is plenty to exercise the resource indexing.
+    image = BytesIO()
+    Image.new("RGBA", (8, 8), (255, 255, 255, 255)).save(image, "png")
+    image_data = image.getvalue()
+
+    pack_names = [f"{prefix}_{idx:04}" for idx in range(packs)]
+    tree.pack_names = pack_names
+
+    resource_names: list[list[str]] = []
+    for pack_name, count in zip(pack_names, _spread(resources, packs)):
+        folder = tree.resources_path / pack_name
+        folder.mkdir(parents=True, exist_ok=True)
+        names = []
+        for idx in range(max(1, count)):
+            (folder / f"texture_{idx}.png").write_bytes(image_data)
+            names.append(f"{pack_name}.texture_{idx}")
+        tree.resource_count += len(names)
+        resource_names.append(names)
+
+    game_counts = _spread(games, packs)
+    transition_counts = _spread(transitions, packs)
+    fail_counts = _spread(fails, packs)
+
+    pack_games: list[list[str]] = []
+    for pack_name, count in zip(pack_names, game_counts):
+        pack_games.append([f"{pack_name.title().replace('_', '')}Game{idx}" for idx in range(count)])
+
+    for pack_idx, pack_name in enumerate(pack_names):
+        classes = []
+        games_src = []
+        for idx, name in enumerate(pack_games[pack_idx]):
+            flags = [f"ContentFlag.{flag}" for flag in FLAG_NAMES if rng.random() < 0.1] or ["ContentFlag.NONE"]
+            classes.append(GAME_SOURCE.format(
+                name = name,
+                prompt = f"GAME {pack_idx}-{idx}!",
+                controls = rng.choice(resource_names[pack_idx]),
+                duration = round(rng.uniform(2.0, 8.0), 2),
+                flags = " | ".join(flags),
+                boss = rng.random() < 0.02,
+                texture = rng.choice(resource_names[pack_idx])
+            ))
+            games_src.append(name)
+            tree.game_names.append(f"{pack_name}.{name}")
+
+        transitions_src = []
+        for idx in range(transition_counts[pack_idx]):
+            name = f"Transition{idx}"
+            classes.append(TRANSITION_SOURCE.format(name = name, duration = round(rng.uniform(1.0, 3.0), 2)))
+            transitions_src.append(name)
+            tree.transition_names.append(f"{pack_name}.{name}")
+
+        fails_src = []
+        for idx in range(fail_counts[pack_idx]):
+            name = f"Fail{idx}"
+            classes.append(FAIL_SOURCE.format(name = name))
+            fails_src.append(name)
+            tree.fail_names.append(f"{pack_name}.{name}")
+
+        # Reference games, transitions, and fails from other packs so the external lookups get used.
+        others = [idx for idx in range(packs) if idx != pack_idx]
+        external_games = []
+        for _ in range(externals if others else 0):
+            other = rng.choice(others)
+            if pack_games[other]:
+                external_games.append(f"{pack_names[other]}.{rng.choice(pack_games[other])}")
+        external_transitions = [name for name in tree.transition_names[:1] if not name.startswith(pack_name)]
+        external_fails = [name for name in tree.fail_names[:1] if not name.startswith(pack_name)]
+        tree.external_count += len(external_games) + len(external_transitions) + len(external_fails)
+
+        folder = tree.packs_path / pack_name
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / "__init__.py").write_text(PACK_SOURCE.format(
+            classes = "\n".join(classes),
+            games = _tuple_source(games_src),
+            transitions = _tuple_source(transitions_src),
+            fails = _tuple_source(fails_src),
+            external_games = _tuple_source(external_games, True),
+            external_transitions = _tuple_source(external_transitions, True),
+            external_fails = _tuple_source(external_fails, True),
+            requires_external = bool(external_games)
+        ))
+
+    return tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic pack tree for stress testing.")
+    parser.add_argument("output", type=Path, help="Folder to write the packs and resources folders into.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--transitions", type=int, default=10)
+    parser.add_argument("--fails", type=int, default=5)
+    parser.add_argument("--resources", type=int, default=None)
+    parser.add_argument("--packs", type=int, default=None)
+    parser.add_argument("--externals", type=int, default=2)
+    parser.add_argument("--prefix", default="stress")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tree = generate_tree(args.output, args.games, args.transitions, args.fails, args.resources, args.packs, args.externals, args.prefix, args.seed)
+    print(f"Generated {len(tree.pack_names)} packs with {len(tree.game_names)} games, {len(tree.transition_names)} transitions, "
+          f"{len(tree.fail_names)} fails, {tree.resource_count} resources, and {tree.external_count} external references in {tree.root}")
+
+
+if __name__ == "__main__":
+    main()